@@ -5,6 +5,7 @@ AI Bot模块
 from .random_bot import RandomBot
 from .minimax_bot import MinimaxBot
 from .mcts_bot import MCTSBot
+from .parallel_mcts_bot import ParallelMCTSBot
 from .rl_bot import RLBot
 from .search_bot import SearchBot
 from .rule_based_gomoku_bot import RuleBasedGomokuBot
@@ -13,6 +14,7 @@ __all__ = [
     "RandomBot",
     "MinimaxBot",
     "MCTSBot",
+    "ParallelMCTSBot",
     "RLBot",
     "SearchBot",
     "RuleBasedGomokuBot",
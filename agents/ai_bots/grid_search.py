@@ -0,0 +1,160 @@
+"""
+贪吃蛇网格搜索
+棋盘外围加一圈墙后按行展平成一维数组，邻居就是 cell±1、cell±width，不需要边界判断；
+BFS距离图、连通区域大小和A*寻路使用预分配的缓冲区，不为每次搜索新建访问集合
+"""
+
+from heapq import heappush, heappop
+from typing import List, Optional, Sequence, Tuple
+
+# SnakeGame.grid的取值 -> 是否为蛇身（1蛇1，2蛇2）
+_SNAKE_CELLS = bytes(1 if occupant in (1, 2) else 0 for occupant in range(256))
+
+
+class GridSearch:
+    """
+    贪吃蛇棋盘上的搜索引擎，每个智能体持有一个，每回合先load再查询
+
+    障碍与SnakeGame.is_body一致：两条蛇除尾部以外的格子（尾部下一步会移走），
+    另外对手的蛇头也视为障碍，避免正面相撞。
+    """
+
+    def __init__(self, board_size: int):
+        self.board_size = board_size
+        self.width = width = board_size + 2
+        size = width * width
+        self.offsets = (-width, width, -1, 1)  # 上下左右，与SnakeGame的方向顺序一致
+        self.blocked = bytearray(b'\x01') * size
+        for x in range(board_size):
+            start = (x + 1) * width + 1
+            self.blocked[start:start + board_size] = bytes(board_size)
+        # 预分配的缓冲区：BFS用seen（从blocked复制）和dist；
+        # A*用mark[cell]等于当前标记号表示已访问，省去每次清空
+        self.seen = bytearray(size)
+        self.dist = [0] * size
+        self.mark = [0] * size
+        self.g_score = [0] * size
+        self.parent = [0] * size
+        self._stamp = 0
+        self._source = -1
+
+    def cell(self, pos: Tuple[int, int]) -> int:
+        """棋盘坐标 -> 展平后的格子编号（越界一格的坐标落在墙上）"""
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def position(self, cell: int) -> Tuple[int, int]:
+        """格子编号 -> 棋盘坐标"""
+        x, y = divmod(cell, self.width)
+        return x - 1, y - 1
+
+    def load(self, game, player: int):
+        """按game当前局面设置障碍，player是己方编号（对手的蛇头是障碍）"""
+        size, width, blocked = self.board_size, self.width, self.blocked
+        occupied = game.grid.translate(_SNAKE_CELLS)
+        for x in range(size):
+            start = (x + 1) * width + 1
+            blocked[start:start + size] = occupied[x * size:(x + 1) * size]
+        for snake in (game.snake1, game.snake2):
+            if snake:
+                blocked[self.cell(snake[-1])] = 0
+        opponent = game.snake2 if player == 1 else game.snake1
+        if opponent:
+            blocked[self.cell(opponent[0])] = 1
+
+    def _flood(self, start: int, reset: bool = True) -> int:
+        """
+        从start开始按层BFS（start本身可以是障碍），在dist里记录距离，返回到达的格子数
+
+        seen先复制障碍数组，之后每个格子只需检查一次；reset为False时接着上一次的seen继续，
+        用于在同一局面里依次遍历几个连通区域。
+        """
+        seen, dist, width = self.seen, self.dist, self.width
+        if reset:
+            seen[:] = self.blocked
+        seen[start] = 1
+        dist[start] = 0
+        frontier = [start]
+        count = 1
+        step = 0
+        while frontier:
+            step += 1
+            reached = []
+            for cell in frontier:
+                for neighbor in (cell - width, cell + width, cell - 1, cell + 1):
+                    if not seen[neighbor]:
+                        seen[neighbor] = 1
+                        dist[neighbor] = step
+                        reached.append(neighbor)
+            count += len(reached)
+            frontier = reached
+        return count
+
+    def distances(self, start: Tuple[int, int]) -> int:
+        """从start出发的BFS距离图，返回可到达的格子数（含start），之后用distance查询"""
+        self._source = self.cell(start)
+        return self._flood(self._source)
+
+    def distance(self, pos: Tuple[int, int]) -> int:
+        """最近一次distances中到pos的步数，到不了为-1（之后调用其他搜索或load会覆盖距离图）"""
+        cell = self.cell(pos)
+        if cell == self._source or (self.seen[cell] and not self.blocked[cell]):
+            return self.dist[cell]
+        return -1
+
+    def area(self, pos: Tuple[int, int]) -> int:
+        """pos所在连通区域的格子数，pos是障碍时为0"""
+        cell = self.cell(pos)
+        return 0 if self.blocked[cell] else self._flood(cell)
+
+    def move_areas(self, head: Tuple[int, int], actions: Sequence[Tuple[int, int]]) -> List[int]:
+        """
+        每个动作落点所在连通区域的大小（落点是墙或障碍时为0）
+
+        各落点共用一次遍历：遍历完一个区域后，已被访问的其余落点直接复用该区域的大小。
+        """
+        self._source = -1
+        seen, blocked = self.seen, self.blocked
+        seen[:] = blocked
+        targets = [self.cell((head[0] + dx, head[1] + dy)) for dx, dy in actions]
+        areas = [0] * len(targets)
+        for index, cell in enumerate(targets):
+            if blocked[cell] or seen[cell]:
+                continue
+            size = self._flood(cell, reset=False)
+            for other in range(index, len(targets)):
+                if seen[targets[other]] and not blocked[targets[other]] and not areas[other]:
+                    areas[other] = size
+        return areas
+
+    def astar(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """曼哈顿距离启发的A*，返回从start到goal的坐标路径（含两端），到不了为None"""
+        self._stamp += 1
+        stamp = self._stamp
+        blocked, mark, g_score, parent = self.blocked, self.mark, self.g_score, self.parent
+        width = self.width
+        source, target = self.cell(start), self.cell(goal)
+        goal_x, goal_y = divmod(target, width)
+        mark[source] = stamp
+        g_score[source] = 0
+        # 格子编号的大小顺序与坐标元组一致，f相同时的出队顺序与按坐标比较相同
+        open_set = [(abs(start[0] - goal[0]) + abs(start[1] - goal[1]), source)]
+        while open_set:
+            cell = heappop(open_set)[1]
+            if cell == target:
+                path = [goal]
+                while cell != source:
+                    cell = parent[cell]
+                    path.append(self.position(cell))
+                return path[::-1]
+            tentative = g_score[cell] + 1
+            for offset in self.offsets:
+                neighbor = cell + offset
+                if blocked[neighbor]:
+                    continue
+                if mark[neighbor] != stamp or tentative < g_score[neighbor]:
+                    mark[neighbor] = stamp
+                    g_score[neighbor] = tentative
+                    parent[neighbor] = cell
+                    x, y = divmod(neighbor, width)
+                    heappush(open_set, (tentative + abs(x - goal_x) + abs(y - goal_y), neighbor))
+        return None
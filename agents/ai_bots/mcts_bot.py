@@ -7,57 +7,30 @@ import time
 import random
 import math
 from typing import Dict, List, Tuple, Any, Optional
+import numpy as np
 from agents.base_agent import BaseAgent
+from agents.ai_bots.mcts_tree import MCTSTree, ROOT
+from games.gomoku.gomoku_game import GomokuGame
+from games.gomoku.gomoku_patterns import move_run_lengths
+from games.gomoku.gomoku_rollout import rollout, batch_rollout
 import config
-import copy
 
 
-class MCTSNode:
-    """MCTS节点"""
-    
-    def __init__(self, state, parent=None, action=None):
+class SimulationNode:
+    """传给自定义模拟策略的叶子节点：policy(node, player_id)，node.state是叶子局面的副本，可以随意修改"""
+
+    __slots__ = ('state',)
+
+    def __init__(self, state):
         self.state = state
-        self.parent = parent
-        self.action = action
-        self.children = []
-        self.visits = 0
-        self.value = 0.0
-        self.untried_actions = self._get_untried_actions()
-    
-    def _get_untried_actions(self):
-        """获取未尝试的动作"""
-        if hasattr(self.state, 'get_valid_actions'):
-            return self.state.get_valid_actions()
-        return []
-    
-    def is_fully_expanded(self):
-        """检查是否完全展开"""
-        return len(self.untried_actions) == 0
-    
-    def is_terminal(self):
-        """检查是否为终止节点"""
-        if hasattr(self.state, 'is_terminal'):
-            return self.state.is_terminal()
-        return False
-    
-    def get_winner(self):
-        """获取获胜者"""
-        if hasattr(self.state, 'get_winner'):
-            return self.state.get_winner()
-        return None
-    
-    def clone_state(self):
-        """克隆状态"""
-        if hasattr(self.state, 'clone'):
-            return self.state.clone()
-        return self.state
 
 
 class MCTSBot(BaseAgent):
     """MCTS Bot"""
     
     def __init__(self, name: str = "MCTSBot", player_id: int = 1, 
-                 simulation_count: int = 100, ucb_c: float = 1.41, simulation_policy=None, timeout: float = 10):
+                 simulation_count: int = 100, ucb_c: float = 1.41, simulation_policy=None, timeout: float = 10,
+                 prior_policy=None, puct_c: float = 1.5):
         super().__init__(name, player_id)
         self.simulation_count = simulation_count
         # UCB1参数C可配置
@@ -65,131 +38,244 @@ class MCTSBot(BaseAgent):
         self.simulation_count = ai_config.get('simulation_count', simulation_count)
         self.timeout = ai_config.get('timeout', timeout)
         self.ucb_c = ai_config.get('ucb_c', ucb_c)
-        # 随机模拟策略可自定义
+        self.candidate_radius = ai_config.get('candidate_radius', 2)
+        # 搜索树的各列数组在多次落子之间复用
+        self.tree = MCTSTree()
+        # 随机模拟策略可自定义：policy(node, player_id) -> 本方视角的结果（1/0/-1）
         self.simulation_policy = simulation_policy or self._default_simulation_policy
+        # 指定先验策略 prior_policy(game, actions) -> 概率列表 时改用PUCT选择
+        self.prior_policy = prior_policy
+        self.puct_c = ai_config.get('puct_c', puct_c)
+        # 树复用：下一步从实际走到的子树继续搜索
+        self.reuse_tree = ai_config.get('reuse_tree', True)
+        # 批量模拟：每轮用虚拟损失选出rollout_batch个叶子，一次调用模拟完
+        self.rollout_batch = ai_config.get('rollout_batch', 1)
+        self.virtual_loss = ai_config.get('virtual_loss', 1.0)
+        self._search_game = None
+        self._search_history = None
+        self.reused_visits = 0
+        self.reused_nodes = 0
 
     def get_action(self, observation: Any, env: Any) -> Any:
         """
         使用MCTS选择动作（完整树结构版），支持超时自动停止
         """
         import time
-        root = MCTSNode(env.game.clone())
-        start_time = time.time()
+        # 整个搜索只使用这一份局面：沿树下行时push，模拟结束后pop回根
+        tree = self.tree
+        game = self._advance_root(env.game)
+        if game is None:
+            game = env.game.clone()
+            tree.reset(root_terminal=game.is_terminal())
+            self.reused_visits = 0
+            self.reused_nodes = 0
+        else:
+            self.reused_visits = int(tree.visits[ROOT])
+            self.reused_nodes = tree.size
+        self._search(game, time.time())
+        # 搜索结束时game回到根局面，保留下来供下一步复用
+        self._search_game = game
+        self._search_history = list(env.game.history) if hasattr(env.game, 'history') else None
+        # 选择访问次数最多的子节点的动作
+        best_child = tree.best_child(ROOT)
+        if best_child < 0:
+            return None
+        return tree.get_action(best_child)
+
+    def _search(self, game, start_time):
+        """在定位于根节点的game上反复执行选择/扩展/模拟/回传，直到用完模拟次数或超时"""
+        if self.rollout_batch > 1:
+            self._search_batched(game, start_time)
+            return
+        tree = self.tree
         for _ in range(self.simulation_count):
             if time.time() - start_time > self.timeout:
                 break
-            node = self._select(root)
-            if not node.is_terminal() and not node.is_fully_expanded():
-                node = self._expand(node)
-            result = self._simulate(node)
+            node = self._select(ROOT, game)
+            if not tree.terminal[node] and not tree.is_fully_expanded(node):
+                node = self._expand(node, game)
+            result = self._simulate(node, game)
             self._backpropagate(node, result)
-        # 选择访问次数最多的子节点的动作
-        if not root.children:
+            self._return_to_root(node, game)
+
+    def _search_batched(self, game, start_time):
+        """每轮选出一批叶子，用_simulate_batch一次模拟完再统一回传"""
+        done = 0
+        while done < self.simulation_count and time.time() - start_time <= self.timeout:
+            leaves = self._select_leaves(game, min(self.rollout_batch, self.simulation_count - done))
+            results = self._simulate_batch([leaf_game for _, leaf_game in leaves])
+            self._backpropagate_leaves(leaves, results)
+            done += len(leaves)
+
+    def _select_leaves(self, game, count, clone=True):
+        """
+        用虚拟损失连续选出count个叶子，返回 [(节点, 叶子局面的副本)]（clone为False时不复制，副本位置为None）
+
+        每选出一个叶子就沿路径记一次虚拟失败，后面的选择会避开同一条路径。
+        """
+        tree = self.tree
+        leaves = []
+        for _ in range(count):
+            node = self._select(ROOT, game)
+            if not tree.terminal[node] and not tree.is_fully_expanded(node):
+                node = self._expand(node, game)
+            tree.add_virtual_loss(node, self.virtual_loss)
+            leaves.append((node, game.clone() if clone else None))
+            self._return_to_root(node, game)
+        return leaves
+
+    def _backpropagate_leaves(self, leaves, results):
+        """撤销虚拟损失，并把每个叶子的模拟结果（本Bot视角）回传"""
+        tree = self.tree
+        for (node, _), result in zip(leaves, results):
+            tree.remove_virtual_loss(node, self.virtual_loss)
+            tree.backpropagate(node, result, self.player_id)
+
+    def _return_to_root(self, node, game):
+        """沿父节点逐层pop，把game恢复到根局面"""
+        parent = self.tree.parent
+        while node != ROOT:
+            game.pop()
+            node = parent[node]
+
+    def _advance_root(self, env_game):
+        """
+        树复用：把上次搜索的根沿env中新增的落子往下走，并裁掉其余分支
+
+        返回定位在新根上的搜索局面；无法复用（新对局、落子不在树中、局面不一致）时返回None。
+        """
+        game = self._search_game
+        previous = self._search_history
+        if not self.reuse_tree or game is None or previous is None or not hasattr(env_game, 'board'):
+            return None
+        history = env_game.history
+        if len(history) < len(previous) or history[:len(previous)] != previous:
             return None
-        best_child = max(root.children, key=lambda c: c.visits)
-        return best_child.action
+        tree = self.tree
+        node = ROOT
+        # 历史记录的每一项为 (玩家, 动作)
+        for _, action in history[len(previous):]:
+            node = tree.find_child(node, action)
+            if node < 0:
+                return None
+            game.push(action)
+        if game.current_player != env_game.current_player or not np.array_equal(game.board, env_game.board):
+            return None
+        tree.reroot(node)
+        return game
+
+    def _untried_actions(self, game):
+        """节点可展开的动作：支持邻域候选的游戏只展开棋子附近的空位"""
+        if self.candidate_radius and hasattr(game, 'get_candidate_actions'):
+            return game.get_candidate_actions(self.candidate_radius)
+        return game.get_valid_actions()
 
-    def _select(self, node):
+    def _select(self, node, game):
         """
         选择阶段：沿树下行，使用UCB1策略选择子节点，直到遇到未完全展开或终局节点。
+        下行的每一步都在game上push对应动作。
         """
-        while not node.is_terminal() and node.is_fully_expanded() and node.children:
+        tree = self.tree
+        while not tree.terminal[node] and tree.is_fully_expanded(node) and tree.num_children[node]:
             node = self._uct_select(node)
+            game.push(tree.get_action(node))
+            if tree.visits[node] == 0:
+                # PUCT下整块子节点都可被选中，第一次到达时补上终局标记
+                tree.terminal[node] = game.is_terminal()
         return node
 
     def _uct_select(self, node):
         """
-        UCB1选择策略，可调参数C。
-        """
-        C = self.ucb_c
-        best_score = -float('inf')
-        best_child = None
-        for child in node.children:
-            if child.visits == 0:
-                uct = float('inf')
-            else:
-                uct = (child.value / child.visits +
-                       C * math.sqrt(math.log(node.visits + 1) / child.visits))
-            if uct > best_score:
-                best_score = uct
-                best_child = child
-        return best_child
-
-    def _expand(self, node):
-        """
-        节点扩展策略：从未尝试动作中选择一个动作扩展为新子节点。
-        """
-        action = node.untried_actions.pop()
-        next_state = node.state.clone()
-        next_state.step(action)
-        child = MCTSNode(next_state, parent=node, action=action)
-        node.children.append(child)
+        UCB1选择策略，可调参数C；设置了先验策略时使用PUCT。
+        子节点统计量在树中连续存放，一次向量运算算出全部得分后取argmax。
+        """
+        tree = self.tree
+        start = int(tree.first_child[node])
+        end = start + int(tree.num_expanded[node])
+        visits = tree.visits[start:end]
+        values = tree.value[start:end]
+        parent_visits = int(tree.visits[node])
+        if self.prior_policy is not None:
+            # PUCT: Q + c * P * sqrt(N) / (1 + n)，未访问的子节点Q取0
+            q = np.divide(values, visits, out=np.zeros(end - start), where=visits > 0)
+            # 父节点访问数至少按1计，保证全部子节点未访问时按先验排序
+            scores = q + self.puct_c * tree.prior[start:end] * (math.sqrt(max(1, parent_visits)) / (1 + visits))
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = values / visits + self.ucb_c * np.sqrt(math.log(parent_visits + 1) / visits)
+            scores[visits == 0] = np.inf
+        return start + int(np.argmax(scores))
+
+    @staticmethod
+    def run_length_prior(game, actions):
+        """示例先验策略：落子后双方能连成的线越长，先验越大"""
+        board = game.board
+        runs = np.maximum(move_run_lengths(board, 1), move_run_lengths(board, 2))
+        weights = np.array([1.0 + runs[action] ** 2 for action in actions])
+        return weights / weights.sum()
+
+    def _expand(self, node, game):
+        """
+        节点扩展策略：第一次扩展时为节点分配全部候选动作的子节点块，
+        之后每次展开一个未尝试的子节点（game随之push该动作）。
+        PUCT下按先验一次展开整块，从该节点本身开始模拟。
+        """
+        tree = self.tree
+        if not tree.is_expanded(node):
+            actions = self._untried_actions(game)
+            if self.prior_policy is not None:
+                tree.expand(node, actions, self.prior_policy(game, actions), game.current_player)
+                tree.expand_all(node)
+                return node
+            tree.expand(node, actions, mover=game.current_player)
+            if not tree.num_children[node]:
+                return node
+        child = tree.next_untried(node)
+        game.push(tree.get_action(child))
+        tree.terminal[child] = game.is_terminal()
         return child
 
-    def _simulate(self, node):
+    def _simulate(self, node, game):
         """
         随机模拟策略：从当前节点开始，使用模拟策略（默认随机）直到终局。
+        
+        默认策略直接在game上模拟并恢复原状；自定义策略拿到的是局面副本，不需要恢复。
         """
-        return self.simulation_policy(node, self.player_id)
-
-    def _default_simulation_policy(self, node, player_id):
-        state = node.state.clone()
-        board = state.board
-        board_size = board.shape[0]
-        def forms_n_in_a_row(board, move, player, n):
-            row, col = move
-            if board[row, col] != 0:
-                return False
-            directions = [(1,0),(0,1),(1,1),(1,-1)]
-            for dx, dy in directions:
-                count = 1
-                for d in [1, -1]:
-                    for k in range(1, n):
-                        x = row + dx * k * d
-                        y = col + dy * k * d
-                        if 0 <= x < board_size and 0 <= y < board_size and board[x, y] == player:
-                            count += 1
-                        else:
-                            break
-                if count >= n:
-                    return True
-            return False
-        while not state.is_terminal():
-            actions = state.get_valid_actions()
-            if not actions:
-                break
-            # 1. 自己五连
-            for move in actions:
-                if forms_n_in_a_row(state.board, move, player_id, 5):
-                    state.step(move)
+        if self._uses_default_policy():
+            return self._default_simulation_policy(game, self.player_id)
+        return self.simulation_policy(SimulationNode(game.clone()), self.player_id)
+
+    def _uses_default_policy(self):
+        """是否使用默认模拟策略（绑定到本Bot的_default_simulation_policy）"""
+        return getattr(self.simulation_policy, '__self__', None) is self
+
+    def _simulate_batch(self, games):
+        """
+        批量模拟：一次评估多个叶子局面，返回本Bot视角的结果列表
+
+        默认策略下五子棋局面交给batch_rollout同步推进，其余情况逐个调用_simulate。
+        """
+        if self._uses_default_policy() and isinstance(games[0], GomokuGame):
+            winners = batch_rollout(games, self.player_id)
+            return [0 if winner == 0 else (1 if winner == self.player_id else -1) for winner in winners]
+        return [self._simulate(None, game) for game in games]
+
+    def _default_simulation_policy(self, state, player_id):
+        """
+        默认模拟策略，返回后state不变。
+        五子棋交给增量维护威胁点的快速模拟引擎（自己五连、挡对手五连、自己四连、挡对手四连、占中心、随机落子），
+        其他游戏在副本上随机走到终局。
+        """
+        if isinstance(state, GomokuGame):
+            winner = rollout(state, player_id)
+        else:
+            state = state.clone()
+            while not state.is_terminal():
+                actions = state.get_valid_actions()
+                if not actions:
                     break
-            else:
-                # 2. 对手五连
-                opponent = 2 if player_id == 1 else 1
-                for move in actions:
-                    if forms_n_in_a_row(state.board, move, opponent, 5):
-                        state.step(move)
-                        break
-                else:
-                    # 3. 自己四连
-                    for move in actions:
-                        if forms_n_in_a_row(state.board, move, player_id, 4):
-                            state.step(move)
-                            break
-                    else:
-                        # 4. 对手四连
-                        for move in actions:
-                            if forms_n_in_a_row(state.board, move, opponent, 4):
-                                state.step(move)
-                                break
-                        else:
-                            # 5. 中心优先
-                            center = (board_size // 2, board_size // 2)
-                            if center in actions:
-                                state.step(center)
-                            else:
-                                state.step(random.choice(actions))
-        winner = state.get_winner()
+                state.push(random.choice(actions))
+            winner = state.get_winner()
         if winner == player_id:
             return 1
         elif winner is not None:
@@ -200,15 +286,18 @@ class MCTSBot(BaseAgent):
     def _backpropagate(self, node, result):
         """
         结果回传机制：将模拟结果沿父节点回传，更新访问次数与累计价值。
+        
+        result是本Bot视角的结果；每个节点累计的是走出该步的一方（展开时记录在树中）的收益，
+        这样对手节点上的UCB选择的是对手的最好应着，实际应着才更可能已在树中被充分搜索。
+        贪吃蛇一方死亡时不换手，因此行棋方不能由当前玩家推断。
         """
-        while node is not None:
-            node.visits += 1
-            node.value += result
-            node = node.parent
+        self.tree.backpropagate(node, result, self.player_id)
 
     def reset(self):
-        """重置MCTS Bot"""
+        """重置MCTS Bot（丢弃保留的搜索树）"""
         super().reset()
+        self._search_game = None
+        self._search_history = None
     
     def get_info(self) -> Dict[str, Any]:
         """获取MCTS Bot信息"""
@@ -217,6 +306,11 @@ class MCTSBot(BaseAgent):
             'type': 'MCTS',
             'description': '使用完整蒙特卡洛树搜索的Bot',
             'strategy': f'MCTS with {self.simulation_count} simulations',
-            'timeout': self.timeout
+            'timeout': self.timeout,
+            'tree': self.tree.get_stats(),
+            'reuse_tree': self.reuse_tree,
+            'reused_visits': self.reused_visits,
+            'reused_nodes': self.reused_nodes,
+            'reused_fraction': self.reused_visits / max(1, int(self.tree.visits[ROOT]))
         })
         return info 
\ No newline at end of file
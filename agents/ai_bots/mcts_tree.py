@@ -0,0 +1,226 @@
+"""
+数组化MCTS树
+所有节点的统计量按列存放在预分配的numpy数组里（结构体数组），
+同一节点的子节点占据一段连续下标，节点只记录动作编号，不保存局面
+"""
+
+import sys
+import numpy as np
+from typing import Any, Dict, List, Sequence
+
+ROOT = 0
+NO_CHILDREN = -1  # first_child的取值：尚未分配子节点块
+
+
+class MCTSTree:
+    """
+    结构体数组形式的蒙特卡洛搜索树
+
+    节点第一次需要扩展时，一次性为它的全部候选动作分配一段连续的子节点块。
+    动作倒序放入块中，子节点从块首依次展开，展开顺序与原先从untried_actions末尾pop一致，
+    已展开的子节点总是块的前一段。
+    动作被登记到动作表中，节点里只存动作编号。
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.parent = np.empty(capacity, dtype=np.int32)
+        self.first_child = np.empty(capacity, dtype=np.int32)
+        self.num_children = np.empty(capacity, dtype=np.int32)
+        self.num_expanded = np.empty(capacity, dtype=np.int32)
+        self.action = np.empty(capacity, dtype=np.int32)
+        self.terminal = np.empty(capacity, dtype=bool)
+        self.visits = np.empty(capacity, dtype=np.int64)
+        self.value = np.empty(capacity, dtype=np.float64)
+        self.prior = np.empty(capacity, dtype=np.float64)  # PUCT先验概率
+        self.mover = np.empty(capacity, dtype=np.int8)  # 走到该节点的一方（根节点为0）
+        self.actions: List[Any] = []       # 动作编号 -> 动作
+        self._action_ids: Dict[Any, int] = {}
+        self.size = 0
+
+    def reset(self, root_terminal: bool = False):
+        """清空整棵树，只保留根节点"""
+        self.size = 0
+        self.actions = []
+        self._action_ids = {}
+        self._allocate(1)
+        self._init_nodes(ROOT, 1, parent=-1)
+        self.terminal[ROOT] = root_terminal
+
+    def expand(self, node: int, actions: List[Any], priors: Sequence[float] = None, mover: int = 0):
+        """为节点分配连续的子节点块，mover是在该节点行棋的一方；子节点的终局标记由展开时设置"""
+        start = self._allocate(len(actions))
+        self._init_nodes(start, len(actions), parent=node)
+        self.mover[start:start + len(actions)] = mover
+        if priors is not None and len(actions):
+            self.prior[start:start + len(actions)] = np.asarray(priors, dtype=np.float64)[::-1]
+        ids = self._action_ids
+        for offset, action in enumerate(reversed(actions)):
+            action_id = ids.get(action)
+            if action_id is None:
+                action_id = ids[action] = len(self.actions)
+                self.actions.append(action)
+            self.action[start + offset] = action_id
+        self.first_child[node] = start
+        self.num_children[node] = len(actions)
+
+    def expand_all(self, node: int):
+        """把节点块内的子节点全部标记为已展开（PUCT按先验直接在整块中选择）"""
+        self.num_expanded[node] = self.num_children[node]
+
+    def is_expanded(self, node: int) -> bool:
+        """节点是否已分配子节点块"""
+        return self.first_child[node] != NO_CHILDREN
+
+    def is_fully_expanded(self, node: int) -> bool:
+        """节点的所有子节点是否都已展开"""
+        return self.first_child[node] != NO_CHILDREN and self.num_expanded[node] == self.num_children[node]
+
+    def next_untried(self, node: int) -> int:
+        """取出下一个未展开的子节点"""
+        expanded = int(self.num_expanded[node])
+        self.num_expanded[node] = expanded + 1
+        return int(self.first_child[node]) + expanded
+
+    def children(self, node: int) -> range:
+        """已展开的子节点下标（按展开顺序）"""
+        start = int(self.first_child[node])
+        return range(start, start + int(self.num_expanded[node]))
+
+    def get_action(self, node: int) -> Any:
+        """获取到达该节点的动作"""
+        return self.actions[self.action[node]]
+
+    def path(self, node: int) -> List[Any]:
+        """从根节点走到node的动作序列"""
+        actions = []
+        while node != ROOT:
+            actions.append(self.actions[self.action[node]])
+            node = int(self.parent[node])
+        actions.reverse()
+        return actions
+
+    def backpropagate(self, node: int, result: float, player: int = 0):
+        """
+        将模拟结果沿父节点回传
+
+        player非0时result是player视角的结果，每个节点按走到它的一方累计：
+        该方是player时加result，否则加-result（不假设双方严格轮流行棋）。
+        """
+        parent, visits, value, mover = self.parent, self.visits, self.value, self.mover
+        while node >= 0:
+            visits[node] += 1
+            value[node] += result if not player or mover[node] == player else -result
+            node = parent[node]
+
+    def add_virtual_loss(self, node: int, loss: float):
+        """叶并行：沿路径先记一次失败，让并发的选择避开同一条路径"""
+        parent, visits, value = self.parent, self.visits, self.value
+        while node >= 0:
+            visits[node] += 1
+            value[node] -= loss
+            node = parent[node]
+
+    def remove_virtual_loss(self, node: int, loss: float):
+        """撤销add_virtual_loss"""
+        parent, visits, value = self.parent, self.visits, self.value
+        while node >= 0:
+            visits[node] -= 1
+            value[node] += loss
+            node = parent[node]
+
+    def best_child(self, node: int = ROOT) -> int:
+        """访问次数最多的已展开子节点，没有子节点时返回-1"""
+        children = self.children(node)
+        if not len(children):
+            return -1
+        return children.start + int(np.argmax(self.visits[children.start:children.stop]))
+
+    def find_child(self, node: int, action: Any) -> int:
+        """在已展开的子节点中查找动作对应的子节点，找不到返回-1"""
+        action_id = self._action_ids.get(action)
+        if action_id is None or not self.is_expanded(node):
+            return -1
+        children = self.children(node)
+        matches = np.flatnonzero(self.action[children.start:children.stop] == action_id)
+        return children.start + int(matches[0]) if len(matches) else -1
+
+    def reroot(self, node: int):
+        """
+        以node为新根，只保留它的子树（兄弟分支被裁掉）
+
+        按广度优先把保留的节点紧凑地复制到数组前部，每个子节点块整体复制，
+        块仍然连续，统计量原样保留。
+        """
+        if node == ROOT:
+            return
+        order = [node]
+        first_child, num_children = self.first_child, self.num_children
+        index = 0
+        while index < len(order):
+            old = order[index]
+            start = int(first_child[old])
+            if start != NO_CHILDREN:
+                order.extend(range(start, start + int(num_children[old])))
+            index += 1
+        old_index = np.array(order, dtype=np.int64)
+        mapping = np.full(self.size, -1, dtype=np.int64)
+        mapping[old_index] = np.arange(len(order))
+        old_parent = self.parent[old_index]
+        old_first = self.first_child[old_index]
+        for name in ('num_children', 'num_expanded', 'action', 'terminal', 'visits', 'value', 'prior', 'mover'):
+            column = getattr(self, name)
+            column[:len(order)] = column[old_index]
+        self.parent[:len(order)] = np.where(old_parent >= 0, mapping[old_parent], -1)
+        self.parent[ROOT] = -1
+        self.first_child[:len(order)] = np.where(old_first >= 0, mapping[old_first], NO_CHILDREN)
+        self.size = len(order)
+
+    def memory_bytes(self) -> int:
+        """估算占用内存（已用节点的各列 + 动作表）"""
+        columns = (self.parent, self.first_child, self.num_children, self.num_expanded,
+                   self.action, self.terminal, self.visits, self.value, self.prior, self.mover)
+        per_node = sum(column.itemsize for column in columns)
+        actions = sys.getsizeof(self.actions) + sum(sys.getsizeof(action) for action in self.actions)
+        return self.size * per_node + actions
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取树的规模统计"""
+        return {
+            'nodes': self.size,
+            'capacity': self.capacity,
+            'root_visits': int(self.visits[ROOT]) if self.size else 0,
+            'memory_bytes': self.memory_bytes(),
+        }
+
+    def _allocate(self, count: int) -> int:
+        """分配count个连续节点，容量不足时按倍数扩容，返回第一个下标"""
+        start = self.size
+        needed = start + count
+        if needed > self.capacity:
+            capacity = self.capacity
+            while capacity < needed:
+                capacity *= 2
+            for name in ('parent', 'first_child', 'num_children', 'num_expanded',
+                         'action', 'terminal', 'visits', 'value', 'prior', 'mover'):
+                column = getattr(self, name)
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:start] = column[:start]
+                setattr(self, name, grown)
+            self.capacity = capacity
+        self.size = needed
+        return start
+
+    def _init_nodes(self, start: int, count: int, parent: int):
+        """初始化一段新节点"""
+        end = start + count
+        self.parent[start:end] = parent
+        self.first_child[start:end] = NO_CHILDREN
+        self.num_children[start:end] = 0
+        self.num_expanded[start:end] = 0
+        self.action[start:end] = -1
+        self.terminal[start:end] = False
+        self.visits[start:end] = 0
+        self.value[start:end] = 0.0
+        self.prior[start:end] = 1.0 / max(1, count)
+        self.mover[start:end] = 0
@@ -1,128 +1,241 @@
 import time
 from agents.base_agent import BaseAgent
-import copy
+from agents.ai_bots.transposition_table import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from games.gomoku.gomoku_patterns import evaluate_board
+import config
+
+# 胜负分：远高于棋型评估能达到的值（单个窗口的连五才100000），再减去层数，越快的胜利分越高
+WIN_SCORE = 10 ** 9
+# 绝对值超过它的分数是胜负分（搜索不会超过这么多层）
+MATE_THRESHOLD = WIN_SCORE - 10000
+
+
+def score_to_tt(score, ply):
+    """胜负分存入置换表前换算成相对当前节点的层数，同一局面在不同层数命中时仍然正确"""
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    """score_to_tt的逆变换"""
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+class SearchTimeout(Exception):
+    """搜索超出本步时间预算"""
+
 
 class MinimaxBot(BaseAgent):
-    def __init__(self, name="MinimaxBot", player_id=1, max_depth=2):
+    def __init__(self, name="MinimaxBot", player_id=1, max_depth=None, time_limit=None, tt_size=None):
         super().__init__(name, player_id)
-        self.max_depth = max_depth
+        ai_config = config.AI_CONFIGS.get('minimax', {})
+        # 迭代加深的最大深度和每步时间预算，未指定时取配置
+        self.max_depth = ai_config.get('max_depth', 4) if max_depth is None else max_depth
+        self.time_limit = ai_config.get('time_limit', 1.0) if time_limit is None else time_limit
+        # 置换表在多次落子之间保留，按Zobrist哈希复用已搜索局面
+        if tt_size is None:
+            tt_size = ai_config.get('tt_size', 1 << 16)
+        self.tt = TranspositionTable(tt_size)
+        # 只搜索已有棋子附近的空位，远处的空位几乎不可能是好棋
+        self.candidate_radius = ai_config.get('candidate_radius', 2)
+        self._deadline = 0.0
+        self._pv = []
+        self._partial_best = None
+        self.nodes = 0
+        self.last_depth = 0
+        self.last_score = 0
+        self.last_pv = []
+        self.last_search_time = 0.0
 
     def get_action(self, observation, env):
         valid_actions = env.get_valid_actions()
         if not valid_actions:
             return None
 
-        # 动态深度调整：空位越少，搜索越深
-        empty_count = len(valid_actions)
-        if empty_count > 30:
-            depth = 2
-        elif empty_count > 15:
-            depth = 3
-        else:
-            depth = 4
-
-        start_time = time.time()
-        time_limit = 1.0  # 1秒
+        start_time = time.perf_counter()
+        self._deadline = start_time + self.time_limit
+        # 整棵树在同一个可变局面上用push/pop遍历，避免每个节点克隆；
+        # 超时异常会打断搜索，这份副本直接丢弃，无需逐层pop
+        game = env.game.clone()
+        self.tt.new_search()
+        self.nodes = 0
+        self._pv = []
 
+        root_actions = self._candidate_actions(game) or valid_actions
+        best_action = root_actions[0]
         best_score = float('-inf')
-        best_action = valid_actions[0]
-        for action in valid_actions:
-            if time.time() - start_time > time_limit:
+        completed_depth = 0
+        last_iteration_time = None
+        growth = 4.0  # 每加深一层耗时的估计倍数
+        max_depth = min(self.max_depth, len(valid_actions))
+        for depth in range(1, max_depth + 1):
+            iteration_start = time.perf_counter()
+            # 时间管理：预计下一层无法在预算内完成时不再开始
+            if last_iteration_time is not None:
+                if iteration_start + last_iteration_time * growth > self._deadline:
+                    break
+            try:
+                action, score = self._search_root(game, root_actions, depth)
+            except SearchTimeout:
+                # 第一层都没完成时，退而使用部分结果中的最好着法
+                if completed_depth == 0 and self._partial_best is not None:
+                    best_action, best_score = self._partial_best
                 break
-            game_copy = env.game.clone()
-            game_copy.step(action)
-            score = self.minimax(game_copy, depth - 1, False, float('-inf'), float('inf'), start_time, time_limit)
+            iteration_time = time.perf_counter() - iteration_start
+            if last_iteration_time:
+                growth = max(2.0, min(iteration_time / last_iteration_time, 20.0))
+            last_iteration_time = iteration_time
+            best_action, best_score = action, score
+            completed_depth = depth
+            self._pv = self._extract_pv(game, depth)
+
+        self.last_depth = completed_depth
+        self.last_score = best_score
+        self.last_pv = self._pv
+        self.last_search_time = time.perf_counter() - start_time
+        return best_action
+
+    def _search_root(self, game, valid_actions, depth):
+        """搜索根节点到指定深度，返回(最佳着法, 分数)"""
+        actions = self._order_actions(game, valid_actions, self._pv[0] if self._pv else None)
+        alpha, beta = float('-inf'), float('inf')
+        best_action, best_score = actions[0], float('-inf')
+        self._partial_best = None
+        for index, action in enumerate(actions):
+            game.push(action)
+            # 上一轮主变例上的第一个着法继续沿主变例排序
+            score = self.minimax(game, depth - 1, False, alpha, beta, ply=1, follow_pv=(index == 0))
+            game.pop()
             if score > best_score:
                 best_score = score
                 best_action = action
-        return best_action
+                self._partial_best = (best_action, best_score)
+            alpha = max(alpha, score)
+        key = getattr(game, 'zobrist_hash', None)
+        if key is not None:
+            self.tt.store(key, depth, EXACT, best_score, best_action)
+        return best_action, best_score
 
-    def minimax(self, game, depth, maximizing, alpha, beta, start_time, time_limit):
-        if time.time() - start_time > time_limit:
-            return 0  # 超时直接返回
+    def _candidate_actions(self, game):
+        """获取需要搜索的着法：支持邻域候选的游戏只取棋子附近的空位"""
+        if self.candidate_radius and hasattr(game, 'get_candidate_actions'):
+            return game.get_candidate_actions(self.candidate_radius)
+        return game.get_valid_actions()
+
+    def _extract_pv(self, game, depth):
+        """沿置换表中的最佳着法还原主变例"""
+        key = getattr(game, 'zobrist_hash', None)
+        if key is None:
+            return [self._partial_best[0]] if self._partial_best else []
+        pv = []
+        game = game.clone()
+        seen = set()
+        while len(pv) < depth and not game.is_terminal() and key not in seen:
+            seen.add(key)
+            move = self.tt.best_move(key)
+            if move is None or move not in game.get_valid_actions():
+                break
+            pv.append(move)
+            game.push(move)
+            key = game.zobrist_hash
+        return pv
+
+    def _order_actions(self, game, actions, pv_move=None):
+        """着法排序：主变例着法最先，其次是置换表中记录的最佳着法"""
+        key = getattr(game, 'zobrist_hash', None)
+        tt_move = self.tt.best_move(key) if key is not None else None
+        for move in (tt_move, pv_move):
+            if move is not None and move in actions:
+                actions = [move] + [action for action in actions if action != move]
+        return actions
+
+    def minimax(self, game, depth, maximizing, alpha, beta, ply=0, follow_pv=False):
+        self.nodes += 1
+        if time.perf_counter() > self._deadline:
+            raise SearchTimeout()
         if depth == 0 or game.is_terminal():
             winner = game.get_winner()
             if winner == self.player_id:
-                return 10000
+                return WIN_SCORE - ply
             elif winner is not None:
-                return -10000
+                return -(WIN_SCORE - ply)
             else:
                 return self.evaluate(game)  # 非终局用启发式评估
 
-        valid_actions = game.get_valid_actions()
+        # 查询置换表：足够深的条目可直接返回或收窄窗口
+        key = getattr(game, 'zobrist_hash', None)
+        alpha_orig, beta_orig = alpha, beta
+        if key is not None and not follow_pv:
+            entry = self.tt.probe(key)
+            if entry is not None and entry[0] >= depth:
+                _, bound, score, _, _ = entry
+                score = score_from_tt(score, ply)
+                if bound == EXACT:
+                    return score
+                if bound == LOWER_BOUND:
+                    alpha = max(alpha, score)
+                elif bound == UPPER_BOUND:
+                    beta = min(beta, score)
+                if beta <= alpha:
+                    return score
+
+        valid_actions = self._candidate_actions(game)
         if not valid_actions:
             return 0
+        pv_move = self._pv[ply] if follow_pv and ply < len(self._pv) else None
+        valid_actions = self._order_actions(game, valid_actions, pv_move)
         
+        best_action = None
         if maximizing:
-            max_score = float('-inf')
-            for action in valid_actions:
-                game_copy = game.clone()
-                game_copy.step(action)
-                score = self.minimax(game_copy, depth - 1, False, alpha, beta, start_time, time_limit)
-                max_score = max(max_score, score)
+            best_score = float('-inf')
+            for index, action in enumerate(valid_actions):
+                game.push(action)
+                score = self.minimax(game, depth - 1, False, alpha, beta, ply + 1,
+                                     follow_pv and index == 0 and pv_move is not None)
+                game.pop()
+                if score > best_score:
+                    best_score = score
+                    best_action = action
                 alpha = max(alpha, score)
                 if beta <= alpha:
                     break  # beta剪枝
-            return max_score
         else:
-            min_score = float('inf')
-            for action in valid_actions:
-                game_copy = game.clone()
-                game_copy.step(action)
-                score = self.minimax(game_copy, depth - 1, True, alpha, beta, start_time, time_limit)
-                min_score = min(min_score, score)
+            best_score = float('inf')
+            for index, action in enumerate(valid_actions):
+                game.push(action)
+                score = self.minimax(game, depth - 1, True, alpha, beta, ply + 1,
+                                     follow_pv and index == 0 and pv_move is not None)
+                game.pop()
+                if score < best_score:
+                    best_score = score
+                    best_action = action
                 beta = min(beta, score)
                 if beta <= alpha:
                     break  # alpha剪枝
-            return min_score
+
+        if key is not None:
+            if best_score <= alpha_orig:
+                bound = UPPER_BOUND
+            elif best_score >= beta_orig:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            self.tt.store(key, depth, bound, score_to_tt(best_score, ply), best_action)
+        return best_score
 
     def evaluate(self, game):
-        board = game.board
-        player = self.player_id
-        opponent = 2 if player == 1 else 1
-        board_size = game.board_size
-        center = board_size // 2
-        def count_n_in_a_row(board, player, n):
-            count = 0
-            for i in range(board_size):
-                for j in range(board_size):
-                    if board[i, j] != player:
-                        continue
-                    for dx, dy in [(1,0),(0,1),(1,1),(1,-1)]:
-                        c = 1
-                        for k in range(1, n):
-                            x, y = i+dx*k, j+dy*k
-                            if 0<=x<board_size and 0<=y<board_size and board[x, y]==player:
-                                c += 1
-                            else:
-                                break
-                        if c == n:
-                            # 检查两端是否被堵死
-                            x1, y1 = i-dx, j-dy
-                            x2, y2 = i+dx*n, j+dy*n
-                            blocked = 0
-                            if not (0<=x1<board_size and 0<=y1<board_size) or (board[x1, y1] != 0):
-                                blocked += 1
-                            if not (0<=x2<board_size and 0<=y2<board_size) or (board[x2, y2] != 0):
-                                blocked += 1
-                            if blocked < 2:
-                                count += 1
-            return count
-        def center_score(board, player):
-            score = 0
-            for i in range(board_size):
-                for j in range(board_size):
-                    if board[i, j] == player:
-                        score += max(7 - abs(i - center), 0) + max(7 - abs(j - center), 0)
-            return score
-        score = 0
-        score += 100000 * count_n_in_a_row(board, player, 5)
-        score += 10000 * count_n_in_a_row(board, player, 4)
-        score += 1000 * count_n_in_a_row(board, player, 3)
-        score += 10 * center_score(board, player)
-        score -= 10000 * count_n_in_a_row(board, opponent, 4)
-        score -= 1000 * count_n_in_a_row(board, opponent, 3)
-        return score
+        """棋型评估：己方棋型加分、对方棋型减分，外加中心分"""
+        if hasattr(game, 'evaluate'):
+            # 游戏随push/pop增量维护棋型表，叶子评估只需O(1)读取
+            return game.evaluate(self.player_id)
+        return evaluate_board(game.board, self.player_id)
 
     def count_consecutive(self, game, player):
         board = game.board
@@ -139,4 +252,26 @@ class MinimaxBot(BaseAgent):
                             else:
                                 break
                         count += c
-        return count 
\ No newline at end of file
+        return count 
+
+    def reset(self):
+        """重置Minimax Bot（清空置换表）"""
+        super().reset()
+        self.tt.clear()
+
+    def get_info(self):
+        """获取Minimax Bot信息"""
+        info = super().get_info()
+        info.update({
+            'type': 'Minimax',
+            'description': '使用迭代加深、Alpha-Beta剪枝和置换表的Minimax Bot',
+            'max_depth': self.max_depth,
+            'time_limit': self.time_limit,
+            'last_depth': self.last_depth,
+            'last_score': self.last_score,
+            'last_pv': self.last_pv,
+            'last_search_time': self.last_search_time,
+            'nodes': self.nodes,
+            'transposition_table': self.tt.get_stats()
+        })
+        return info
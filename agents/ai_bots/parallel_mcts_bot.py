@@ -0,0 +1,211 @@
+"""
+并行MCTS Bot
+在MCTSBot的选择/扩展/模拟/回传流程上使用常驻进程池：
+根并行（各进程独立建树，合并根节点访问数）和叶并行（共享一棵树，虚拟损失）
+"""
+
+import multiprocessing
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from agents.ai_bots.mcts_bot import MCTSBot
+from agents.ai_bots.mcts_tree import ROOT
+import config
+
+# 工作进程内常驻的MCTSBot，由进程池的initializer创建
+_worker_bot = None
+# 叶并行时工作进程缓存的根局面: (搜索编号, 局面)
+_worker_root = None
+
+
+def _task_seed(*keys: int) -> int:
+    """由配置的种子和任务编号导出随机种子，与任务落在哪个进程上无关"""
+    return int(np.random.SeedSequence(list(keys)).generate_state(1)[0])
+
+
+def _init_worker(settings: Dict[str, Any], counter):
+    """工作进程初始化：按创建顺序取得进程编号，按主进程的参数创建一个本地MCTSBot"""
+    global _worker_bot
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    random.seed(_task_seed(settings['seed'], index))
+    bot = MCTSBot(player_id=settings['player_id'], simulation_policy=settings['simulation_policy'],
+                  prior_policy=settings['prior_policy'])
+    bot.ucb_c = settings['ucb_c']
+    bot.puct_c = settings['puct_c']
+    bot.candidate_radius = settings['candidate_radius']
+    bot.reuse_tree = False
+    _worker_bot = bot
+
+
+def _root_search(game, simulation_count: int, timeout: float, seed: int) -> List[Tuple[Any, int, float]]:
+    """根并行任务：在工作进程里独立搜索一棵树，返回根节点各子节点的 (动作, 访问数, 累计价值)"""
+    random.seed(seed)
+    bot = _worker_bot
+    bot.simulation_count = simulation_count
+    bot.timeout = timeout
+    tree = bot.tree
+    tree.reset(root_terminal=game.is_terminal())
+    bot._search(game, time.time())
+    return [(tree.get_action(child), int(tree.visits[child]), float(tree.value[child]))
+            for child in tree.children(ROOT)]
+
+
+def _simulate_leaves(search_id: int, root_data: bytes, paths: List[List[Any]], seed: int) -> List[float]:
+    """
+    叶并行任务：从根局面沿每条动作序列走到叶子各模拟一次，返回本Bot视角的结果列表
+
+    根局面每次搜索只序列化一次，工作进程按搜索编号缓存反序列化后的局面，走到叶子后再pop回根。
+    """
+    global _worker_root
+    if _worker_root is None or _worker_root[0] != search_id:
+        _worker_root = (search_id, pickle.loads(root_data))
+    game = _worker_root[1]
+    random.seed(seed)
+    results = []
+    for path in paths:
+        for action in path:
+            game.push(action)
+        results.append(_worker_bot._simulate(None, game))
+        for _ in path:
+            game.pop()
+    return results
+
+
+class ParallelMCTSBot(MCTSBot):
+    """并行MCTS Bot"""
+
+    def __init__(self, name: str = "ParallelMCTSBot", player_id: int = 1,
+                 num_workers: int = None, parallel_mode: str = None, seed: int = 0, **kwargs):
+        super().__init__(name, player_id, **kwargs)
+        ai_config = config.AI_CONFIGS.get('mcts', {})
+        self.num_workers = num_workers or ai_config.get('num_workers', 4)
+        self.parallel_mode = parallel_mode or ai_config.get('parallel_mode', 'root')
+        self.leaf_batch = ai_config.get('leaf_batch', 4)
+        self.seed = seed
+        if self.parallel_mode not in ('root', 'leaf'):
+            raise ValueError(f"不支持的并行模式: {self.parallel_mode}")
+        if self.parallel_mode == 'root':
+            # 根并行的树在工作进程里，主进程没有可复用的树
+            self.reuse_tree = False
+        self._pool = None
+        self._moves = 0
+        self._searches = 0
+        self.last_simulations = 0
+        self.last_search_time = 0.0
+
+    def get_action(self, observation: Any, env: Any) -> Any:
+        """使用并行MCTS选择动作"""
+        self._moves += 1
+        start_time = time.time()
+        if self.parallel_mode == 'root':
+            action = self._root_parallel_action(env.game)
+        else:
+            action = super().get_action(observation, env)
+            self.last_simulations = int(self.tree.visits[ROOT])
+        self.last_search_time = time.time() - start_time
+        return action
+
+    def _root_parallel_action(self, env_game):
+        """根并行：模拟次数按进程均分（余数分给前几个进程，总数不变），合并各棵树根节点的访问数"""
+        game = env_game.clone()
+        if game.is_terminal():
+            return None
+        pool = self._get_pool()
+        base, extra = divmod(self.simulation_count, self.num_workers)
+        budgets = [base + (worker < extra) for worker in range(self.num_workers)]
+        futures = [pool.submit(_root_search, game, budget, self.timeout, _task_seed(self.seed, self._moves, worker))
+                   for worker, budget in enumerate(budgets) if budget]
+        visits: Dict[Any, int] = {}
+        for future in futures:
+            for action, child_visits, _ in future.result():
+                visits[action] = visits.get(action, 0) + child_visits
+        self.last_simulations = sum(visits.values())
+        if not visits:
+            return None
+        return max(visits, key=visits.get)
+
+    def _search(self, game, start_time):
+        """
+        叶并行：每轮用虚拟损失选出一批叶子，按每进程leaf_batch个分组交给进程池并行模拟后统一回传
+
+        任务里只有从根到叶子的动作序列，根局面每次搜索序列化一次；每组任务的种子由配置的种子、
+        落子序号、搜索编号和组号确定。
+        """
+        pool = self._get_pool()
+        tree = self.tree
+        self._searches += 1
+        root_data = pickle.dumps(game)
+        batch_size = self.num_workers * self.leaf_batch
+        done = 0
+        batch = 0
+        while done < self.simulation_count and time.time() - start_time <= self.timeout:
+            leaves = self._select_leaves(game, min(batch_size, self.simulation_count - done), clone=False)
+            paths = [tree.path(node) for node, _ in leaves]
+            futures = [pool.submit(_simulate_leaves, self._searches, root_data, paths[start:start + self.leaf_batch],
+                                   _task_seed(self.seed, self._moves, self._searches, batch, start))
+                       for start in range(0, len(paths), self.leaf_batch)]
+            self._backpropagate_leaves(leaves, [result for future in futures for result in future.result()])
+            done += len(leaves)
+            batch += 1
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """获取常驻进程池（第一次使用时创建）"""
+        if self._pool is None:
+            # 默认模拟策略是绑定方法，不随任务传输，由工作进程自己的MCTSBot提供
+            policy = self.simulation_policy
+            if getattr(policy, '__self__', None) is self:
+                policy = None
+            settings = {
+                'player_id': self.player_id,
+                'simulation_policy': policy,
+                'prior_policy': self.prior_policy,
+                'ucb_c': self.ucb_c,
+                'puct_c': self.puct_c,
+                'candidate_radius': self.candidate_radius,
+                'seed': self.seed,
+            }
+            # 进程编号计数器：工作进程的初始种子只取决于配置的种子和进程编号
+            counter = multiprocessing.Value('i', 0)
+            self._pool = ProcessPoolExecutor(max_workers=self.num_workers, initializer=_init_worker,
+                                             initargs=(settings, counter))
+        return self._pool
+
+    def close(self, wait: bool = True):
+        """关闭进程池（之后再搜索会重新创建）"""
+        pool = getattr(self, '_pool', None)
+        if pool is not None:
+            self._pool = None
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def reset(self):
+        """重置Bot并关闭进程池"""
+        super().reset()
+        self.close()
+
+    def __enter__(self) -> 'ParallelMCTSBot':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def __del__(self):
+        # 没有显式close时，Bot被回收的同时关闭进程池，不留下工作进程
+        self.close(wait=False)
+
+    def get_info(self) -> Dict[str, Any]:
+        """获取并行MCTS Bot信息"""
+        info = super().get_info()
+        info.update({
+            'type': 'ParallelMCTS',
+            'description': '使用进程池并行模拟的蒙特卡洛树搜索Bot',
+            'num_workers': self.num_workers,
+            'parallel_mode': self.parallel_mode,
+            'last_simulations': self.last_simulations,
+            'last_search_time': self.last_search_time,
+        })
+        return info
@@ -1,5 +1,6 @@
 import random
 from agents.base_agent import BaseAgent
+from games.gomoku.gomoku_patterns import move_run_lengths
 import numpy as np
 
 class RuleBasedGomokuBot(BaseAgent):
@@ -10,31 +11,25 @@ class RuleBasedGomokuBot(BaseAgent):
         board_size = board.shape[0]
         valid_actions = env.get_valid_actions()
         center = (board_size // 2, board_size // 2)
+        game = getattr(env, 'game', None)
+        if hasattr(game, 'get_winning_moves') and game.win_length == 5:
+            # 1. 自己五连  2. 对手五连：直接读游戏增量维护的冲四/活四窗口
+            for who in (player, opponent):
+                moves = game.get_winning_moves(who)
+                if moves:
+                    return moves[0]
+            lengths = (4, 3)
+        else:
+            lengths = (5, 4, 3)
+        # 一次算出每个空位落子后双方能连成的最长长度
+        runs = {player: move_run_lengths(board, player), opponent: move_run_lengths(board, opponent)}
 
-        # 1. 自己五连
-        for move in valid_actions:
-            if self._forms_n_in_a_row(board, move, player, 5):
-                return move
-        # 2. 对手五连
-        for move in valid_actions:
-            if self._forms_n_in_a_row(board, move, opponent, 5):
-                return move
-        # 3. 自己四连
-        for move in valid_actions:
-            if self._forms_n_in_a_row(board, move, player, 4):
-                return move
-        # 4. 对手四连
-        for move in valid_actions:
-            if self._forms_n_in_a_row(board, move, opponent, 4):
-                return move
-        # 5. 自己三连
-        for move in valid_actions:
-            if self._forms_n_in_a_row(board, move, player, 3):
-                return move
-        # 6. 对手三连
-        for move in valid_actions:
-            if self._forms_n_in_a_row(board, move, opponent, 3):
-                return move
+        # 1. 自己五连  2. 对手五连  3. 自己四连  4. 对手四连  5. 自己三连  6. 对手三连
+        for n in lengths:
+            for who in (player, opponent):
+                move = self._first_run_move(runs[who], n)
+                if move is not None:
+                    return move
         # 7. 中心优先
         if center in valid_actions:
             return center
@@ -44,23 +39,9 @@ class RuleBasedGomokuBot(BaseAgent):
         valid_actions.sort(key=dist2center)
         return valid_actions[0]
 
-    def _forms_n_in_a_row(self, board, move, player, n):
-        # 检查在move落子后，player能否形成n连
-        board_size = board.shape[0]
-        row, col = move
-        if board[row, col] != 0:
-            return False
-        directions = [(1,0),(0,1),(1,1),(1,-1)]
-        for dx, dy in directions:
-            count = 1
-            for d in [1, -1]:
-                for k in range(1, n):
-                    x = row + dx * k * d
-                    y = col + dy * k * d
-                    if 0 <= x < board_size and 0 <= y < board_size and board[x, y] == player:
-                        count += 1
-                    else:
-                        break
-            if count >= n:
-                return True
-        return False 
\ No newline at end of file
+    def _first_run_move(self, runs, n):
+        # 按行优先顺序返回第一个落子后能形成n连的空位
+        cells = np.flatnonzero(runs >= n)
+        if len(cells) == 0:
+            return None
+        return tuple(int(x) for x in divmod(int(cells[0]), runs.shape[1]))
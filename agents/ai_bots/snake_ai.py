@@ -5,6 +5,7 @@
 import random
 import numpy as np
 from agents.base_agent import BaseAgent
+from agents.ai_bots.grid_search import GridSearch
 
 class SnakeAI(BaseAgent):
     """贪吃蛇AI智能体"""
@@ -102,7 +103,7 @@ class SnakeAI(BaseAgent):
             return False
         
         # 检查是否撞到蛇身
-        if new_head in game.snake1[:-1] or new_head in game.snake2[:-1]:
+        if game.is_body(new_head):
             return False
         
         return True
@@ -113,6 +114,7 @@ class SmartSnakeAI(BaseAgent):
     
     def __init__(self, name="SmartSnakeAI", player_id=1):
         super().__init__(name, player_id)
+        self._search = None
     
     def get_action(self, observation, env):
         """A*寻路+安全性评估+对手预测+策略优化"""
@@ -120,44 +122,41 @@ class SmartSnakeAI(BaseAgent):
         if not valid_actions:
             return None
         game = env.game
-        if self.player_id == 1:
-            snake = game.snake1
-            current_direction = game.direction1
-            opponent_snake = game.snake2
-        else:
-            snake = game.snake2
-            current_direction = game.direction2
-            opponent_snake = game.snake1
+        snake = game.snake1 if self.player_id == 1 else game.snake2
         if not snake:
             return random.choice(valid_actions)
         head = snake[0]
-        opponent_head = opponent_snake[0] if opponent_snake else None
+        # 障碍为两条蛇身（不含尾部）和对手头部；各动作落点的可达空间一次算出，0表示不安全
+        search = self._grid_search(game)
+        search.load(game, self.player_id)
+        spaces = dict(zip(valid_actions, search.move_areas(head, valid_actions)))
         # 1. A*寻路到最近食物
         if game.foods:
             target_food = self._find_nearest_food(head, game.foods)
-            path = self._a_star_pathfinding(head, target_food, game, opponent_head)
+            path = search.astar(head, target_food)
             if path and len(path) > 1:
-                next_pos = path[1]
-                action = self._pos_to_action(head, next_pos)
+                action = self._pos_to_action(head, path[1])
                 # 2. 安全性评估：落点空间足够大且不会和对手头部正面冲突
-                if (action in valid_actions and
-                    self._is_safe_action(action, head, game, opponent_head) and
-                    self._space_after_move(head, action, game, opponent_head) >= max(5, len(snake))):
+                if spaces.get(action, 0) >= max(5, len(snake)):
                     return action
         # 3. 策略优化：选择最大生存空间的安全动作
         best_action = None
-        max_space = -1
+        max_space = 0
         for action in valid_actions:
-            if self._is_safe_action(action, head, game, opponent_head):
-                space = self._space_after_move(head, action, game, opponent_head)
-                if space > max_space:
-                    max_space = space
-                    best_action = action
+            if spaces[action] > max_space:
+                max_space = spaces[action]
+                best_action = action
         if best_action:
             return best_action
         # 4. 实在无路，随机
         return random.choice(valid_actions)
 
+    def _grid_search(self, game):
+        """按棋盘大小复用搜索缓冲区"""
+        if self._search is None or self._search.board_size != game.board_size:
+            self._search = GridSearch(game.board_size)
+        return self._search
+
     def _find_nearest_food(self, head, foods):
         min_distance = float('inf')
         nearest_food = foods[0]
@@ -168,86 +167,7 @@ class SmartSnakeAI(BaseAgent):
                 nearest_food = food
         return nearest_food
 
-    def _a_star_pathfinding(self, start, goal, game, opponent_head=None):
-        from heapq import heappush, heappop
-        def heuristic(a, b):
-            return abs(a[0] - b[0]) + abs(a[1] - b[1])
-        def get_neighbors(pos):
-            x, y = pos
-            neighbors = []
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if (0 <= nx < game.board_size and 0 <= ny < game.board_size):
-                    # 允许撞到尾部（尾部会移动），但不能撞到身体
-                    if ((nx, ny) not in game.snake1[:-1] and 
-                        (nx, ny) not in game.snake2[:-1]):
-                        # 对手预测：避免和对手头部正面冲突
-                        if opponent_head and (nx, ny) == opponent_head:
-                            continue
-                        neighbors.append((nx, ny))
-            return neighbors
-        open_set = [(0, start)]
-        came_from = {}
-        g_score = {start: 0}
-        f_score = {start: heuristic(start, goal)}
-        while open_set:
-            current = heappop(open_set)[1]
-            if current == goal:
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.append(start)
-                return path[::-1]
-            for neighbor in get_neighbors(current):
-                tentative_g = g_score[current] + 1
-                if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    f_score[neighbor] = tentative_g + heuristic(neighbor, goal)
-                    heappush(open_set, (f_score[neighbor], neighbor))
-        return None
-
     def _pos_to_action(self, current_pos, next_pos):
         dx = next_pos[0] - current_pos[0]
         dy = next_pos[1] - current_pos[1]
         return (dx, dy)
-
-    def _is_safe_action(self, action, head, game, opponent_head=None):
-        direction = action
-        new_head = (head[0] + direction[0], head[1] + direction[1])
-        # 边界
-        if (new_head[0] < 0 or new_head[0] >= game.board_size or
-            new_head[1] < 0 or new_head[1] >= game.board_size):
-            return False
-        # 撞到身体
-        if new_head in game.snake1[:-1] or new_head in game.snake2[:-1]:
-            return False
-        # 对手预测：避免和对手头部正面冲突
-        if opponent_head and new_head == opponent_head:
-            return False
-        return True
-
-    def _space_after_move(self, head, action, game, opponent_head=None):
-        """BFS评估落点可达空间（安全性评估）"""
-        from collections import deque
-        visited = set()
-        queue = deque()
-        new_head = (head[0] + action[0], head[1] + action[1])
-        queue.append(new_head)
-        visited.add(new_head)
-        body_blocks = set(game.snake1[:-1] + game.snake2[:-1])
-        if opponent_head:
-            body_blocks.add(opponent_head)
-        count = 0
-        while queue:
-            pos = queue.popleft()
-            count += 1
-            for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:
-                nx, ny = pos[0]+dx, pos[1]+dy
-                npos = (nx, ny)
-                if (0 <= nx < game.board_size and 0 <= ny < game.board_size and
-                    npos not in visited and npos not in body_blocks):
-                    visited.add(npos)
-                    queue.append(npos)
-        return count 
\ No newline at end of file
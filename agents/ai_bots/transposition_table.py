@@ -0,0 +1,110 @@
+"""
+置换表
+缓存搜索过的局面（按Zobrist哈希索引），用于剪枝和着法排序
+"""
+
+import sys
+from typing import Dict, Any, Optional, Tuple
+
+# 边界类型
+EXACT = 0        # 精确值
+LOWER_BOUND = 1  # 发生beta截断，真实值 >= score
+UPPER_BOUND = 2  # 没有超过alpha，真实值 <= score
+
+
+class TranspositionTable:
+    """
+    固定容量置换表
+
+    槽位由哈希低位直接定位，每个槽位只存一个局面。
+    替换策略：空槽或同一局面直接写入；来自旧搜索的条目总是被替换；
+    同一次搜索内只有深度不低于原条目时才覆盖（深度优先）。
+    """
+
+    def __init__(self, size: int = 1 << 18):
+        # 容量取不小于size的2的幂，方便用掩码定位槽位
+        capacity = 1
+        while capacity < size:
+            capacity <<= 1
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._keys = [None] * capacity
+        # 条目: (depth, bound, score, best_move, generation)
+        self._entries = [None] * capacity
+        self.generation = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """清零统计计数"""
+        self.used = sum(1 for key in self._keys if key is not None)
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+        self.rejected = 0
+
+    def new_search(self):
+        """开始新一次搜索，旧条目降为可替换"""
+        self.generation += 1
+
+    def clear(self):
+        """清空置换表"""
+        self._keys = [None] * self.capacity
+        self._entries = [None] * self.capacity
+        self.reset_stats()
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, float, Any, int]]:
+        """查询局面，命中返回条目，否则返回None"""
+        self.probes += 1
+        index = key & self._mask
+        if self._keys[index] == key:
+            self.hits += 1
+            return self._entries[index]
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: float, best_move: Any = None):
+        """写入局面，按替换策略决定是否覆盖已有条目"""
+        index = key & self._mask
+        old_key = self._keys[index]
+        if old_key is None:
+            self.used += 1
+        elif old_key != key:
+            old = self._entries[index]
+            if old[4] == self.generation and depth < old[0]:
+                self.rejected += 1
+                return
+            self.overwrites += 1
+        elif best_move is None:
+            # 同一局面的浅层结果没有着法时，保留原来的最佳着法用于排序
+            best_move = self._entries[index][3]
+        self._keys[index] = key
+        self._entries[index] = (depth, bound, score, best_move, self.generation)
+        self.stores += 1
+
+    def best_move(self, key: int) -> Any:
+        """只取最佳着法（不计入命中统计）"""
+        index = key & self._mask
+        if self._keys[index] == key:
+            return self._entries[index][3]
+        return None
+
+    def memory_bytes(self) -> int:
+        """估算占用内存（槽位数组 + 已用条目）"""
+        sample = (0, EXACT, 0.0, (0, 0), 0)
+        entry_bytes = sys.getsizeof(sample) + sys.getsizeof(sample[3]) + sys.getsizeof(1 << 63)
+        return sys.getsizeof(self._keys) + sys.getsizeof(self._entries) + self.used * entry_bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中率和内存统计"""
+        return {
+            'capacity': self.capacity,
+            'used': self.used,
+            'fill_rate': self.used / self.capacity,
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / max(1, self.probes),
+            'stores': self.stores,
+            'overwrites': self.overwrites,
+            'rejected': self.rejected,
+            'memory_bytes': self.memory_bytes(),
+        }
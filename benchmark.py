@@ -0,0 +1,923 @@
+#!/usr/bin/env python3
+"""
+性能基准测试脚本
+用于测量游戏引擎和AI核心路径的吞吐量
+"""
+
+import argparse
+import math
+import random
+import time
+from typing import Dict, List, Any
+
+from games.gomoku import GomokuGame, BitboardGomokuGame
+from games.gomoku.gomoku_patterns import evaluate_board
+
+
+def _random_move_sequences(board_size: int, num_games: int, seed: int) -> List[List[tuple]]:
+    """生成固定种子的随机落子序列，保证对比双方走相同的棋"""
+    rng = random.Random(seed)
+    cells = [(i, j) for i in range(board_size) for j in range(board_size)]
+    sequences = []
+    for _ in range(num_games):
+        moves = cells[:]
+        rng.shuffle(moves)
+        sequences.append(moves)
+    return sequences
+
+
+def _legacy_step(game: GomokuGame, action: tuple):
+    """旧版step的代价：落子后做三次全盘扫描（is_terminal + 两次get_winner）"""
+    row, col = action
+    game.board[row, col] = game.current_player
+    game.history.append((game.current_player, (row, col)))
+    game.move_count += 1
+    winner = game._scan_winner()
+    done = winner is not None or game.move_count >= game.board_size * game.board_size
+    game._scan_winner()
+    game._scan_winner()
+    game.switch_player()
+    return game.get_state(), 0, done, {}
+
+
+def bench_gomoku_step(board_sizes=(15, 19), num_games: int = 20, seed: int = 0) -> Dict[str, Any]:
+    """五子棋每秒落子数：全盘扫描判胜 vs 最后一步增量判胜"""
+    results = {}
+    for board_size in board_sizes:
+        sequences = _random_move_sequences(board_size, num_games, seed)
+        row = {}
+        for label, step_fn in (('full_scan', _legacy_step), ('incremental', GomokuGame.step)):
+            game = GomokuGame(board_size=board_size)
+            moves = 0
+            start = time.perf_counter()
+            for sequence in sequences:
+                game.reset()
+                for action in sequence:
+                    moves += 1
+                    _, _, done, _ = step_fn(game, action)
+                    if done:
+                        break
+            elapsed = time.perf_counter() - start
+            row[label] = moves / elapsed
+        row['speedup'] = row['incremental'] / row['full_scan']
+        results[f'{board_size}x{board_size}'] = row
+        print(f"{board_size}x{board_size}: 全盘扫描 {row['full_scan']:.0f} 步/秒, "
+              f"增量判胜 {row['incremental']:.0f} 步/秒, 加速 {row['speedup']:.1f}x")
+    return results
+
+
+def bench_gomoku_clone(board_size: int = 15, num_positions: int = 20, opening_moves: int = 20,
+                       seed: int = 0) -> Dict[str, Any]:
+    """克隆密集型搜索每秒节点数：numpy棋盘 vs 位棋盘（每个子节点 clone + step）"""
+    sequences = _random_move_sequences(board_size, num_positions, seed)
+    results = {}
+    for label, game_cls in (('numpy', GomokuGame), ('bitboard', BitboardGomokuGame)):
+        positions = []
+        for sequence in sequences:
+            game = game_cls(board_size=board_size)
+            for action in sequence[:opening_moves]:
+                game.step(action)
+            positions.append(game)
+        nodes = 0
+        start = time.perf_counter()
+        for game in positions:
+            for action in game.get_valid_actions():
+                child = game.clone()
+                child.step(action)
+                nodes += 1
+        results[label] = nodes / (time.perf_counter() - start)
+    results['speedup'] = results['bitboard'] / results['numpy']
+    print(f"{board_size}x{board_size}: numpy棋盘 {results['numpy']:.0f} 节点/秒, "
+          f"位棋盘 {results['bitboard']:.0f} 节点/秒, 加速 {results['speedup']:.1f}x")
+    return results
+
+
+def _perft_clone(game, depth: int) -> int:
+    """克隆路径：每个子节点 clone + step"""
+    if depth == 0 or game.is_terminal():
+        return 1
+    nodes = 1
+    for action in game.get_valid_actions():
+        child = game.clone()
+        child.step(action)
+        nodes += _perft_clone(child, depth - 1)
+    return nodes
+
+
+def _perft_push(game, depth: int) -> int:
+    """make/unmake路径：同一个局面上 push + pop"""
+    if depth == 0 or game.is_terminal():
+        return 1
+    nodes = 1
+    for action in game.get_valid_actions():
+        game.push(action)
+        nodes += _perft_push(game, depth - 1)
+        game.pop()
+    return nodes
+
+
+def bench_search_push(board_size: int = 15, depth: int = 2, opening_moves: int = 40,
+                      seed: int = 0) -> Dict[str, Any]:
+    """全宽度搜索每秒节点数：clone+step vs push/pop"""
+    sequence = _random_move_sequences(board_size, 1, seed)[0]
+    results = {}
+    for game_cls in (GomokuGame, BitboardGomokuGame):
+        game = game_cls(board_size=board_size)
+        for action in sequence[:opening_moves]:
+            game.step(action)
+        row = {}
+        for label, perft in (('clone', _perft_clone), ('push_pop', _perft_push)):
+            start = time.perf_counter()
+            nodes = perft(game, depth)
+            row[label] = nodes / (time.perf_counter() - start)
+        row['speedup'] = row['push_pop'] / row['clone']
+        results[game_cls.__name__] = row
+        print(f"{game_cls.__name__} 深度{depth}: clone {row['clone']:.0f} 节点/秒, "
+              f"push/pop {row['push_pop']:.0f} 节点/秒, 加速 {row['speedup']:.1f}x")
+    return results
+
+
+def _perft_candidates(game, depth: int, radius: int) -> int:
+    """只展开邻域候选着法的make/unmake路径"""
+    if depth == 0 or game.is_terminal():
+        return 1
+    nodes = 1
+    for action in game.get_candidate_actions(radius):
+        game.push(action)
+        nodes += _perft_candidates(game, depth - 1, radius)
+        game.pop()
+    return nodes
+
+
+def bench_candidate_moves(board_size: int = 15, depth: int = 2, opening_moves: int = 10,
+                          radius: int = 2, seed: int = 0) -> Dict[str, Any]:
+    """分支因子和固定深度搜索耗时：全部空位 vs 棋子邻域候选"""
+    rng = random.Random(seed)
+    game = GomokuGame(board_size=board_size)
+    center = board_size // 2
+    game.push((center, center))
+    # 开局在中心附近落子，模拟实战中的局面
+    while game.move_count < opening_moves:
+        game.push(rng.choice(game.get_candidate_actions(1)))
+    results = {
+        'full_branching': len(game.get_valid_actions()),
+        'candidate_branching': len(game.get_candidate_actions(radius)),
+    }
+    for label, perft in (('full', lambda g: _perft_push(g, depth)),
+                         ('candidate', lambda g: _perft_candidates(g, depth, radius))):
+        start = time.perf_counter()
+        nodes = perft(game)
+        results[f'{label}_nodes'] = nodes
+        results[f'{label}_time'] = time.perf_counter() - start
+    results['speedup'] = results['full_time'] / results['candidate_time']
+    print(f"{board_size}x{board_size} {opening_moves}手后: 分支因子 {results['full_branching']} -> "
+          f"{results['candidate_branching']}, 深度{depth}节点 {results['full_nodes']} -> "
+          f"{results['candidate_nodes']}, 耗时加速 {results['speedup']:.1f}x")
+    return results
+
+
+def _legacy_evaluate(board, player: int) -> int:
+    """旧版MinimaxBot.evaluate：纯Python四重循环数n连"""
+    opponent = 2 if player == 1 else 1
+    board_size = board.shape[0]
+    center = board_size // 2
+    def count_n_in_a_row(board, player, n):
+        count = 0
+        for i in range(board_size):
+            for j in range(board_size):
+                if board[i, j] != player:
+                    continue
+                for dx, dy in [(1,0),(0,1),(1,1),(1,-1)]:
+                    c = 1
+                    for k in range(1, n):
+                        x, y = i+dx*k, j+dy*k
+                        if 0<=x<board_size and 0<=y<board_size and board[x, y]==player:
+                            c += 1
+                        else:
+                            break
+                    if c == n:
+                        x1, y1 = i-dx, j-dy
+                        x2, y2 = i+dx*n, j+dy*n
+                        blocked = 0
+                        if not (0<=x1<board_size and 0<=y1<board_size) or (board[x1, y1] != 0):
+                            blocked += 1
+                        if not (0<=x2<board_size and 0<=y2<board_size) or (board[x2, y2] != 0):
+                            blocked += 1
+                        if blocked < 2:
+                            count += 1
+        return count
+    def center_score(board, player):
+        score = 0
+        for i in range(board_size):
+            for j in range(board_size):
+                if board[i, j] == player:
+                    score += max(7 - abs(i - center), 0) + max(7 - abs(j - center), 0)
+        return score
+    score = 0
+    score += 100000 * count_n_in_a_row(board, player, 5)
+    score += 10000 * count_n_in_a_row(board, player, 4)
+    score += 1000 * count_n_in_a_row(board, player, 3)
+    score += 10 * center_score(board, player)
+    score -= 10000 * count_n_in_a_row(board, opponent, 4)
+    score -= 1000 * count_n_in_a_row(board, opponent, 3)
+    return score
+
+
+def bench_leaf_eval(board_size: int = 15, num_positions: int = 50, stones: int = 40,
+                    seed: int = 0) -> Dict[str, Any]:
+    """局面评估每秒次数：纯Python循环 vs 查找表棋型识别"""
+    sequences = _random_move_sequences(board_size, num_positions, seed)
+    boards = []
+    for sequence in sequences:
+        game = GomokuGame(board_size=board_size)
+        for action in sequence[:stones]:
+            game.push(action)
+        boards.append(game.board.copy())
+    results = {}
+    for label, evaluate in (('legacy', _legacy_evaluate), ('patterns', evaluate_board)):
+        start = time.perf_counter()
+        for board in boards:
+            evaluate(board, 1)
+        results[label] = len(boards) / (time.perf_counter() - start)
+    results['speedup'] = results['patterns'] / results['legacy']
+    print(f"{board_size}x{board_size} {stones}子: 纯Python评估 {results['legacy']:.0f} 次/秒, "
+          f"棋型查找表 {results['patterns']:.0f} 次/秒, 加速 {results['speedup']:.1f}x")
+    return results
+
+
+def _perft_eval(game, depth: int, evaluate) -> int:
+    """带叶子评估的make/unmake搜索，只展开邻域候选着法"""
+    if depth == 0 or game.is_terminal():
+        evaluate(game)
+        return 1
+    nodes = 1
+    for action in game.get_candidate_actions(2):
+        game.push(action)
+        nodes += _perft_eval(game, depth - 1, evaluate)
+        game.pop()
+    return nodes
+
+
+def bench_incremental_eval(board_size: int = 15, depth: int = 2, opening_moves: int = 20,
+                           seed: int = 0) -> Dict[str, Any]:
+    """带评估的搜索每秒节点数：叶子全盘棋型识别 vs 随push/pop增量维护的棋型表"""
+    rng = random.Random(seed)
+    game = GomokuGame(board_size=board_size)
+    while game.move_count < opening_moves:
+        game.push(rng.choice(game.get_candidate_actions(1)))
+    results = {}
+    for label, evaluate in (('full_board', lambda g: evaluate_board(g.board, 1)),
+                            ('incremental', lambda g: g.evaluate(1))):
+        search_game = game.clone()
+        start = time.perf_counter()
+        nodes = _perft_eval(search_game, depth, evaluate)
+        results[label] = nodes / (time.perf_counter() - start)
+    results['speedup'] = results['incremental'] / results['full_board']
+    print(f"{board_size}x{board_size} 深度{depth}: 全盘评估 {results['full_board']:.0f} 节点/秒, "
+          f"增量棋型表 {results['incremental']:.0f} 节点/秒, 加速 {results['speedup']:.1f}x")
+    return results
+
+
+def bench_mcts_tree(board_sizes=(9, 15), simulations: int = 2000, seed: int = 0) -> Dict[str, Any]:
+    """MCTS树操作每秒模拟次数和树内存（模拟策略直接返回随机结果，只测树本身）"""
+    from agents.ai_bots.mcts_bot import MCTSBot
+    from games.gomoku import GomokuEnv
+
+    rng = random.Random(seed)
+    results = {}
+    for board_size in board_sizes:
+        env = GomokuEnv(board_size=board_size)
+        env.reset()
+        center = board_size // 2
+        env.step((center, center))
+        bot = MCTSBot(player_id=2, simulation_policy=lambda node, player_id: rng.choice((-1, 0, 1)))
+        bot.simulation_count = simulations
+        bot.timeout = float('inf')
+        start = time.perf_counter()
+        bot.get_action(None, env)
+        elapsed = time.perf_counter() - start
+        stats = bot.tree.get_stats()
+        row = {'simulations_per_sec': simulations / elapsed, 'nodes': stats['nodes'],
+               'memory_bytes': stats['memory_bytes']}
+        results[f'{board_size}x{board_size}'] = row
+        print(f"{board_size}x{board_size}: {row['simulations_per_sec']:.0f} 次模拟/秒, "
+              f"{row['nodes']} 个节点, 树内存 {row['memory_bytes'] / 1024:.0f} KB")
+    return results
+
+
+def _legacy_uct_select(parent_visits: int, visits: List[int], values: List[float], c: float) -> int:
+    """旧版UCB1选择：对象树上逐个子节点调用math.log和math.sqrt（统计量用Python列表模拟节点属性）"""
+    best_score = -float('inf')
+    best_child = None
+    for child in range(len(visits)):
+        if visits[child] == 0:
+            uct = float('inf')
+        else:
+            uct = (values[child] / visits[child] +
+                   c * math.sqrt(math.log(parent_visits + 1) / visits[child]))
+        if uct > best_score:
+            best_score = uct
+            best_child = child
+    return best_child
+
+
+def bench_uct_select(branching=(10, 50, 200, 500), repeats: int = 2000, seed: int = 0) -> Dict[str, Any]:
+    """每秒UCT选择次数：逐子节点Python循环 vs 向量化argmax（以及PUCT）"""
+    from agents.ai_bots.mcts_bot import MCTSBot
+    from agents.ai_bots.mcts_tree import MCTSTree, ROOT
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    results = {}
+    for width in branching:
+        tree = MCTSTree()
+        tree.reset()
+        tree.expand(ROOT, list(range(width)), rng.dirichlet(np.ones(width)))
+        tree.expand_all(ROOT)
+        tree.visits[1:width + 1] = rng.integers(1, 50, width)
+        tree.value[1:width + 1] = rng.uniform(-1, 1, width) * tree.visits[1:width + 1]
+        tree.visits[ROOT] = tree.visits[1:width + 1].sum()
+        ucb_bot = MCTSBot()
+        puct_bot = MCTSBot(prior_policy=MCTSBot.run_length_prior)
+        for bot in (ucb_bot, puct_bot):
+            bot.tree = tree
+        parent_visits = int(tree.visits[ROOT])
+        visits = tree.visits[1:width + 1].tolist()
+        values = tree.value[1:width + 1].tolist()
+        row = {}
+        for label, select in (('loop', lambda: _legacy_uct_select(parent_visits, visits, values, ucb_bot.ucb_c)),
+                              ('vectorized', lambda: ucb_bot._uct_select(ROOT)),
+                              ('puct', lambda: puct_bot._uct_select(ROOT))):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                select()
+            row[label] = repeats / (time.perf_counter() - start)
+        assert _legacy_uct_select(parent_visits, visits, values, ucb_bot.ucb_c) + 1 == ucb_bot._uct_select(ROOT)
+        row['speedup'] = row['vectorized'] / row['loop']
+        results[width] = row
+        print(f"{width}个子节点: 循环 {row['loop']:.0f} 次/秒, 向量化 {row['vectorized']:.0f} 次/秒 "
+              f"(加速 {row['speedup']:.1f}x), PUCT {row['puct']:.0f} 次/秒")
+    return results
+
+
+def bench_parallel_mcts(workers=(1, 2, 4, 8), simulations: int = 400, board_size: int = 9,
+                        seed: int = 0) -> Dict[str, Any]:
+    """并行MCTS每秒模拟次数随工作进程数的变化（根并行和叶并行）"""
+    import os
+    from agents.ai_bots.parallel_mcts_bot import ParallelMCTSBot
+    from games.gomoku import GomokuEnv
+
+    env = GomokuEnv(board_size=board_size)
+    env.reset()
+    rng = random.Random(seed)
+    for _ in range(6):
+        env.step(rng.choice(env.game.get_candidate_actions(1)))
+    print(f"CPU核数: {os.cpu_count()}")
+    results = {}
+    for mode in ('root', 'leaf'):
+        row = {}
+        for num_workers in workers:
+            bot = ParallelMCTSBot(player_id=env.game.current_player, num_workers=num_workers,
+                                  parallel_mode=mode, seed=seed)
+            bot.simulation_count = simulations
+            bot.timeout = float('inf')
+            bot.reuse_tree = False
+            bot.get_action(None, env)  # 预热：启动进程池
+            start = time.perf_counter()
+            bot.get_action(None, env)
+            row[num_workers] = bot.last_simulations / (time.perf_counter() - start)
+            bot.close()
+        results[mode] = row
+        print(f"{mode}并行: " + ", ".join(f"{n}进程 {rate:.0f} 次模拟/秒" for n, rate in row.items()))
+    return results
+
+
+def _legacy_rollout(state, player_id: int):
+    """旧版模拟策略：每步对双方各做一次全盘连子长度计算，再用push/pop走棋"""
+    from games.gomoku.gomoku_patterns import move_run_lengths
+    import numpy as np
+
+    board_size = state.board_size
+    center = (board_size // 2, board_size // 2)
+    opponent = 2 if player_id == 1 else 1
+    pushed = 0
+    while not state.is_terminal():
+        actions = state.get_valid_actions()
+        if not actions:
+            break
+        pushed += 1
+        board = state.board
+        own_runs = move_run_lengths(board, player_id)
+        opponent_runs = move_run_lengths(board, opponent)
+        for runs, n in ((own_runs, 5), (opponent_runs, 5), (own_runs, 4), (opponent_runs, 4)):
+            cells = np.flatnonzero(runs >= n)
+            if len(cells):
+                state.push(divmod(int(cells[0]), board_size))
+                break
+        else:
+            state.push(center if center in actions else random.choice(actions))
+    winner = state.get_winner()
+    for _ in range(pushed):
+        state.pop()
+    return winner
+
+
+def bench_rollout(board_sizes=(9, 15), num_rollouts: int = 100, opening_moves: int = 6,
+                  seed: int = 0) -> Dict[str, Any]:
+    """每秒模拟（rollout）次数：逐步全盘扫描的旧策略 vs 增量维护威胁点的快速模拟引擎"""
+    from games.gomoku.gomoku_rollout import rollout
+
+    results = {}
+    for board_size in board_sizes:
+        rng = random.Random(seed)
+        game = GomokuGame(board_size=board_size)
+        while game.move_count < opening_moves:
+            game.push(rng.choice(game.get_candidate_actions(1)))
+        row = {}
+        for label, simulate in (('legacy', _legacy_rollout), ('engine', rollout)):
+            random.seed(seed)
+            start = time.perf_counter()
+            for _ in range(num_rollouts):
+                simulate(game, 1)
+            row[label] = num_rollouts / (time.perf_counter() - start)
+        row['speedup'] = row['engine'] / row['legacy']
+        results[f'{board_size}x{board_size}'] = row
+        print(f"{board_size}x{board_size}: 旧模拟策略 {row['legacy']:.0f} 次/秒, "
+              f"快速模拟引擎 {row['engine']:.0f} 次/秒, 加速 {row['speedup']:.1f}x")
+    return results
+
+
+def bench_batch_rollout(board_sizes=(9, 15), batch_sizes=(1, 64, 256, 1024), opening_moves: int = 6,
+                        seed: int = 0) -> Dict[str, Any]:
+    """每秒模拟次数：逐局的快速模拟引擎 vs 同步推进K局的批量模拟"""
+    import numpy as np
+    from games.gomoku.gomoku_rollout import rollout, batch_rollout
+
+    results = {}
+    for board_size in board_sizes:
+        rng = random.Random(seed)
+        game = GomokuGame(board_size=board_size)
+        while game.move_count < opening_moves:
+            game.push(rng.choice(game.get_candidate_actions(1)))
+        row = {}
+        count = max(batch_sizes)
+        start = time.perf_counter()
+        for _ in range(count):
+            rollout(game, 1)
+        row['single'] = count / (time.perf_counter() - start)
+        generator = np.random.default_rng(seed)
+        for batch_size in batch_sizes:
+            start = time.perf_counter()
+            for _ in range(max(1, count // batch_size)):
+                batch_rollout([game] * batch_size, 1, generator)
+            row[batch_size] = max(1, count // batch_size) * batch_size / (time.perf_counter() - start)
+        results[f'{board_size}x{board_size}'] = row
+        print(f"{board_size}x{board_size}: 逐局 {row['single']:.0f} 次/秒, 批量 " +
+              ", ".join(f"K={k} {row[k]:.0f} 次/秒" for k in batch_sizes))
+    return results
+
+
+def bench_vec_env(batch_sizes=(1, 64, 1024), steps: int = 200, seed: int = 0) -> Dict[str, Any]:
+    """向量化环境每秒环境步数：逐个包装BaseEnv vs 纯NumPy实现（随机合法动作）"""
+    import numpy as np
+    from games.vec_env import make_vec_env, SnakeVecEnv
+
+    rng = np.random.default_rng(seed)
+
+    def gomoku_actions(masks):
+        # 每个棋盘在空位上随机取一个
+        flat = masks.reshape(len(masks), -1)
+        cells = np.where(flat, rng.random(flat.shape), -1).argmax(axis=1)
+        return np.stack(np.divmod(cells, masks.shape[-1]), axis=1)
+
+    def snake_actions(masks):
+        return SnakeVecEnv.DIRECTIONS[np.where(masks, rng.random(masks.shape), -1).argmax(axis=1)]
+
+    results = {}
+    for game_type, kwargs, choose in (('gomoku', {'board_size': 15}, gomoku_actions),
+                                      ('snake', {'board_size': 20}, snake_actions)):
+        for native in (False, True):
+            label = f"{game_type}_{'numpy' if native else 'sync'}"
+            row = {}
+            for batch_size in batch_sizes:
+                # 逐个包装的实现在大批量时太慢，按总步数缩短测试
+                count = steps if native else max(1, steps * 16 // batch_size)
+                env = make_vec_env(game_type, batch_size, native=native, **kwargs)
+                env.reset()
+                start = time.perf_counter()
+                for _ in range(count):
+                    env.step(choose(env.get_action_masks()))
+                row[batch_size] = count * batch_size / (time.perf_counter() - start)
+                env.close()
+            results[label] = row
+            print(f"{label}: " + ", ".join(f"B={b} {rate:.0f} 步/秒" for b, rate in row.items()))
+    return results
+
+
+def bench_async_vec_env(workers=(1, 2, 4), num_envs: int = 64, steps: int = 100,
+                        seed: int = 0) -> Dict[str, Any]:
+    """包装BaseEnv的向量化环境每秒步数：同进程 vs 多进程共享内存（随机动作的贪吃蛇）"""
+    import os
+    import numpy as np
+    from games.vec_env import make_vec_env, SnakeVecEnv
+
+    rng = np.random.default_rng(seed)
+    print(f"CPU核数: {os.cpu_count()}")
+    results = {}
+    for num_workers in (0,) + tuple(workers):
+        env = make_vec_env('snake', num_envs, native=False, num_workers=num_workers, board_size=20)
+        env.reset()
+        start = time.perf_counter()
+        for _ in range(steps):
+            actions = [tuple(action) for action in SnakeVecEnv.DIRECTIONS[rng.integers(4, size=num_envs)].tolist()]
+            env.step(actions)
+        results[num_workers] = steps * num_envs / (time.perf_counter() - start)
+        env.close()
+    print(f"B={num_envs}: 同进程 {results[0]:.0f} 步/秒, " +
+          ", ".join(f"{n}进程 {results[n]:.0f} 步/秒" for n in workers))
+    return results
+
+
+def bench_match_runner(workers=(1, 2, 4), num_games: int = 16, board_size: int = 9,
+                       seed: int = 0) -> Dict[str, Any]:
+    """评估对局每秒局数：串行 vs 进程池并行（规则Bot对随机Bot）"""
+    import os
+    from agents import RandomBot, RuleBasedGomokuBot
+    from games.gomoku import GomokuEnv
+    from utils.match_runner import AgentSpec, EnvSpec, run_match
+
+    env_spec = EnvSpec(GomokuEnv, board_size=board_size)
+    specs = (AgentSpec(RuleBasedGomokuBot, 'Rules'), AgentSpec(RandomBot, 'Random'))
+    print(f"CPU核数: {os.cpu_count()}")
+    results = {}
+    for num_workers in (0,) + tuple(workers):
+        start = time.perf_counter()
+        run_match(env_spec, *specs, num_games=num_games, seed=seed, workers=num_workers)
+        results[num_workers] = num_games / (time.perf_counter() - start)
+    print(f"{num_games}局: 串行 {results[0]:.1f} 局/秒, " +
+          ", ".join(f"{n}进程 {results[n]:.1f} 局/秒" for n in workers))
+    return results
+
+
+def bench_game_record(num_games: int = 20000, board_size: int = 15, seed: int = 0) -> Dict[str, Any]:
+    """评估二进制对局记录：每局字节数（对比JSON历史）、归档写入速度和随机读取速度"""
+    import json
+    import os
+    import tempfile
+    from games.game_record import GOMOKU, GameArchive, GameArchiveWriter, GameRecord
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    cells = board_size * board_size
+    records = [GameRecord(GOMOKU, board_size, rng.permutation(cells)[:rng.integers(20, 120)],
+                          winner=int(rng.integers(0, 3)) or None, seed=index, rule=5)
+               for index in range(num_games)]
+    json_bytes = sum(len(json.dumps([(1 + i % 2, list(divmod(int(cell), board_size)))
+                                     for i, cell in enumerate(record.moves)]))
+                     for record in records[:1000]) / min(1000, num_games)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'games.bin')
+        start = time.perf_counter()
+        with GameArchiveWriter(path) as writer:
+            for record in records:
+                writer.write(record)
+        write_rate = num_games / (time.perf_counter() - start)
+        archive_bytes = os.path.getsize(path) / num_games
+        order = rng.integers(0, num_games, num_games)
+        with GameArchive(path) as archive:
+            start = time.perf_counter()
+            for index in order:
+                archive[int(index)]
+            read_rate = num_games / (time.perf_counter() - start)
+    print(f"{board_size}x{board_size} {num_games}局: 每局 {archive_bytes:.1f} 字节（JSON历史 {json_bytes:.0f} 字节）, "
+          f"写入 {write_rate:.0f} 局/秒, 随机读取 {read_rate:.0f} 局/秒")
+    return {'archive_bytes': archive_bytes, 'json_bytes': json_bytes,
+            'write_rate': write_rate, 'read_rate': read_rate}
+
+
+def bench_rating_ladder(board_size: int = 7, seed: int = 0) -> Dict[str, Any]:
+    """评估自适应天梯：提前停止后实际下的局数 vs 每对下满max_games的循环赛"""
+    from agents import RandomBot, RuleBasedGomokuBot
+    from games.gomoku import GomokuEnv
+    from utils.match_runner import AgentSpec, EnvSpec
+    from utils.rating import run_ladder
+
+    env_spec = EnvSpec(GomokuEnv, board_size=board_size)
+    specs = [AgentSpec(RandomBot, 'RandomA'), AgentSpec(RandomBot, 'RandomB'),
+             AgentSpec(RuleBasedGomokuBot, 'RulesA'), AgentSpec(RuleBasedGomokuBot, 'RulesB')]
+    start = time.perf_counter()
+    ladder = run_ladder(env_spec, specs, seed=seed)
+    elapsed = time.perf_counter() - start
+    played = sum(ladder.games_played(*key) for key in ladder.pairs)
+    full = len(ladder.pairs) * ladder.settings['max_games']
+    print(f"{len(specs)}个智能体: 天梯 {played} 局（循环赛 {full} 局，节省 {1 - played / full:.0%}），"
+          f"用时 {elapsed:.1f}秒")
+    return {'played': played, 'full': full, 'time': elapsed}
+
+
+def _serpentine(board_size: int, rows: range) -> list:
+    """按蛇形顺序遍历若干行的格子"""
+    cells = []
+    for x in rows:
+        columns = range(board_size) if x % 2 == 0 else range(board_size - 1, -1, -1)
+        cells.extend((x, y) for y in columns)
+    return cells
+
+
+def bench_snake_step(lengths=(10, 100, 1000), board_size: int = 60, repeats: int = 20000) -> Dict[str, Any]:
+    """每秒移动次数（push+pop，不吃食物）：旧版列表扫描（只计列表操作本身） vs 占用网格+deque"""
+    from collections import deque
+    from games.snake.snake_game import SnakeGame
+
+    half = board_size // 2
+    results = {}
+    for length in lengths:
+        path1 = _serpentine(board_size, range(half))
+        path2 = _serpentine(board_size, range(half, board_size))
+        body1 = path1[:length][::-1]
+        body2 = path2[:length][::-1]
+        direction = (path1[length][0] - body1[0][0], path1[length][1] - body1[0][1])
+
+        game = SnakeGame(board_size=board_size, food_count=0)
+        game.snake1, game.snake2 = deque(body1), deque(body2)
+        game.direction1 = direction
+        game._build_grid()
+        start = time.perf_counter()
+        for _ in range(repeats):
+            game.push(direction)
+            game.pop()
+        grid_rate = repeats / (time.perf_counter() - start)
+
+        # 旧版：对两条蛇和食物做列表成员检查，头部insert(0)、撤销时pop(0)
+        snake, other, foods = list(body1), list(body2), []
+        new_head = path1[length]
+        start = time.perf_counter()
+        for _ in range(repeats):
+            if new_head in snake or new_head in other:
+                break
+            snake.insert(0, new_head)
+            if new_head not in foods:
+                tail = snake.pop()
+            snake.pop(0)
+            snake.append(tail)
+        list_rate = repeats / (time.perf_counter() - start)
+        results[length] = {'list': list_rate, 'grid': grid_rate}
+        print(f"蛇长{length}: 列表 {list_rate:.0f} 步/秒, 占用网格 {grid_rate:.0f} 步/秒")
+    return results
+
+
+def _legacy_snake_state(game) -> Dict[str, Any]:
+    """旧版SnakeGame.get_state：每次新建棋盘并逐格重绘两条蛇和食物"""
+    import numpy as np
+
+    board = np.zeros((game.board_size, game.board_size), dtype=int)
+    for i, (x, y) in enumerate(game.snake1):
+        board[x, y] = 1 if i == 0 else 2
+    for i, (x, y) in enumerate(game.snake2):
+        board[x, y] = 3 if i == 0 else 4
+    for x, y in game.foods:
+        board[x, y] = 5
+    return {
+        'board': board, 'snake1': list(game.snake1), 'snake2': list(game.snake2), 'foods': game.foods.copy(),
+        'direction1': game.direction1, 'direction2': game.direction2, 'alive1': game.alive1,
+        'alive2': game.alive2, 'current_player': game.current_player, 'valid_actions': game.get_valid_actions(),
+        'game_state': game.game_state, 'move_count': game.move_count,
+    }
+
+
+def bench_snake_state(board_sizes=(20, 60), length: int = 200, ticks: int = 5000) -> Dict[str, Any]:
+    """每秒环境步数（step + 观察 + 蛇和食物位置查询）：每次重建的状态 vs 版本化的惰性状态"""
+    from collections import deque
+    from games.snake import SnakeEnv
+
+    results = {}
+    for board_size in board_sizes:
+        rates = {}
+        for mode in ('legacy', 'cached'):
+            env = SnakeEnv(board_size=board_size)
+            game = env.game
+            if mode == 'legacy':
+                game.get_state = lambda game=game: _legacy_snake_state(game)
+            # 两条长蛇在各自的半边来回走：每步push后立即pop，局面不会走到终局
+            half = board_size // 2
+            body = min(length, half * board_size - 1)
+            game.snake1 = deque(_serpentine(board_size, range(half))[:body][::-1])
+            game.snake2 = deque(_serpentine(board_size, range(half, board_size))[:body][::-1])
+            game.foods = []
+            game._build_grid()
+            action = game.get_valid_actions()[0]
+            start = time.perf_counter()
+            for _ in range(ticks):
+                env.step(action)
+                env._get_observation()
+                env.get_snake_positions()
+                env.get_food_positions()
+                game.pop()
+            rates[mode] = ticks / (time.perf_counter() - start)
+        results[board_size] = rates
+        print(f"{board_size}x{board_size} 蛇长{length}: 每次重建 {rates['legacy']:.0f} 步/秒, "
+              f"惰性缓存 {rates['cached']:.0f} 步/秒")
+    return results
+
+
+def bench_snake_joint(batch_sizes=(1, 256), rounds: int = 500, board_size: int = 20,
+                      seed: int = 0) -> Dict[str, Any]:
+    """每秒回合数（双方各走一步）：轮流移动两次step vs 同时移动一次step_joint"""
+    import numpy as np
+    from games import SnakeVecEnv
+
+    results = {}
+    for num_envs in batch_sizes:
+        rates = {}
+        for mode, steps_per_round in (('alternating', 2), ('joint', 1)):
+            env = SnakeVecEnv(num_envs, board_size=board_size, seed=seed, joint=mode == 'joint')
+            env.reset()
+            rng = np.random.default_rng(seed)
+            axis = 2 if env.joint else 1
+            start = time.perf_counter()
+            for _ in range(rounds * steps_per_round):
+                masks = env.get_action_masks()
+                env.step(SnakeVecEnv.DIRECTIONS[np.where(masks, rng.random(masks.shape), -1).argmax(axis=axis)])
+            rates[mode] = rounds * num_envs / (time.perf_counter() - start)
+        results[num_envs] = rates
+        print(f"批量 {num_envs}: 轮流移动 {rates['alternating']:.0f} 回合/秒, "
+              f"同时移动 {rates['joint']:.0f} 回合/秒")
+    return results
+
+
+def _legacy_spawn_food(game) -> tuple:
+    """原来的拒绝采样：随机选格子直到选中空格"""
+    while True:
+        x = random.randint(0, game.board_size - 1)
+        y = random.randint(0, game.board_size - 1)
+        if game.grid[x * game.board_size + y] == game.EMPTY:
+            return x, y
+
+
+def bench_snake_food(fills=(0.5, 0.9, 0.99), board_size: int = 60, spawns: int = 2000,
+                     seed: int = 0) -> Dict[str, Any]:
+    """每秒生成食物数：拒绝采样 vs 空格索引均匀抽取（棋盘被蛇身占满的比例不同）"""
+    from collections import deque
+    from games.snake import SnakeGame
+
+    random.seed(seed)
+    results = {}
+    for fill in fills:
+        game = SnakeGame(board_size=board_size, food_count=1, seed=seed)
+        cells = _serpentine(board_size, range(board_size))
+        game.snake1 = deque(cells[:int(fill * len(cells))][::-1])
+        game.snake2 = deque()
+        game.foods = []
+        game._build_grid()
+        rates = {}
+        start = time.perf_counter()
+        for _ in range(spawns):
+            _legacy_spawn_food(game)
+        rates['legacy'] = spawns / (time.perf_counter() - start)
+        start = time.perf_counter()
+        for _ in range(spawns):
+            game._generate_foods()
+            # 拿掉刚放下的食物，空格数保持不变
+            x, y = game.foods.pop()
+            cell = x * board_size + y
+            game.grid[cell] = game.EMPTY
+            game.board[x, y] = 0
+            game._release(cell)
+        rates['indexed'] = spawns / (time.perf_counter() - start)
+        results[fill] = rates
+        print(f"占满{fill:.0%}: 拒绝采样 {rates['legacy']:.0f} 个/秒, 空格索引 {rates['indexed']:.0f} 个/秒")
+    return results
+
+
+def _legacy_space_after_move(game, head, action, opponent_head) -> int:
+    """原SmartSnakeAI的可达空间：每个动作单独用坐标元组和集合做BFS"""
+    from collections import deque
+
+    new_head = (head[0] + action[0], head[1] + action[1])
+    visited = {new_head}
+    queue = deque([new_head])
+    body_blocks = {pos for snake in (game.snake1, game.snake2) for pos in list(snake)[:-1]}
+    body_blocks.add(opponent_head)
+    count = 0
+    while queue:
+        pos = queue.popleft()
+        count += 1
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            npos = (pos[0] + dx, pos[1] + dy)
+            if (0 <= npos[0] < game.board_size and 0 <= npos[1] < game.board_size and
+                    npos not in visited and npos not in body_blocks):
+                visited.add(npos)
+                queue.append(npos)
+    return count
+
+
+def _legacy_a_star(game, start, goal, opponent_head) -> list:
+    """原SmartSnakeAI的A*：坐标元组和字典"""
+    from heapq import heappush, heappop
+
+    def heuristic(a):
+        return abs(a[0] - goal[0]) + abs(a[1] - goal[1])
+
+    open_set = [(heuristic(start), start)]
+    came_from = {}
+    g_score = {start: 0}
+    while open_set:
+        current = heappop(open_set)[1]
+        if current == goal:
+            path = []
+            while current in came_from:
+                path.append(current)
+                current = came_from[current]
+            return [start] + path[::-1]
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            neighbor = (current[0] + dx, current[1] + dy)
+            if (0 <= neighbor[0] < game.board_size and 0 <= neighbor[1] < game.board_size
+                    and not game.is_body(neighbor) and neighbor != opponent_head):
+                tentative = g_score[current] + 1
+                if neighbor not in g_score or tentative < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative
+                    heappush(open_set, (tentative + heuristic(neighbor), neighbor))
+    return None
+
+
+def bench_snake_search(board_sizes=(20, 60), fill: float = 0.4, ticks: int = 50) -> Dict[str, Any]:
+    """SmartSnakeAI每回合的搜索（四个落点的可达空间 + A*到最远的食物）：逐个BFS vs 展平网格一次遍历"""
+    from collections import deque
+    from agents.ai_bots.grid_search import GridSearch
+    from games.snake import SnakeGame
+
+    results = {}
+    for board_size in board_sizes:
+        game = SnakeGame(board_size=board_size, food_count=0, seed=0)
+        # 两条蛇沿蛇形路线各占上下半边的一部分，食物放在棋盘另一角
+        half = board_size // 2
+        length = int(fill * half * board_size)
+        game.snake1 = deque(_serpentine(board_size, range(half))[:length][::-1])
+        game.snake2 = deque(_serpentine(board_size, range(half, board_size))[:length][::-1])
+        game.foods = [(half - 1, board_size - 1 if half % 2 else 0)]
+        game._build_grid()
+        head, opponent_head, food = game.snake1[0], game.snake2[0], game.foods[0]
+        actions = game.get_valid_actions(1)
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            legacy = [_legacy_space_after_move(game, head, action, opponent_head)
+                      for action in actions if not game.is_body((head[0] + action[0], head[1] + action[1]))]
+            legacy_path = _legacy_a_star(game, head, food, opponent_head)
+        legacy_rate = ticks / (time.perf_counter() - start)
+
+        search = GridSearch(board_size)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            search.load(game, 1)
+            areas = search.move_areas(head, actions)
+            path = search.astar(head, food)
+        grid_rate = ticks / (time.perf_counter() - start)
+        assert [area for area in areas if area] == legacy and path == legacy_path
+        results[board_size] = {'legacy': legacy_rate, 'grid': grid_rate}
+        print(f"{board_size}x{board_size} 蛇长{length}: 逐个BFS {legacy_rate:.0f} 回合/秒, "
+              f"展平网格 {grid_rate:.0f} 回合/秒")
+    return results
+
+
+BENCHMARKS = {
+    'gomoku_step': bench_gomoku_step,
+    'gomoku_clone': bench_gomoku_clone,
+    'search_push': bench_search_push,
+    'candidate_moves': bench_candidate_moves,
+    'leaf_eval': bench_leaf_eval,
+    'incremental_eval': bench_incremental_eval,
+    'mcts_tree': bench_mcts_tree,
+    'uct_select': bench_uct_select,
+    'parallel_mcts': bench_parallel_mcts,
+    'rollout': bench_rollout,
+    'batch_rollout': bench_batch_rollout,
+    'vec_env': bench_vec_env,
+    'async_vec_env': bench_async_vec_env,
+    'match_runner': bench_match_runner,
+    'game_record': bench_game_record,
+    'rating_ladder': bench_rating_ladder,
+    'snake_step': bench_snake_step,
+    'snake_state': bench_snake_state,
+    'snake_joint': bench_snake_joint,
+    'snake_food': bench_snake_food,
+    'snake_search': bench_snake_search,
+}
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="性能基准测试工具")
+    parser.add_argument('benchmarks', nargs='*', default=list(BENCHMARKS),
+                        choices=list(BENCHMARKS), metavar='BENCHMARK',
+                        help=f"要运行的基准测试: {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        print(f"\n=== {name} ===")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -41,11 +41,21 @@ AI_CONFIGS = {
         'max_depth': 4,
         'use_alpha_beta': True,
         'evaluation_timeout': 5,
+        'time_limit': 1.0,  # 每步搜索时间预算（秒），迭代加深在预算内尽量加深
+        'tt_size': 2 ** 16,  # 置换表槽位数
+        'candidate_radius': 2,  # 只搜索距已有棋子不超过该距离的空位
     },
     'mcts': {
         'simulation_count': 1000,
         'exploration_constant': 1.414,
         'timeout': 10,
+        'candidate_radius': 2,  # 树节点只展开距已有棋子不超过该距离的空位
+        'reuse_tree': True,  # 在实际走到的子树上继续搜索
+        'num_workers': 4,  # ParallelMCTSBot的工作进程数
+        'parallel_mode': 'root',  # 'root'：多棵独立的树合并根节点访问数；'leaf'：共享一棵树，虚拟损失并行模拟
+        'virtual_loss': 1.0,  # 叶并行时路径上预先记的失败分数
+        'leaf_batch': 4,  # 叶并行时每个工作进程每轮分到的叶子数
+        'rollout_batch': 1,  # MCTSBot每轮选出的叶子数，大于1时一次批量模拟
     },
     'rl': {
         'learning_rate': 0.1,
@@ -82,6 +92,20 @@ TEST_CONFIG = {
     'results_dir': 'results/',
 }
 
+# 评分配置（utils/rating.py）
+RATING_CONFIG = {
+    'initial_rating': 1500,
+    'elo_k': 32,
+    'glicko_rd': 350,  # Glicko-2初始评分偏差
+    'glicko_volatility': 0.06,
+    'glicko_tau': 0.5,  # 波动率变化的约束
+    'batch_games': 10,  # 自适应配对时每对每轮的局数
+    'min_games': 10,  # 每对至少下这么多局才可能提前停止
+    'max_games': 200,  # 每对最多局数
+    'ci_half_width': 0.1,  # 得分率95%置信区间半宽不超过该值即停止该对
+    'z': 1.96,
+}
+
 # 日志配置
 LOG_CONFIG = {
     'level': 'INFO',
@@ -16,7 +16,10 @@ import numpy as np
 from games.gomoku import GomokuEnv
 from games.snake import SnakeEnv
 from agents import RandomBot, MinimaxBot, MCTSBot, RLBot, BehaviorTreeBot
-from utils.game_utils import evaluate_agents, tournament
+from utils.game_utils import evaluate_agents, tournament, print_leaderboard
+from utils.match_runner import AgentSpec, EnvSpec, run_match, run_tournament
+from utils.result_writer import summarize_results
+from utils.rating import run_ladder, print_ratings
 
 
 def create_agent(agent_type: str, player_id: int, name: str = None, **kwargs):
@@ -145,10 +148,60 @@ def benchmark_single_agent(env, agent, num_games=100, opponent_type='random'):
     return stats
 
 
-def compare_agents(env, agent_types, num_games=50, **agent_kwargs):
-    """比较多个智能体的性能"""
+def benchmark_agent_parallel(env_spec, agent_type, num_games=100, opponent_type='random', workers=4,
+                             seed=0, **agent_kwargs):
+    """用进程池对单个智能体进行基准测试，统计项与benchmark_single_agent相同"""
+    name = f"{agent_type}_1"
+    print(f"\n=== {name} 基准测试 ({workers}进程) ===")
+    
+    agent_spec = AgentSpec(create_agent, name, agent_type=agent_type, **agent_kwargs)
+    opponent_spec = AgentSpec(create_agent, f"{opponent_type}_opponent", agent_type=opponent_type)
+    results = run_match(env_spec, agent_spec, opponent_spec, num_games, seed=seed, workers=workers)
+    
+    stats = {
+        'wins': results['summary']['agent1_wins'],
+        'losses': results['summary']['agent2_wins'],
+        'draws': results['summary']['draws'],
+        'total_time': 0,
+        'total_moves': 0,
+        'move_times': [],
+        'game_lengths': []
+    }
+    for game in results['games']:
+        seat = 1 if (game['game_num'] - 1) % 2 == 0 else 2
+        agent_move_times = [move_time for move, move_time in zip(game['moves'], game['move_times'])
+                            if move['player'] == seat]
+        stats['total_time'] += game['game_time']
+        stats['total_moves'] += len(agent_move_times)
+        stats['move_times'].extend(agent_move_times)
+        stats['game_lengths'].append(game['total_moves'])
+    
+    stats['win_rate'] = stats['wins'] / num_games
+    stats['loss_rate'] = stats['losses'] / num_games
+    stats['draw_rate'] = stats['draws'] / num_games
+    stats['avg_move_time'] = np.mean(stats['move_times']) if stats['move_times'] else 0
+    stats['avg_game_length'] = np.mean(stats['game_lengths'])
+    stats['move_time_std'] = np.std(stats['move_times']) if stats['move_times'] else 0
+    
+    return stats
+
+
+def compare_agents(env, agent_types, num_games=50, workers=0, seed=None, env_spec=None, results_path=None,
+                   **agent_kwargs):
+    """比较多个智能体的性能（workers大于0时用进程池并行对局，results_path为逐局追加写入的JSONL文件）"""
     print(f"\n=== 智能体比较 (每对 {num_games} 局) ===")
     
+    if workers > 0:
+        specs = [AgentSpec(create_agent, f"{agent_type}_{i + 1}", agent_type=agent_type,
+                           **agent_kwargs.get(agent_type, {}))
+                 for i, agent_type in enumerate(agent_types)]
+        results = run_tournament(env_spec, specs, num_games, seed=seed or 0, workers=workers,
+                                 callback=lambda match_index, game: print(
+                                     f"对阵 {match_index + 1} 第 {game['game_num']} 局完成"),
+                                 results_path=results_path)
+        print_leaderboard(results['leaderboard'])
+        return results
+    
     # 创建智能体
     agents = []
     for i, agent_type in enumerate(agent_types):
@@ -231,13 +284,22 @@ def save_results(results, filename):
 
 
 def load_results(filename):
-    """加载评估结果"""
+    """加载评估结果（JSONL对局记录只做流式统计，返回每组对阵的汇总）"""
     filepath = os.path.join('results', filename)
     
     if not os.path.exists(filepath):
         print(f"文件不存在: {filepath}")
         return None
     
+    if filepath.endswith('.jsonl'):
+        results = summarize_results(filepath)
+        for match_index, summary in sorted(results.items()):
+            print(f"对阵 {match_index + 1}: {summary['agent1_name']} vs {summary['agent2_name']} "
+                  f"({summary['total_games']} 局) 胜率 {summary['agent1_win_rate']:.2%} / "
+                  f"{summary['agent2_win_rate']:.2%}，平局 {summary['draw_rate']:.2%}")
+        print(f"结果已从 {filepath} 加载")
+        return results
+    
     with open(filepath, 'r', encoding='utf-8') as f:
         results = json.load(f)
     
@@ -264,6 +326,13 @@ def main():
                        help='比较模式：智能体两两对战')
     parser.add_argument('--benchmark', action='store_true',
                        help='基准测试模式：与随机AI对战')
+    parser.add_argument('--ladder', type=str,
+                       help='天梯模式：在线评分并自适应安排对局，评分保存到results目录下的该文件，'
+                            '加入新智能体时只下它的对局')
+    parser.add_argument('--workers', type=int, default=0,
+                       help='并行对局的进程数（0为串行）')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='随机种子（并行对局时每局的种子由它确定）')
     
     # 游戏参数
     parser.add_argument('--board-size', type=int, default=15,
@@ -299,11 +368,11 @@ def main():
     
     # 创建游戏环境
     if args.game == 'gomoku':
-        env = create_environment(args.game, 
-                               board_size=args.board_size, 
-                               win_length=args.win_length)
+        env_kwargs = {'board_size': args.board_size, 'win_length': args.win_length}
     else:
-        env = create_environment(args.game, board_size=args.board_size)
+        env_kwargs = {'board_size': args.board_size}
+    env = create_environment(args.game, **env_kwargs)
+    env_spec = EnvSpec(create_environment, game_type=args.game, **env_kwargs)
     
     # 准备AI参数
     agent_kwargs = {
@@ -315,11 +384,22 @@ def main():
     print(f"评估智能体: {args.agents}")
     print(f"每个测试游戏数: {args.games}")
     
-    if args.compare:
-        # 比较模式
-        results = compare_agents(env, args.agents, args.games, **agent_kwargs)
+    if args.ladder:
+        # 天梯模式
+        specs = [AgentSpec(create_agent, agent_type, agent_type=agent_type, **agent_kwargs.get(agent_type, {}))
+                 for agent_type in args.agents]
+        ladder = run_ladder(env_spec, specs, seed=args.seed or 0, workers=args.workers,
+                            path=os.path.join('results', args.ladder))
+        print_ratings(ladder.leaderboard())
         
-        if args.save:
+    elif args.compare:
+        # 比较模式：并行对局且保存为.jsonl时逐局追加写入，中断后用相同参数重跑会跳过已完成的对局
+        stream = bool(args.save) and args.save.endswith('.jsonl') and args.workers > 0
+        results_path = os.path.join('results', args.save) if stream else None
+        results = compare_agents(env, args.agents, args.games, workers=args.workers, seed=args.seed,
+                                 env_spec=env_spec, results_path=results_path, **agent_kwargs)
+        
+        if args.save and not stream:
             save_results(results, args.save)
         
     elif args.benchmark:
@@ -329,13 +409,19 @@ def main():
         
         for agent_type in args.agents:
             kwargs = agent_kwargs.get(agent_type, {})
-            agent = create_agent(agent_type, 1, **kwargs)
-            stats = benchmark_single_agent(env, agent, args.games)
+            if args.workers > 0:
+                name = f"{agent_type}_1"
+                stats = benchmark_agent_parallel(env_spec, agent_type, args.games, workers=args.workers,
+                                                 seed=args.seed or 0, **kwargs)
+            else:
+                agent = create_agent(agent_type, 1, **kwargs)
+                name = agent.name
+                stats = benchmark_single_agent(env, agent, args.games)
             
             stats_list.append(stats)
-            agent_names.append(agent.name)
+            agent_names.append(name)
             
-            print(f"\n{agent.name} 基准测试结果:")
+            print(f"\n{name} 基准测试结果:")
             print(f"  胜率: {stats['win_rate']:.2%}")
             print(f"  平均思考时间: {stats['avg_move_time']:.3f}秒")
             print(f"  平均游戏长度: {stats['avg_game_length']:.1f}回合")
@@ -358,7 +444,7 @@ def main():
             save_results(results, args.save)
     
     else:
-        print("请指定 --compare 或 --benchmark 模式")
+        print("请指定 --compare、--benchmark 或 --ladder 模式")
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ import random
 import pickle
 import sys
 import os
+from collections.abc import Mapping
 from typing import List, Tuple, Any, Optional
 
 # 添加项目根目录到Python路径
@@ -60,14 +61,14 @@ class QLearningBot(BaseAgent):
         """
         # 简化状态表示（学生可以改进）
         try:
-            if isinstance(observation, dict) and 'board' in observation:
+            if isinstance(observation, Mapping) and 'board' in observation:
                 # 五子棋：使用棋盘的简化表示
                 board = observation['board']
                 # 为了减少状态空间，只考虑关键区域
                 center = board.shape[0] // 2
                 key_region = board[max(0, center-3):center+4, max(0, center-3):center+4]
                 return tuple(key_region.flatten())
-            elif isinstance(observation, dict):
+            elif isinstance(observation, Mapping):
                 # 贪吃蛇：使用关键信息
                 snake = observation.get(f'snake{self.player_id}', [])
                 foods = observation.get('foods', [])
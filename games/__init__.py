@@ -4,5 +4,8 @@
 
 from .base_game import BaseGame
 from .base_env import BaseEnv
+from .vec_env import VecEnv, SyncVecEnv, AsyncVecEnv, GomokuVecEnv, SnakeVecEnv, make_vec_env
+from .game_record import GameRecord, GameArchive, GameArchiveWriter, encode_record, decode_record, replay
 
-__all__ = ['BaseGame', 'BaseEnv'] 
\ No newline at end of file
+__all__ = ['BaseGame', 'BaseEnv', 'VecEnv', 'SyncVecEnv', 'AsyncVecEnv', 'GomokuVecEnv', 'SnakeVecEnv', 'make_vec_env',
+           'GameRecord', 'GameArchive', 'GameArchiveWriter', 'encode_record', 'decode_record', 'replay'] 
\ No newline at end of file
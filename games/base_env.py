@@ -13,6 +13,9 @@ from games.base_game import BaseGame
 class BaseEnv(ABC):
     """环境基类，实现gym风格接口"""
     
+    # 每步奖励的形状：()为标量，多方同时行动的环境可以返回每个玩家一个奖励
+    reward_shape: Tuple[int, ...] = ()
+    
     def __init__(self, game: BaseGame):
         self.game = game
         self.observation_space = None
@@ -127,6 +127,19 @@ class BaseGame(ABC):
         """获取合法动作（别名）"""
         return self.get_valid_actions(player)
     
+    def push(self, action: Any) -> None:
+        """
+        执行动作并保存撤销信息（供搜索算法使用，不构造观察）
+        
+        与step规则相同，但不返回observation/reward，
+        可以通过pop()精确恢复到执行前的状态。
+        """
+        raise NotImplementedError("子类必须实现push方法")
+    
+    def pop(self) -> Any:
+        """撤销最近一次push，返回被撤销的动作"""
+        raise NotImplementedError("子类必须实现pop方法")
+    
     def clone(self) -> 'BaseGame':
         """克隆游戏状态"""
         # 子类需要实现具体的克隆逻辑
@@ -0,0 +1,326 @@
+"""
+紧凑的二进制对局记录
+每局是一个16字节的头部（游戏类型、棋盘大小、规则参数、结果、种子、步数）加上走法：
+五子棋每步1字节的格子编号（棋盘超过16x16时每步2字节），贪吃蛇每步2比特的方向编号。
+归档文件把多局记录首尾相接，关闭时在末尾写入每局的偏移量索引，读取时用mmap随机访问第i局
+"""
+
+import mmap
+import os
+import random
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from games.gomoku.gomoku_game import GomokuGame
+from games.snake.snake_game import SnakeGame
+
+GOMOKU = 0
+SNAKE = 1
+
+# 贪吃蛇方向编号，与SnakeGame.get_action_space的顺序一致：上、下、左、右
+SNAKE_ACTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+_SNAKE_CODES = {action: code for code, action in enumerate(SNAKE_ACTIONS)}
+
+# 游戏类型, 棋盘大小, 规则参数, 标志(低2位获胜者 0/1/2，第3位表示有种子，第4位表示双方同时移动), 种子, 步数
+_HEADER = struct.Struct('<BBBBQI')
+_HAS_SEED = 0x04
+_JOINT = 0x08
+
+_ARCHIVE_MAGIC = b'GREC'
+_INDEX_FOOTER = struct.Struct('<Q4s')  # 局数, 索引标记
+_INDEX_MAGIC = b'GIDX'
+
+
+class GameRecord:
+    """
+    一局对局的紧凑表示
+
+    moves是走法编号数组：五子棋为格子编号 row * board_size + col，贪吃蛇为SNAKE_ACTIONS中的方向编号。
+    rule是规则参数（五子棋的获胜长度、贪吃蛇的食物数量），seed是对局开始前设置的随机种子。
+    joint表示贪吃蛇双方同时移动（step_joint），此时moves按 玩家1、玩家2 成对排列。
+    """
+
+    def __init__(self, game_type: int, board_size: int, moves: Sequence[int], winner: Optional[int] = None,
+                 seed: Optional[int] = None, rule: int = 0, joint: bool = False):
+        self.game_type = game_type
+        self.board_size = board_size
+        self.moves = np.asarray(moves, dtype=_move_dtype(game_type, board_size))
+        self.winner = winner
+        self.seed = seed
+        self.rule = rule
+        self.joint = joint
+
+    @classmethod
+    def from_actions(cls, game_type: int, board_size: int, actions: Sequence[Tuple[int, int]],
+                     winner: Optional[int] = None, seed: Optional[int] = None, rule: int = 0,
+                     joint: bool = False) -> 'GameRecord':
+        """由动作元组序列（五子棋的 (row, col)，贪吃蛇的方向向量）构造记录"""
+        if game_type == GOMOKU:
+            moves = [row * board_size + col for row, col in actions]
+        else:
+            moves = [_SNAKE_CODES[tuple(action)] for action in actions]
+        return cls(game_type, board_size, moves, winner, seed, rule, joint)
+
+    def actions(self) -> List[Tuple[int, int]]:
+        """还原为动作元组序列"""
+        if self.game_type == GOMOKU:
+            return [divmod(int(cell), self.board_size) for cell in self.moves]
+        return [SNAKE_ACTIONS[code] for code in self.moves]
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def __eq__(self, other: Any) -> bool:
+        return (isinstance(other, GameRecord) and self.game_type == other.game_type
+                and self.board_size == other.board_size and self.rule == other.rule
+                and self.winner == other.winner and self.seed == other.seed and self.joint == other.joint
+                and np.array_equal(self.moves, other.moves))
+
+
+def _move_dtype(game_type: int, board_size: int) -> np.dtype:
+    """走法编号的存储类型"""
+    if game_type == GOMOKU and board_size * board_size > 256:
+        return np.dtype('<u2')
+    return np.dtype(np.uint8)
+
+
+def _payload_size(game_type: int, board_size: int, num_moves: int) -> int:
+    """走法部分的字节数"""
+    if game_type == GOMOKU:
+        return num_moves * _move_dtype(game_type, board_size).itemsize
+    return (num_moves + 3) // 4
+
+
+def record_from_game(game, seed: Optional[int] = None) -> GameRecord:
+    """由一局已经下完（或进行中）的GomokuGame/SnakeGame构造记录"""
+    if isinstance(game, SnakeGame):
+        # 同时移动的撤销记录里动作是 (玩家1动作, 玩家2动作)
+        joint = any(record['player'] == 0 for record in game._undo_stack)
+        actions = []
+        for record in game._undo_stack:
+            if joint:
+                actions.extend(record['action'])
+            else:
+                actions.append(record['action'])
+        return _record_for(game, actions, game.get_winner(), seed, joint)
+    actions = [action for _, action in game.history]
+    return _record_for(game, actions, game.get_winner(), seed)
+
+
+def record_from_result(game, game_result: Dict[str, Any], seed: Optional[int] = None) -> GameRecord:
+    """由play_game返回的对局记录构造紧凑记录，game（如env.game）提供游戏类型和规则参数"""
+    return _record_for(game, [move['action'] for move in game_result['moves']], game_result['winner'], seed)
+
+
+def _record_for(game, actions: Sequence[Tuple[int, int]], winner: Optional[int],
+                seed: Optional[int], joint: bool = False) -> GameRecord:
+    """按game的类型和规则参数把动作序列编码成记录"""
+    if isinstance(game, SnakeGame):
+        return GameRecord.from_actions(SNAKE, game.board_size, actions, winner, seed, game.food_count, joint)
+    return GameRecord.from_actions(GOMOKU, game.board_size, actions, winner, seed, game.win_length)
+
+
+def encode_record(record: GameRecord) -> bytes:
+    """编码为字节串：头部 + 走法"""
+    flags = ((record.winner or 0) | (_HAS_SEED if record.seed is not None else 0)
+             | (_JOINT if record.joint else 0))
+    header = _HEADER.pack(record.game_type, record.board_size, record.rule, flags,
+                          record.seed or 0, len(record.moves))
+    if record.game_type == GOMOKU:
+        return header + record.moves.tobytes()
+    # 每字节4步，第一步在最低的2比特
+    codes = np.zeros(_payload_size(SNAKE, record.board_size, len(record.moves)) * 4, dtype=np.uint8)
+    codes[:len(record.moves)] = record.moves
+    codes = codes.reshape(-1, 4)
+    packed = codes[:, 0] | (codes[:, 1] << 2) | (codes[:, 2] << 4) | (codes[:, 3] << 6)
+    return header + packed.tobytes()
+
+
+def _scan_record(buffer, offset: int) -> int:
+    """
+    检查offset处是否是一局完整、合法的记录，是则返回它的结束位置，否则返回-1
+
+    用于没有索引时扫描归档：中断时残留的部分索引或半局数据不能被当成对局。
+    """
+    if offset + _HEADER.size > len(buffer):
+        return -1
+    game_type, board_size, rule, flags, seed, num_moves = _HEADER.unpack_from(buffer, offset)
+    if game_type not in (GOMOKU, SNAKE) or board_size == 0:
+        return -1
+    if flags & ~(3 | _HAS_SEED | _JOINT) or flags & 3 == 3 or (seed and not flags & _HAS_SEED):
+        return -1
+    start = offset + _HEADER.size
+    end = start + _payload_size(game_type, board_size, num_moves)
+    if end > len(buffer):
+        return -1
+    if game_type == GOMOKU:
+        if flags & _JOINT or not 0 < rule <= board_size:
+            return -1
+        moves = np.frombuffer(buffer, dtype=_move_dtype(game_type, board_size), count=num_moves, offset=start)
+        if num_moves and int(moves.max()) >= board_size * board_size:
+            return -1
+    else:
+        if flags & _JOINT and num_moves % 2:
+            return -1
+        # 最后一个字节中没用到的比特编码时补0
+        if num_moves % 4 and buffer[end - 1] >> (2 * (num_moves % 4)):
+            return -1
+    return end
+
+
+def decode_record(buffer, offset: int = 0) -> Tuple[GameRecord, int]:
+    """从buffer的offset处解码一局，返回 (记录, 下一局的偏移量)"""
+    game_type, board_size, rule, flags, seed, num_moves = _HEADER.unpack_from(buffer, offset)
+    start = offset + _HEADER.size
+    end = start + _payload_size(game_type, board_size, num_moves)
+    if game_type == GOMOKU:
+        moves = np.frombuffer(buffer, dtype=_move_dtype(game_type, board_size), count=num_moves, offset=start)
+    else:
+        packed = np.frombuffer(buffer, dtype=np.uint8, count=end - start, offset=start)
+        moves = (packed[:, None] >> np.array([0, 2, 4, 6], dtype=np.uint8)) & 3
+        moves = moves.reshape(-1)[:num_moves]
+    record = GameRecord(game_type, board_size, moves.copy(), flags & 3 or None,
+                        seed if flags & _HAS_SEED else None, rule, bool(flags & _JOINT))
+    return record, end
+
+
+def replay(record: GameRecord, num_moves: int = None):
+    """
+    按记录重建对局，返回走完前num_moves步（默认全部，同时移动的记录按回合计）的GomokuGame/SnakeGame
+
+    贪吃蛇的食物位置来自每局的随机数，play_game中它在reset时从按记录种子设置的全局random取种子：
+    重放时用记录的种子算出同一个值直接设置本局的随机数，还原出相同的食物而不改动全局random。
+    """
+    actions = record.actions()
+    if record.joint:
+        actions = list(zip(actions[0::2], actions[1::2]))
+    actions = actions[:num_moves]
+    if record.game_type == GOMOKU:
+        game = GomokuGame(board_size=record.board_size, win_length=record.rule)
+    else:
+        game_seed = None if record.seed is None else random.Random(record.seed).getrandbits(64)
+        game = SnakeGame(board_size=record.board_size, food_count=record.rule, seed=game_seed)
+    for action in actions:
+        if game.is_terminal():
+            break
+        if record.joint:
+            game.push_joint(*action)
+        else:
+            game.push(action)
+    game.update_game_state()
+    return game
+
+
+class GameArchiveWriter:
+    """
+    追加写入的对局归档
+
+    文件以4字节标记开头，之后是首尾相接的对局记录；close时在末尾写入偏移量索引。
+    打开已有的归档时会去掉旧索引继续追加。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._offsets: List[int] = []
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with GameArchive(path) as archive:
+                self._offsets = archive.offsets.tolist()
+                end = archive.data_end
+            with open(path, 'rb+') as f:
+                f.truncate(end)
+            self._file = open(path, 'ab')
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(_ARCHIVE_MAGIC)
+        self._position = self._file.tell()
+
+    def write(self, record: GameRecord) -> int:
+        """追加一局，返回它在归档中的编号"""
+        data = encode_record(record)
+        self._offsets.append(self._position)
+        self._file.write(data)
+        self._position += len(data)
+        return len(self._offsets) - 1
+
+    def close(self):
+        """写入索引并关闭文件"""
+        if self._file.closed:
+            return
+        self._file.write(np.asarray(self._offsets, dtype='<u8').tobytes())
+        self._file.write(_INDEX_FOOTER.pack(len(self._offsets), _INDEX_MAGIC))
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __enter__(self) -> 'GameArchiveWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+class GameArchive:
+    """
+    用mmap读取的对局归档，archive[i] 直接解码第i局
+
+    文件末尾有索引时直接读取偏移量；写入中途中断（没有索引）时顺序扫描头部重建偏移量，
+    扫描在第一个不合法的头部处停止，末尾不完整的一局或写了一半的索引会被忽略。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._buffer[:len(_ARCHIVE_MAGIC)] != _ARCHIVE_MAGIC:
+            self.close()
+            raise ValueError(f"不是对局归档文件: {path}")
+        self.offsets, self.data_end = self._read_index()
+
+    def _read_index(self) -> Tuple[np.ndarray, int]:
+        """读取末尾索引，没有索引时扫描头部"""
+        size = len(self._buffer)
+        if size >= len(_ARCHIVE_MAGIC) + _INDEX_FOOTER.size:
+            count, magic = _INDEX_FOOTER.unpack_from(self._buffer, size - _INDEX_FOOTER.size)
+            index_start = size - _INDEX_FOOTER.size - count * 8
+            if magic == _INDEX_MAGIC and index_start >= len(_ARCHIVE_MAGIC):
+                offsets = np.frombuffer(self._buffer, dtype='<u8', count=count, offset=index_start)
+                return offsets.copy(), index_start
+        offsets = []
+        position = len(_ARCHIVE_MAGIC)
+        while True:
+            end = _scan_record(self._buffer, position)
+            if end < 0:
+                break
+            offsets.append(position)
+            position = end
+        return np.asarray(offsets, dtype='<u8'), position
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> GameRecord:
+        if index < 0:
+            index += len(self.offsets)
+        if not 0 <= index < len(self.offsets):
+            raise IndexError(f"对局编号超出范围: {index}")
+        return decode_record(self._buffer, int(self.offsets[index]))[0]
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for index in range(len(self.offsets)):
+            yield self[index]
+
+    def close(self):
+        """关闭映射和文件"""
+        if not self._buffer.closed:
+            self._buffer.close()
+        self._file.close()
+
+    def __enter__(self) -> 'GameArchive':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
@@ -3,6 +3,7 @@
 """
 
 from .gomoku_game import GomokuGame
+from .gomoku_bitboard import BitboardGomokuGame
 from .gomoku_env import GomokuEnv
 
-__all__ = ['GomokuGame', 'GomokuEnv'] 
\ No newline at end of file
+__all__ = ['GomokuGame', 'BitboardGomokuGame', 'GomokuEnv'] 
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+位棋盘五子棋
+用Python整数按位存储双方棋子，接口与GomokuGame一致（board是只读快照，见BitboardGomokuGame），
+克隆只复制几个整数，适合需要大量克隆的搜索算法
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple, Any, Optional
+from games.gomoku.gomoku_game import GomokuGame, zobrist_table
+
+
+# 棋盘几何缓存: board_size -> (stride, full_mask, nbytes, cell_bits)
+_GEOMETRY = {}
+
+
+def _geometry(board_size: int) -> Tuple[int, int, int, np.ndarray]:
+    """
+    计算位棋盘布局
+
+    每行额外留一个空列作为哨兵，格子(row, col)对应第 row*stride+col 位。
+    哨兵列永远为0，因此横向、斜向移位不会跨行误连。
+    """
+    if board_size not in _GEOMETRY:
+        stride = board_size + 1
+        row_mask = (1 << board_size) - 1
+        full_mask = 0
+        for row in range(board_size):
+            full_mask |= row_mask << (row * stride)
+        nbytes = (board_size * stride + 7) // 8
+        # 行优先的每个格子在位串中的下标，用于展开成numpy棋盘
+        cell_bits = (np.arange(board_size)[:, None] * stride + np.arange(board_size)).ravel()
+        _GEOMETRY[board_size] = (stride, full_mask, nbytes, cell_bits)
+    return _GEOMETRY[board_size]
+
+
+class BitboardGomokuGame(GomokuGame):
+    """
+    位棋盘五子棋，可替换只通过step/push/pop落子的GomokuGame用法
+
+    board是由位棋盘展开的只读数组：不能写 game.board[row, col]，要改局面请整体赋值
+    game.board = new_board（同时重新计算缓存）。局面每次变化后第一次读取board会展开整张棋盘，
+    搜索中判断空位和棋子请用empty/stones或get_valid_actions。
+    """
+
+    def __init__(self, board_size: int = 15, win_length: int = 5, **kwargs):
+        self.stride, self._full_mask, self._nbytes, self._cell_bits = _geometry(board_size)
+        # 四个方向对应的位移：横、竖、主对角线、副对角线
+        self._shifts = (1, self.stride, self.stride + 1, self.stride - 1)
+        self.stones = [0, 0, 0]  # 下标为玩家编号，0号位不用
+        self.empty = self._full_mask  # 空位集合
+        # 持久化链表形式的历史，节点为 (上一节点, 落子, 落子前的获胜者)，克隆时直接共享
+        self._trail = None
+        self._board_cache = None
+        # board的setter会同步获胜者和哈希，父类初始化中第一次设置棋盘前就要用到
+        self.current_player = 1
+        self._zobrist_keys, self._zobrist_side = zobrist_table(board_size)
+        super().__init__(board_size, win_length, **kwargs)
+
+    @property
+    def board(self) -> np.ndarray:
+        """按需生成的numpy棋盘（只读，局面不变时复用缓存，写入会抛出ValueError）"""
+        cache = self._board_cache
+        if cache is None or cache[0] != self.stones[1] or cache[1] != self.stones[2]:
+            board = self._materialize_board()
+            cache = (self.stones[1], self.stones[2], board)
+            self._board_cache = cache
+        return cache[2]
+
+    @board.setter
+    def board(self, value: np.ndarray):
+        """从numpy棋盘加载局面，同时重新计算获胜者缓存、Zobrist哈希和棋型表"""
+        value = np.asarray(value)
+        stones = [0, 0, 0]
+        for player in (1, 2):
+            for flat in np.flatnonzero(value == player):
+                row, col = divmod(int(flat), self.board_size)
+                stones[player] |= 1 << (row * self.stride + col)
+        self.stones = stones
+        self.empty = self._full_mask & ~(stones[1] | stones[2])
+        self._board_cache = None
+        self.sync_caches()
+
+    @property
+    def history(self) -> List[Tuple[int, Tuple[int, int]]]:
+        """落子历史 [(player, (row, col)), ...]"""
+        moves = []
+        node = self._trail
+        while node is not None:
+            node, move, _ = node
+            moves.append(move)
+        moves.reverse()
+        return moves
+
+    @history.setter
+    def history(self, moves: List[Tuple[int, Tuple[int, int]]]):
+        trail = None
+        for move in moves:
+            trail = (trail, move, None)
+        self._trail = trail
+
+    def step(self, action: Tuple[int, int]) -> Tuple[Dict[str, Any], float, bool, Dict[str, Any]]:
+        """执行一步动作，返回值约定与GomokuGame.step相同"""
+        row, col = action
+        bit = 1 << (row * self.stride + col)
+
+        if not self.empty & bit:
+            return self.get_state(), -1, True, {'error': 'Invalid move'}
+
+        player = self.current_player
+        self.push(action)
+        done = self.is_terminal()
+        reward = 1 if self.winner == player else 0
+        info = {}
+        if done and self.winner is None:
+            reward = 0.5
+
+        return self.get_state(), reward, done, info
+
+    def push(self, action: Tuple[int, int]) -> None:
+        """落子（不检查合法性、不构造观察），可用pop撤销"""
+        row, col = action
+        bit = 1 << (row * self.stride + col)
+        player = self.current_player
+        stones = self.stones[player] | bit
+        self.stones[player] = stones
+        self.empty ^= bit
+        self._trail = (self._trail, (player, (row, col)), self.winner)
+        self.zobrist_hash ^= self._zobrist_keys[(row * self.board_size + col) * 3 + player] ^ self._zobrist_side
+        self.move_count += 1
+        if self._patterns:
+            self._update_patterns(row * self.board_size + col, player, 1)
+        if self.winner is None and self._has_line(stones):
+            self.winner = player
+        self.current_player = 3 - player
+
+    def pop(self) -> Tuple[int, int]:
+        """撤销最近一次落子"""
+        self._trail, (player, (row, col)), self.winner = self._trail
+        bit = 1 << (row * self.stride + col)
+        self.stones[player] ^= bit
+        self.empty |= bit
+        self.zobrist_hash ^= self._zobrist_keys[(row * self.board_size + col) * 3 + player] ^ self._zobrist_side
+        self.move_count -= 1
+        self.current_player = player
+        if self._patterns:
+            self._update_patterns(row * self.board_size + col, player, -1)
+        return (row, col)
+
+    def get_valid_actions(self, player: int = None) -> List[Tuple[int, int]]:
+        """获取有效动作列表（按行优先顺序，与GomokuGame一致）"""
+        stride = self.stride
+        empty = self.empty
+        actions = []
+        while empty:
+            low = empty & -empty
+            actions.append(divmod(low.bit_length() - 1, stride))
+            empty ^= low
+        return actions
+
+    def get_candidate_actions(self, radius: int = 2) -> List[Tuple[int, int]]:
+        """获取与任意棋子距离不超过radius的空位：对全部棋子做radius次八方向膨胀"""
+        stones = self.stones[1] | self.stones[2]
+        if not stones:
+            center = self.board_size // 2
+            return [(center, center)]
+        area = stones
+        for _ in range(radius):
+            grown = area
+            for shift in self._shifts:
+                grown |= (area << shift) | (area >> shift)
+            # 掩掉哨兵列和棋盘外的位
+            area = grown & self._full_mask
+        stride = self.stride
+        candidates = area & self.empty
+        actions = []
+        while candidates:
+            low = candidates & -candidates
+            actions.append(divmod(low.bit_length() - 1, stride))
+            candidates ^= low
+        return actions
+
+    def clone(self) -> 'BitboardGomokuGame':
+        """克隆游戏状态，O(1)：位棋盘是不可变整数，历史链表可共享"""
+        new_game = BitboardGomokuGame.__new__(BitboardGomokuGame)
+        new_game.__dict__.update(self.__dict__)
+        new_game.stones = self.stones[:]
+        new_game._patterns = self._copy_patterns()
+        return new_game
+
+    def _has_line(self, stones: int) -> bool:
+        """移位与运算检测是否存在win_length连珠"""
+        win_length = self.win_length
+        for shift in self._shifts:
+            line = stones
+            length = 1
+            # 倍增：每次把已确认的连续长度翻倍
+            while length < win_length and line:
+                step = min(length, win_length - length)
+                line &= line >> (shift * step)
+                length += step
+            if line:
+                return True
+        return False
+
+    def _scan_winner(self) -> Optional[int]:
+        """用位运算检查双方是否已有连珠"""
+        for player in (1, 2):
+            if self._has_line(self.stones[player]):
+                return player
+        return None
+
+    def _check_win(self, row: int, col: int, player: int) -> bool:
+        """检查是否获胜"""
+        return self._has_line(self.stones[player])
+
+    def _is_board_full(self) -> bool:
+        """检查棋盘是否已满"""
+        return not self.empty
+
+    def _materialize_board(self) -> np.ndarray:
+        """把位棋盘展开成 board_size x board_size 的numpy数组"""
+        raw = (self.stones[1].to_bytes(self._nbytes, 'little') +
+               self.stones[2].to_bytes(self._nbytes, 'little'))
+        bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder='little').reshape(2, -1)
+        board = bits[0][self._cell_bits] + 2 * bits[1][self._cell_bits]
+        board = board.reshape(self.board_size, self.board_size).astype(int)
+        board.flags.writeable = False
+        return board
@@ -7,15 +7,18 @@ import numpy as np
 from typing import Dict, List, Tuple, Any, Optional
 from games.base_env import BaseEnv
 from games.gomoku.gomoku_game import GomokuGame
+from games.gomoku.gomoku_bitboard import BitboardGomokuGame
 
 
 class GomokuEnv(BaseEnv):
     """五子棋环境"""
     
-    def __init__(self, board_size: int = 15, win_length: int = 5):
+    def __init__(self, board_size: int = 15, win_length: int = 5, use_bitboard: bool = False):
         self.board_size = board_size
         self.win_length = win_length
-        game = GomokuGame(board_size, win_length)
+        self.use_bitboard = use_bitboard
+        game_cls = BitboardGomokuGame if use_bitboard else GomokuGame
+        game = game_cls(board_size, win_length)
         super().__init__(game)
     
     def _setup_spaces(self):
@@ -85,6 +88,6 @@ class GomokuEnv(BaseEnv):
     def clone(self) -> 'GomokuEnv':
         """克隆环境"""
         cloned_game = self.game.clone()
-        cloned_env = GomokuEnv(self.board_size, self.win_length)
+        cloned_env = GomokuEnv(self.board_size, self.win_length, self.use_bitboard)
         cloned_env.game = cloned_game
         return cloned_env 
\ No newline at end of file
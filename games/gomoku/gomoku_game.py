@@ -2,12 +2,53 @@
 五子棋游戏逻辑
 """
 
+import random
 import numpy as np
 from typing import Dict, List, Tuple, Any, Optional
 from games.base_game import BaseGame
+from games.gomoku.gomoku_patterns import (
+    PATTERN_NAMES, NUM_PATTERNS, PAIR_TABLE, PAIR_LIST, SCORE_TABLES, SCORE_LIST, FOUR_PAIRS,
+    CENTER_WEIGHT, cell_windows, window_cells, center_weights, window_codes, five_points
+)
 import config
 
 
+# Zobrist随机数表缓存: board_size -> (每个格子每个玩家的键, 轮到玩家2行棋的键)
+_ZOBRIST_TABLES = {}
+
+
+def zobrist_table(board_size: int) -> Tuple[List[int], int]:
+    """
+    获取Zobrist哈希随机数表
+    
+    键按 (row * board_size + col) * 3 + player 排列，固定种子生成，
+    同样大小的棋盘在不同进程中得到相同的哈希值。
+    """
+    if board_size not in _ZOBRIST_TABLES:
+        rng = random.Random(board_size)
+        keys = [rng.getrandbits(64) for _ in range(board_size * board_size * 3)]
+        _ZOBRIST_TABLES[board_size] = (keys, rng.getrandbits(64))
+    return _ZOBRIST_TABLES[board_size]
+
+
+# 邻域缓存: (board_size, radius) -> 每个格子切比雪夫距离radius以内的格子下标
+_NEIGHBORHOODS = {}
+
+
+def neighborhoods(board_size: int, radius: int) -> List[List[int]]:
+    """获取每个格子（扁平下标）的邻域格子列表，包含格子本身"""
+    key = (board_size, radius)
+    if key not in _NEIGHBORHOODS:
+        cells = []
+        for row in range(board_size):
+            for col in range(board_size):
+                cells.append([r * board_size + c
+                              for r in range(max(0, row - radius), min(board_size, row + radius + 1))
+                              for c in range(max(0, col - radius), min(board_size, col + radius + 1))])
+        _NEIGHBORHOODS[key] = cells
+    return _NEIGHBORHOODS[key]
+
+
 class GomokuGame(BaseGame):
     """五子棋游戏"""
     
@@ -15,6 +56,15 @@ class GomokuGame(BaseGame):
         self.board_size = board_size
         self.win_length = win_length
         self.board = np.zeros((self.board_size, self.board_size), dtype=int)
+        self.winner = None  # 由最后一步增量更新的获胜者缓存
+        self._undo_winners = []  # push时保存的获胜者缓存，pop时恢复
+        self._zobrist_keys, self._zobrist_side = zobrist_table(board_size)
+        self.zobrist_hash = 0  # 随落子增量维护的局面哈希
+        # 候选点集合: radius -> (每格邻域内棋子数, 有棋子邻近的空位集合)，首次查询时建立
+        self._candidates = {}
+        # 棋型表: [各窗口编码, 各棋型对的窗口数, 玩家1视角的棋型净分, 双方中心分,
+        #         含冲四及以上棋型的窗口集合]，首次评估时建立
+        self._patterns = None
         super().__init__({'board_size': board_size, 'win_length': win_length})
     
     def reset(self) -> Dict[str, Any]:
@@ -24,6 +74,11 @@ class GomokuGame(BaseGame):
         self.game_state = config.GameState.ONGOING
         self.move_count = 0
         self.history = []
+        self.winner = None
+        self._undo_winners = []
+        self.zobrist_hash = 0
+        self._candidates = {}
+        self._patterns = None
         
         return self.get_state()
     
@@ -45,28 +100,186 @@ class GomokuGame(BaseGame):
         if self.board[row, col] != 0:
             return self.get_state(), -1, True, {'error': 'Invalid move'}
         
-        self.board[row, col] = self.current_player
-        self.history.append((self.current_player, (row, col)))
-        self.move_count += 1
+        player = self.current_player
+        self.push(action)
         done = self.is_terminal()
-        reward = 1 if self.get_winner() == self.current_player else 0
+        reward = 1 if self.winner == player else 0
         info = {}
-        if done and self.get_winner() is None:
+        if done and self.winner is None:
             reward = 0.5
-        self.switch_player()
         
         return self.get_state(), reward, done, info
     
+    def push(self, action: Tuple[int, int]) -> None:
+        """落子（不检查合法性、不构造观察），可用pop撤销"""
+        row, col = action
+        player = self.current_player
+        self.board[row, col] = player
+        self.history.append((player, (row, col)))
+        self._undo_winners.append(self.winner)
+        self.zobrist_hash ^= self._zobrist_keys[(row * self.board_size + col) * 3 + player] ^ self._zobrist_side
+        self.move_count += 1
+        if self._candidates:
+            self._add_candidate_stone(row * self.board_size + col)
+        if self._patterns:
+            self._update_patterns(row * self.board_size + col, player, 1)
+        # 只有刚落下的棋子可能形成新的五连，无需扫描整个棋盘
+        if self.winner is None and self._check_win(row, col, player):
+            self.winner = player
+        self.switch_player()
+    
+    def pop(self) -> Tuple[int, int]:
+        """撤销最近一次落子"""
+        player, (row, col) = self.history.pop()
+        self.board[row, col] = 0
+        self.winner = self._undo_winners.pop()
+        self.zobrist_hash ^= self._zobrist_keys[(row * self.board_size + col) * 3 + player] ^ self._zobrist_side
+        self.move_count -= 1
+        self.current_player = player
+        if self._candidates:
+            self._remove_candidate_stone(row * self.board_size + col)
+        if self._patterns:
+            self._update_patterns(row * self.board_size + col, player, -1)
+        return (row, col)
+    
     def get_valid_actions(self, player: int = None) -> List[Tuple[int, int]]:
         """获取有效动作列表"""
         return [(i, j) for i in range(self.board_size) for j in range(self.board_size) if self.board[i, j] == 0]
     
+    def get_candidate_actions(self, radius: int = 2) -> List[Tuple[int, int]]:
+        """
+        获取候选动作：与任意棋子切比雪夫距离不超过radius的空位（行优先顺序）
+        
+        每个radius的候选集合在第一次查询时建立，之后随push/pop增量维护。
+        空棋盘时返回中心点。
+        """
+        if radius not in self._candidates:
+            self._build_candidates(radius)
+        candidates = self._candidates[radius][1]
+        if not candidates:
+            if self.move_count == 0:
+                center = self.board_size // 2
+                return [(center, center)]
+            return []
+        size = self.board_size
+        return [divmod(flat, size) for flat in sorted(candidates)]
+    
+    def _build_candidates(self, radius: int):
+        """从当前棋盘建立指定radius的候选集合"""
+        counts = [0] * (self.board_size * self.board_size)
+        candidates = set()
+        flat_board = self.board.ravel()
+        cells = neighborhoods(self.board_size, radius)
+        for flat in np.flatnonzero(flat_board):
+            for neighbor in cells[flat]:
+                counts[neighbor] += 1
+        for flat, count in enumerate(counts):
+            if count and flat_board[flat] == 0:
+                candidates.add(flat)
+        self._candidates[radius] = (counts, candidates)
+    
+    def _add_candidate_stone(self, flat: int):
+        """落子后更新所有已建立的候选集合"""
+        for radius, (counts, candidates) in self._candidates.items():
+            for neighbor in neighborhoods(self.board_size, radius)[flat]:
+                if counts[neighbor] == 0:
+                    candidates.add(neighbor)
+                counts[neighbor] += 1
+            candidates.discard(flat)
+    
+    def _remove_candidate_stone(self, flat: int):
+        """撤销落子后更新所有已建立的候选集合"""
+        for radius, (counts, candidates) in self._candidates.items():
+            for neighbor in neighborhoods(self.board_size, radius)[flat]:
+                counts[neighbor] -= 1
+                if counts[neighbor] == 0:
+                    candidates.discard(neighbor)
+            if counts[flat]:
+                candidates.add(flat)
+    
+    def evaluate(self, player: int) -> int:
+        """
+        棋型评估（从player的视角，越大越好），与gomoku_patterns.evaluate_board结果相同
+        
+        棋型表在第一次调用时建立，之后每次落子/撤销只更新经过该格子的窗口，读取为O(1)。
+        """
+        if not self._patterns:
+            self._build_patterns()
+        score, center = self._patterns[2], self._patterns[3]
+        if player == 2:
+            score = -score
+        return score + CENTER_WEIGHT * center[player]
+    
+    def get_pattern_counts(self, player: int) -> Dict[str, int]:
+        """获取player各棋型的窗口数（连五、活四、冲四、活三等）"""
+        if not self._patterns:
+            self._build_patterns()
+        pairs = np.asarray(self._patterns[1]).reshape(NUM_PATTERNS, NUM_PATTERNS)
+        counts = pairs.sum(axis=1) if player == 1 else pairs.sum(axis=0)
+        return {name: int(counts[index]) for index, name in enumerate(PATTERN_NAMES) if index}
+    
+    def get_winning_moves(self, player: int) -> List[Tuple[int, int]]:
+        """获取player落子即成五的空位（行优先顺序），只检查含冲四、活四的窗口"""
+        if not self._patterns:
+            self._build_patterns()
+        codes = self._patterns[0]
+        cells = window_cells(self.board_size)
+        points = set()
+        for window in self._patterns[4]:
+            for k in five_points(codes[window], player):
+                points.add(cells[window][k])
+        return [divmod(flat, self.board_size) for flat in sorted(points)]
+    
+    def _build_patterns(self):
+        """从当前棋盘建立棋型表"""
+        board = np.asarray(self.board)
+        codes = window_codes(board)
+        pairs = PAIR_TABLE[codes]
+        counts = np.bincount(pairs, minlength=NUM_PATTERNS * NUM_PATTERNS).tolist()
+        score = int(SCORE_TABLES[1][codes].sum())
+        weights = center_weights(self.board_size)
+        center = [0] + [int(weights[board == player].sum()) for player in (1, 2)]
+        fours = {window for window, pair in enumerate(pairs.tolist()) if FOUR_PAIRS[pair]}
+        self._patterns = [codes.tolist(), counts, score, center, fours]
+    
+    def _update_patterns(self, flat: int, player: int, sign: int):
+        """落子(sign=1)或撤销(sign=-1)后更新经过该格子的窗口"""
+        patterns = self._patterns
+        codes, counts, score, center, fours = patterns
+        delta = sign * player
+        for window, weight in cell_windows(self.board_size)[flat]:
+            old = codes[window]
+            new = old + delta * weight
+            codes[window] = new
+            score += SCORE_LIST[new] - SCORE_LIST[old]
+            old_pair, new_pair = PAIR_LIST[old], PAIR_LIST[new]
+            if old_pair != new_pair:
+                counts[old_pair] -= 1
+                counts[new_pair] += 1
+                if FOUR_PAIRS[new_pair]:
+                    fours.add(window)
+                elif FOUR_PAIRS[old_pair]:
+                    fours.discard(window)
+        patterns[2] = score
+        center[player] += sign * int(center_weights(self.board_size)[divmod(flat, self.board_size)])
+    
+    def _copy_patterns(self):
+        """复制棋型表（克隆用）"""
+        if not self._patterns:
+            return None
+        codes, counts, score, center, fours = self._patterns
+        return [codes.copy(), counts.copy(), score, center.copy(), fours.copy()]
+    
     def is_terminal(self) -> bool:
         """检查游戏是否结束"""
-        return self.get_winner() is not None or self.move_count >= self.board_size * self.board_size
+        return self.winner is not None or self.move_count >= self.board_size * self.board_size
     
     def get_winner(self) -> Optional[int]:
-        """获取获胜者"""
+        """获取获胜者（O(1)，读取step中增量维护的缓存）"""
+        return self.winner
+    
+    def _scan_winner(self) -> Optional[int]:
+        """全盘扫描获胜者，用于棋盘被外部直接修改后重建缓存"""
         for i in range(self.board_size):
             for j in range(self.board_size):
                 if self.board[i, j] == 0:
@@ -81,9 +294,24 @@ class GomokuGame(BaseGame):
                         else:
                             break
                     if count >= self.win_length:
-                        return player
+                        return int(player)
         return None
     
+    def compute_zobrist_hash(self) -> int:
+        """根据当前棋盘和行棋方从头计算Zobrist哈希"""
+        value = self._zobrist_side if self.current_player == 2 else 0
+        for flat in np.flatnonzero(self.board):
+            row, col = divmod(int(flat), self.board_size)
+            value ^= self._zobrist_keys[int(flat) * 3 + int(self.board[row, col])]
+        return value
+    
+    def sync_caches(self):
+        """直接修改board或current_player后调用，重新计算获胜者缓存、Zobrist哈希、候选集合和棋型表"""
+        self.winner = self._scan_winner()
+        self.zobrist_hash = self.compute_zobrist_hash()
+        self._candidates = {}
+        self._patterns = None
+    
     def get_state(self) -> Dict[str, Any]:
         """获取当前游戏状态"""
         return {
@@ -105,6 +333,12 @@ class GomokuGame(BaseGame):
         new_game.current_player = self.current_player
         new_game.game_state = self.game_state
         new_game.move_count = self.move_count
+        new_game.winner = self.winner
+        new_game._undo_winners = self._undo_winners.copy()
+        new_game.zobrist_hash = self.zobrist_hash
+        new_game._candidates = {radius: (counts.copy(), candidates.copy())
+                                for radius, (counts, candidates) in self._candidates.items()}
+        new_game._patterns = self._copy_patterns()
         new_game.history = copy.deepcopy(self.history)
         return new_game
     
@@ -0,0 +1,239 @@
+"""
+五子棋棋型识别
+用查找表一次性识别整个棋盘上的连五、活四、冲四、活三、眠三、活二、眠二，
+供MinimaxBot的局面评估、RuleBasedGomokuBot和MCTS模拟策略共用
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple
+
+# 棋型编号（数值越大越强，一个窗口只记最强的棋型）
+NONE = 0
+TWO = 1          # 眠二
+OPEN_TWO = 2     # 活二
+THREE = 3        # 眠三
+OPEN_THREE = 4   # 活三
+FOUR = 5         # 冲四
+OPEN_FOUR = 6    # 活四
+FIVE = 7         # 连五
+NUM_PATTERNS = 8
+
+PATTERN_NAMES = ['none', 'two', 'open_two', 'three', 'open_three', 'four', 'open_four', 'five']
+
+# 每个棋型的分值，与MinimaxBot原评估的量级一致：连五100000、四10000、三1000
+PATTERN_SCORES = np.array([0, 10, 100, 100, 1000, 1000, 10000, 100000])
+
+WINDOW = 6   # 窗口长度：连五加一侧、或活棋型加两侧空位
+WALL = 3     # 棋盘外的格子编码（0空 1/2棋子 3墙）
+CENTER_WEIGHT = 10
+
+# 窗口编码时每个位置的基数：code = sum(cell[k] * 4**k)
+_POWERS = 4 ** np.arange(WINDOW)
+
+
+def _classify_window(cells: Tuple[int, ...]) -> int:
+    """从玩家1的视角判断一个6格窗口的棋型"""
+    own = [cell == 1 for cell in cells]
+    free = [cell == 0 for cell in cells]
+    best = NONE
+    # 窗口内的两个5格子窗口：只含己方棋子和空位时才有成五的可能
+    for start in (0, 1):
+        span = range(start, start + 5)
+        if not all(own[k] or free[k] for k in span):
+            continue
+        stones = sum(own[k] for k in span)
+        if stones == 5:
+            return FIVE
+        best = max(best, {4: FOUR, 3: THREE, 2: TWO}.get(stones, NONE))
+    # 两端都是空位、中间4格只有己方棋子和空位时是活棋型
+    if free[0] and free[5] and all(own[k] or free[k] for k in range(1, 5)):
+        stones = sum(own[1:5])
+        best = max(best, {4: OPEN_FOUR, 3: OPEN_THREE, 2: OPEN_TWO}.get(stones, NONE))
+    return best
+
+
+def _build_tables() -> np.ndarray:
+    """建立查找表：tables[player][code] 为该窗口对player的棋型"""
+    tables = np.zeros((3, 4 ** WINDOW), dtype=np.int8)
+    swap = (0, 2, 1, WALL)  # 交换双方棋子，玩家2复用玩家1的判断
+    for code in range(4 ** WINDOW):
+        cells = tuple((code >> (2 * k)) & 3 for k in range(WINDOW))
+        tables[1, code] = _classify_window(cells)
+        tables[2, code] = _classify_window(tuple(swap[cell] for cell in cells))
+    return tables
+
+
+PATTERN_TABLES = _build_tables()
+# 分值表：score_tables[player][code] 为该窗口对player的净分（己方棋型分 - 对方棋型分）
+SCORE_TABLES = np.zeros((3, 4 ** WINDOW), dtype=np.int64)
+SCORE_TABLES[1] = PATTERN_SCORES[PATTERN_TABLES[1]] - PATTERN_SCORES[PATTERN_TABLES[2]]
+SCORE_TABLES[2] = -SCORE_TABLES[1]
+# 增量更新时逐个查表，用Python列表比numpy标量索引快：
+# 双方棋型合成一个编号 class1 * NUM_PATTERNS + class2，一次查表同时得到两边的棋型
+PAIR_TABLE = PATTERN_TABLES[1].astype(np.int64) * NUM_PATTERNS + PATTERN_TABLES[2]
+PAIR_LIST = PAIR_TABLE.tolist()
+SCORE_LIST = SCORE_TABLES[1].tolist()
+# 某一方有冲四及以上棋型（落一子即可成五）的棋型对
+FOUR_PAIRS = [pair // NUM_PATTERNS >= FOUR or pair % NUM_PATTERNS >= FOUR
+              for pair in range(NUM_PATTERNS * NUM_PATTERNS)]
+
+# 中心权重缓存: board_size -> 每个格子的中心分
+_CENTER_WEIGHTS = {}
+
+
+def center_weights(board_size: int) -> np.ndarray:
+    """获取中心分矩阵：max(7-|行距|,0) + max(7-|列距|,0)"""
+    if board_size not in _CENTER_WEIGHTS:
+        center = board_size // 2
+        line = np.maximum(7 - np.abs(np.arange(board_size) - center), 0)
+        _CENTER_WEIGHTS[board_size] = line[:, None] + line[None, :]
+    return _CENTER_WEIGHTS[board_size]
+
+
+# 窗口下标缓存: board_size -> (补墙后的棋盘大小, 所有窗口在补墙棋盘上的扁平下标)
+_WINDOW_INDEX = {}
+
+
+def window_index(board_size: int) -> Tuple[int, np.ndarray]:
+    """
+    获取四个方向上所有6格窗口的下标矩阵，形状为 (窗口数, 6)
+
+    棋盘四周补一圈墙，贴边的连五也会落在某个包含墙的窗口里。
+    """
+    if board_size not in _WINDOW_INDEX:
+        padded_size = board_size + 2
+        grid = np.arange(padded_size * padded_size).reshape(padded_size, padded_size)
+        windows = []
+        for line_grid in (grid[1:-1], grid[:, 1:-1].T):
+            # 横向、纵向：每条线上的滑动窗口
+            windows.append(np.lib.stride_tricks.sliding_window_view(line_grid, WINDOW, axis=1).reshape(-1, WINDOW))
+        for diag_grid in (grid, grid[:, ::-1]):
+            # 主对角线、副对角线（副对角线在左右翻转的下标上按主对角线取）
+            for offset in range(-(padded_size - WINDOW), padded_size - WINDOW + 1):
+                line = np.diagonal(diag_grid, offset)
+                windows.append(np.lib.stride_tricks.sliding_window_view(line, WINDOW))
+        _WINDOW_INDEX[board_size] = (padded_size, np.ascontiguousarray(np.concatenate(windows)))
+    return _WINDOW_INDEX[board_size]
+
+
+def window_codes(board: np.ndarray) -> np.ndarray:
+    """计算四个方向上所有6格窗口的4进制编码（一维数组）"""
+    padded_size, index = window_index(board.shape[0])
+    padded = np.full((padded_size, padded_size), WALL, dtype=np.int64)
+    padded[1:-1, 1:-1] = board
+    return padded.ravel()[index] @ _POWERS
+
+
+# 格子所在窗口缓存: board_size -> 每个棋盘格子（扁平下标）所在的 (窗口编号, 该位置的4进制权重)
+_CELL_WINDOWS = {}
+
+
+def cell_windows(board_size: int) -> List[List[Tuple[int, int]]]:
+    """获取每个格子所在的全部窗口，落子只会改变这些窗口的编码"""
+    if board_size not in _CELL_WINDOWS:
+        padded_size, index = window_index(board_size)
+        cells = [[] for _ in range(board_size * board_size)]
+        for window, padded_cells in enumerate(index.tolist()):
+            for k, padded_flat in enumerate(padded_cells):
+                row, col = divmod(padded_flat, padded_size)
+                if 1 <= row <= board_size and 1 <= col <= board_size:
+                    cells[(row - 1) * board_size + col - 1].append((window, 4 ** k))
+        _CELL_WINDOWS[board_size] = cells
+    return _CELL_WINDOWS[board_size]
+
+
+# 窗口所含格子缓存: board_size -> 每个窗口6个位置对应的棋盘扁平下标（墙为-1）
+_WINDOW_CELLS = {}
+
+
+def window_cells(board_size: int) -> List[List[int]]:
+    """获取每个窗口6个位置对应的棋盘格子"""
+    if board_size not in _WINDOW_CELLS:
+        padded_size, index = window_index(board_size)
+        windows = []
+        for padded_cells in index.tolist():
+            cells = []
+            for padded_flat in padded_cells:
+                row, col = divmod(padded_flat, padded_size)
+                inside = 1 <= row <= board_size and 1 <= col <= board_size
+                cells.append((row - 1) * board_size + col - 1 if inside else -1)
+            windows.append(cells)
+        _WINDOW_CELLS[board_size] = windows
+    return _WINDOW_CELLS[board_size]
+
+
+def five_points(code: int, player: int) -> List[int]:
+    """获取窗口内player落子即成五的位置（窗口内下标0-5）"""
+    cells = [(code >> (2 * k)) & 3 for k in range(WINDOW)]
+    points = []
+    for start in (0, 1):
+        span = cells[start:start + 5]
+        if span.count(player) == 4 and span.count(0) == 1:
+            point = start + span.index(0)
+            if point not in points:
+                points.append(point)
+    return points
+
+
+def count_patterns(board: np.ndarray, player: int, codes: np.ndarray = None) -> np.ndarray:
+    """统计player各棋型的窗口数，下标为棋型编号"""
+    if codes is None:
+        codes = window_codes(board)
+    return np.bincount(PATTERN_TABLES[player][codes], minlength=NUM_PATTERNS)
+
+
+def evaluate_board(board: np.ndarray, player: int) -> int:
+    """
+    评估局面（从player的视角，越大越好）
+
+    己方棋型加分、对方棋型减分，再加上己方棋子的中心分。
+    """
+    board = np.asarray(board)
+    score = int(SCORE_TABLES[player][window_codes(board)].sum())
+    score += CENTER_WEIGHT * int(center_weights(board.shape[0])[board == player].sum())
+    return score
+
+
+def pattern_summary(board: np.ndarray, player: int) -> Dict[str, int]:
+    """获取player各棋型数量（按棋型名称）"""
+    counts = count_patterns(np.asarray(board), player)
+    return {name: int(counts[index]) for index, name in enumerate(PATTERN_NAMES) if index}
+
+
+def line_run_lengths(board: np.ndarray, player: int, max_length: int = 5) -> np.ndarray:
+    """
+    批量版move_run_lengths，棋盘的批量维度放在最后：形状为 (N, N, ...)，返回int8数组
+
+    批量维度在最后时每次移位取的都是连续的整块内存，比逐个棋盘计算快得多。
+    """
+    board = np.asarray(board)
+    size = board.shape[0]
+    pad = max_length - 1
+    mine = np.zeros((size + 2 * pad, size + 2 * pad) + board.shape[2:], dtype=np.int8)
+    mine[pad:-pad, pad:-pad] = board == player
+    best = np.zeros(board.shape, dtype=np.int8)
+    run = np.empty(board.shape, dtype=np.int8)
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        length = np.ones(board.shape, dtype=np.int8)
+        for sign in (1, -1):
+            run[...] = 1
+            for k in range(1, max_length):
+                row = pad + sign * k * dr
+                col = pad + sign * k * dc
+                run &= mine[row:row + size, col:col + size]
+                length += run
+        np.maximum(best, length, out=best)
+    best[board != 0] = 0
+    return best
+
+
+def move_run_lengths(board: np.ndarray, player: int, max_length: int = 5) -> np.ndarray:
+    """
+    计算每个空位落子后player能连成的最长直线长度（非空位为0）
+
+    每侧最多数max_length-1个子，与逐点判断"落子后是否成n连"（n<=max_length）的结果一致。
+    board可以带前置的批量维度 (..., N, N)，对每个棋盘分别计算。
+    """
+    board = np.moveaxis(np.asarray(board), (-2, -1), (0, 1))
+    runs = line_run_lengths(board, player, max_length)
+    return np.moveaxis(runs, (0, 1), (-2, -1)).astype(np.int64)
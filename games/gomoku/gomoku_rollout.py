@@ -0,0 +1,216 @@
+"""
+五子棋快速模拟引擎
+专供MCTS随机模拟使用：一维带墙棋盘、可交换删除的空位数组、
+增量维护的"落子成五/成四"点集，只根据最后一步判断终局
+"""
+
+import random
+import numpy as np
+from typing import Dict, Optional, Tuple
+from games.gomoku.gomoku_patterns import line_run_lengths, move_run_lengths
+
+WALL = 3
+
+# 棋盘几何缓存: board_size -> (行宽, 数组长度, 行优先格子到一维下标的映射)
+_GEOMETRY = {}
+
+
+def _geometry(board_size: int) -> Tuple[int, int, np.ndarray]:
+    """
+    一维棋盘布局
+
+    每行末尾留一个墙格，上下各留一行墙，(row, col) 对应下标 (row + 1) * width + col。
+    行末的墙同时是下一行左侧的墙，任何方向走出棋盘都会先碰到墙，无需边界判断。
+    """
+    if board_size not in _GEOMETRY:
+        width = board_size + 1
+        length = (board_size + 2) * width
+        rows, cols = np.divmod(np.arange(board_size * board_size), board_size)
+        _GEOMETRY[board_size] = (width, length, (rows + 1) * width + cols)
+    return _GEOMETRY[board_size]
+
+
+class GomokuRollout:
+    """
+    单次随机模拟
+
+    从一个局面出发按MCTSBot的优先级规则走到终局：自己成五、挡对手成五、自己成四、
+    挡对手成四、占中心、随机落子。每条规则内取行优先的第一个点，与逐格扫描的结果一致。
+    """
+
+    def __init__(self, game):
+        board_size = game.board_size
+        width, length, cell_index = _geometry(board_size)
+        self.width = width
+        self.win_length = game.win_length
+        self.directions = (1, width, width + 1, width - 1)
+        self.center = cell_index[(board_size // 2) * board_size + board_size // 2]
+        self.current_player = game.current_player
+        self.winner = game.get_winner()
+        self.done = game.is_terminal()
+
+        board = np.asarray(game.board).ravel()
+        cells = np.full(length, WALL, dtype=np.int64)
+        cells[cell_index] = board
+        self.cells = cells.tolist()
+        empty = cell_index[board == 0].tolist()
+        self.empty = empty
+        self.position: Dict[int, int] = {cell: index for index, cell in enumerate(empty)}
+        # 落子即成五 / 成四的空位，键为玩家编号
+        self.fives = {1: set(), 2: set()}
+        self.fours = {1: set(), 2: set()}
+        if not self.done:
+            for player in (1, 2):
+                runs = move_run_lengths(game.board, player)
+                self.fives[player] = set(cell_index[np.flatnonzero(runs >= 5)].tolist())
+                self.fours[player] = set(cell_index[np.flatnonzero(runs >= 4)].tolist())
+
+    def play(self, player_id: int, rng=random) -> Optional[int]:
+        """按优先级规则模拟到终局，返回获胜者（平局为None）；rules里的"自己"指player_id"""
+        opponent = 2 if player_id == 1 else 1
+        # player_id不在棋盘上（如旁观视角）时没有"自己"的点集，与逐格扫描一致
+        rules = (self.fives.get(player_id, ()), self.fives[opponent],
+                 self.fours.get(player_id, ()), self.fours[opponent])
+        center = self.center
+        while not self.done:
+            empty = self.empty
+            if not empty:
+                break
+            # 1. 自己五连  2. 对手五连  3. 自己四连  4. 对手四连
+            for candidates in rules:
+                if candidates:
+                    cell = min(candidates)
+                    break
+            else:
+                # 5. 中心优先  6. 随机
+                if center in self.position:
+                    cell = center
+                else:
+                    cell = empty[rng.randrange(len(empty))]
+            self._place(cell)
+        return self.winner
+
+    def _place(self, cell: int):
+        """落子并增量更新空位数组、成五/成四点集和终局状态"""
+        player = self.current_player
+        cells = self.cells
+        cells[cell] = player
+        # 交换删除：用最后一个空位填补被占的位置
+        empty, position = self.empty, self.position
+        index = position.pop(cell)
+        last = empty.pop()
+        if last != cell:
+            empty[index] = last
+            position[last] = index
+        for sets in (self.fives, self.fours):
+            sets[1].discard(cell)
+            sets[2].discard(cell)
+
+        # 只有经过这一子的四条线会变化：重算这些线上己方连子两端的空位
+        for step in self.directions:
+            line = 1
+            for direction in (step, -step):
+                neighbor = cell + direction
+                while cells[neighbor] == player:
+                    line += 1
+                    neighbor += direction
+                if cells[neighbor] == 0:
+                    self._update_cell(neighbor, player)
+            if line >= self.win_length:
+                self.winner = player
+                self.done = True
+        if not empty:
+            self.done = True
+        self.current_player = 3 - player
+
+    def _update_cell(self, cell: int, player: int):
+        """重算空位cell落子后player能连成的最长长度，更新成五/成四点集"""
+        cells = self.cells
+        best = 0
+        for step in self.directions:
+            line = 1
+            for direction in (step, -step):
+                neighbor = cell + direction
+                count = 0
+                while count < 4 and cells[neighbor] == player:
+                    count += 1
+                    neighbor += direction
+                line += count
+            if line > best:
+                best = line
+        if best >= 5:
+            self.fives[player].add(cell)
+        else:
+            self.fives[player].discard(cell)
+        if best >= 4:
+            self.fours[player].add(cell)
+        else:
+            self.fours[player].discard(cell)
+
+
+def rollout(game, player_id: int, rng=random) -> Optional[int]:
+    """从game的局面做一次快速模拟（不修改game），返回获胜者"""
+    return GomokuRollout(game).play(player_id, rng)
+
+
+def batch_rollout(games, player_id: int, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    批量模拟：把K个局面叠成一个批量棋盘同步推进，返回每局的获胜者（平局为0）
+
+    每一步对所有未结束的棋盘一起计算双方的连子长度，按与GomokuRollout相同的优先级
+    给空位打分，用掩码argmax选点（同一规则内取行优先第一个，没有规则命中时随机）。
+    获胜判断看落子点的连子长度，即对己方棋子做四个方向的移位卷积。
+
+    棋盘按 (N*N, K) 存放，批量维度在最后，移位运算都在连续内存上进行。
+    随机落子用开局时给每局生成的随机优先级：已占的格子优先级置为-1，
+    剩余空位中优先级最高的一个在所有空位中是均匀随机的。
+    """
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    first = games[0]
+    board_size, win_length = first.board_size, first.win_length
+    cells = board_size * board_size
+    boards = np.stack([np.asarray(game.board, dtype=np.int8).ravel() for game in games], axis=1)
+    movers = np.array([game.current_player for game in games], dtype=np.int8)
+    winners = np.array([game.get_winner() or 0 for game in games], dtype=np.int64)
+    live = np.array([not game.is_terminal() for game in games])
+    priority = np.where(boards == 0, rng.random(boards.shape, dtype=np.float32), np.float32(-1))
+    remaining = (boards == 0).sum(axis=0)
+    opponent = 2 if player_id == 1 else 1
+    center = (board_size // 2) * board_size + board_size // 2
+    max_length = max(5, win_length)
+    # ids[j] 为工作区第j列对应的原始局面编号，结束的局面在工作区里积累到一定数量再统一移出
+    ids = np.arange(len(games))
+
+    while True:
+        if not live.all():
+            if not live.any():
+                break
+            ids, boards, movers, remaining = ids[live], boards[:, live], movers[live], remaining[live]
+            priority = priority[:, live]
+            live = live[live]
+        columns = np.arange(len(ids))
+        grids = boards.reshape(board_size, board_size, -1)
+        runs = {player: line_run_lengths(grids, player, max_length).reshape(cells, -1)
+                for player in (1, 2)}
+        # 规则等级：5自己五连 4对手五连 3自己四连 2对手四连 1中心，取最高等级中行优先的第一个
+        level = np.zeros(boards.shape, dtype=np.int8)
+        level[center] = boards[center] == 0
+        np.maximum(level, 2 * (runs[opponent] >= 4), out=level, casting='unsafe')
+        np.maximum(level, 4 * (runs[opponent] >= 5), out=level, casting='unsafe')
+        own = runs.get(player_id)
+        if own is not None:
+            np.maximum(level, 3 * (own >= 4), out=level, casting='unsafe')
+            np.maximum(level, 5 * (own >= 5), out=level, casting='unsafe')
+        ruled = level.argmax(axis=0)
+        choice = np.where(level[ruled, columns] > 0, ruled, priority.argmax(axis=0))
+
+        boards[choice, columns] = movers
+        priority[choice, columns] = -1
+        mover_runs = np.where(movers == 1, runs[1][choice, columns], runs[2][choice, columns])
+        won = mover_runs >= win_length
+        winners[ids[won]] = movers[won]
+        remaining -= 1
+        movers = 3 - movers
+        live = ~won & (remaining > 0)
+    return winners
@@ -10,11 +10,18 @@ from games.snake.snake_game import SnakeGame
 
 
 class SnakeEnv(BaseEnv):
-    """贪吃蛇环境"""
+    """
+    贪吃蛇环境
     
-    def __init__(self, board_size=20, **kwargs):
+    joint为True时双方同时移动：step接收 (玩家1动作, 玩家2动作)，奖励为 (玩家1奖励, 玩家2奖励)，
+    动作掩码的形状为 (2, 4)。seed设置本局食物位置的随机数（见SnakeGame）。
+    """
+    
+    def __init__(self, board_size=20, joint=False, seed=None, **kwargs):
         self.board_size = board_size
-        self.game = SnakeGame(board_size)
+        self.joint = joint
+        self.reward_shape = (2,) if joint else ()
+        self.game = SnakeGame(board_size, seed=seed)
         super().__init__(self.game)
 
     def _setup_spaces(self):
@@ -29,7 +36,7 @@ class SnakeEnv(BaseEnv):
     def _get_action_mask(self):
         """获取动作掩码"""
         # 贪吃蛇所有方向都可能有效，但要避免直接掉头
-        return np.ones(4, dtype=bool)  # [up, down, left, right]
+        return np.ones((2, 4) if self.joint else 4, dtype=bool)  # [up, down, left, right]
 
     def get_valid_actions(self):
         """获取有效动作"""
@@ -84,17 +91,25 @@ class SnakeEnv(BaseEnv):
     def clone(self):
         """克隆环境"""
         cloned_game = self.game.clone()
-        cloned_env = SnakeEnv(self.board_size)
+        cloned_env = SnakeEnv(self.board_size, joint=self.joint)
         cloned_env.game = cloned_game
         return cloned_env 
     
     def step(self, action):
+        if self.joint:
+            action1, action2 = (tuple(a) for a in action)
+            return self.step_joint(action1, action2)
         observation, reward, done, info = self.game.step(action)
         terminated = done  # 只要有一方死亡就为True
         truncated = False  # 你没有超时/截断逻辑
         return observation, reward, terminated, truncated, info
     
-    def reset(self):
-        observation = self.game.reset()
+    def step_joint(self, action1, action2):
+        """双方同时移动一步，奖励为 (玩家1奖励, 玩家2奖励)"""
+        observation, rewards, done, info = self.game.step_joint(action1, action2)
+        return observation, rewards, done, False, info
+    
+    def reset(self, seed=None):
+        observation = self.game.reset(seed)
         info = {}  # 可选，补充信息
         return observation, info
\ No newline at end of file
@@ -4,16 +4,82 @@
 
 import numpy as np
 import random
-from typing import Dict, List, Tuple, Any, Optional
+import weakref
+from collections import deque
+from collections.abc import Mapping
+from typing import Dict, List, Tuple, Any, Optional, Iterator, Sequence
 from ..base_game import BaseGame
 import config
 
 
+class SnakeState(Mapping):
+    """
+    SnakeGame.get_state返回的惰性状态
+    
+    标量字段在构造时记录，棋盘、蛇身、食物和有效动作在首次访问时才从游戏复制并缓存。
+    游戏只以弱引用持有状态：变化时如果状态仍被外部持有，先复制尚未访问的字段（写时复制），
+    之后它就是变化前局面的完整快照；没有人持有时直接丢弃，什么都不复制。
+    同一版本内get_state返回同一个对象，棋盘等字段由各持有者共享。
+    """
+    
+    KEYS = ('board', 'snake1', 'snake2', 'foods', 'direction1', 'direction2', 'alive1', 'alive2',
+            'current_player', 'valid_actions', 'game_state', 'move_count')
+    LAZY_KEYS = ('board', 'snake1', 'snake2', 'foods', 'valid_actions')
+    
+    def __init__(self, game: 'SnakeGame'):
+        self._game = game
+        self._values = {
+            'direction1': game.direction1,
+            'direction2': game.direction2,
+            'alive1': game.alive1,
+            'alive2': game.alive2,
+            'current_player': game.current_player,
+            'game_state': game.game_state,
+            'move_count': game.move_count,
+        }
+    
+    def __getitem__(self, key: str) -> Any:
+        values = self._values
+        if key in values:
+            return values[key]
+        if key not in self.LAZY_KEYS:
+            raise KeyError(key)
+        game = self._game
+        if key == 'board':
+            value = game.board.copy()
+        elif key == 'snake1':
+            value = list(game.snake1)
+        elif key == 'snake2':
+            value = list(game.snake2)
+        elif key == 'foods':
+            value = game.foods.copy()
+        else:
+            value = game.get_valid_actions()
+        values[key] = value
+        return value
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+    
+    def __len__(self) -> int:
+        return len(self.KEYS)
+    
+    def _detach(self):
+        """游戏即将变化而状态仍被持有：复制尚未访问的字段，之后不再引用游戏"""
+        for key in self.LAZY_KEYS:
+            self[key]
+        self._game = None
+
+
 class SnakeGame(BaseGame):
     """双人贪吃蛇游戏"""
     
+    # 占用网格的取值：空、蛇1、蛇2、食物
+    EMPTY, SNAKE1, SNAKE2, FOOD = 0, 1, 2, 3
+    # 占用网格 -> 棋盘编码（蛇头在get_state里另外写入）
+    BOARD_CODES = np.array([0, 2, 4, 5])
     
-    def __init__(self, board_size: int = 20, initial_length: int = 3, food_count: int = 5):
+    def __init__(self, board_size: int = 20, initial_length: int = 3, food_count: int = 5, seed: int = None):
 
 
         game_config = {
@@ -30,27 +96,54 @@ class SnakeGame(BaseGame):
         
         super().__init__(game_config)
       
-        # 蛇的位置和方向
-        self.snake1 = []  # 玩家1的蛇
-        self.snake2 = []  # 玩家2的蛇
+        # 蛇的位置和方向（deque，头部在左端）
+        self.snake1 = deque()  # 玩家1的蛇
+        self.snake2 = deque()  # 玩家2的蛇
         self.direction1 = (0, 1)  # 玩家1的方向
         self.direction2 = (0, -1)  # 玩家2的方向
         
         # 食物位置
         self.foods = []
         
+        # 占用网格：按 x * board_size + y 存放每格的占用者，随移动O(1)更新
+        self.grid = bytearray(board_size * board_size)
+        # 空格索引：_free是全部空格的编号（无序），_free_pos[格子]是它在_free中的下标（非空为-1），
+        # 交换删除保持O(1)；_free_log记录每次增删和替换，pop时按相反顺序精确还原
+        self._free = []
+        self._free_pos = []
+        self._free_log = []
+        # 观察用的棋盘（头部1/3，身体2/4，食物5），随移动只改头尾所在的格子
+        self.board = np.zeros((board_size, board_size), dtype=int)
+        
+        # get_state的缓存（弱引用）：状态版本号在每次变化时加一
+        self.version = 0
+        self._state = None
+        
         # 游戏状态
         self.alive1 = True
         self.alive2 = True
         
+        # push/pop的撤销记录
+        self._undo_stack = []
+        
+        # 本局的随机数（食物位置）：给定seed时只在这里设置一次，否则每次reset从全局random取种子
+        self.rng = random.Random(seed)
+        self._seeded = seed is not None
+        
         self.reset()
     
-    def reset(self) -> Dict[str, Any]:
-        """重置游戏状态"""
+    def reset(self, seed: int = None) -> Dict[str, Any]:
+        """重置游戏状态，给定seed时重新设置本局的随机数"""
+        self._invalidate_state()
+        if seed is not None:
+            self.rng.seed(seed)
+            self._seeded = True
+        elif not self._seeded:
+            self.rng.seed(random.getrandbits(64))
         # 初始化蛇的位置
         center = self.board_size // 2
-        self.snake1 = [(center, center - 2)]
-        self.snake2 = [(center, center + 2)]
+        self.snake1 = deque([(center, center - 2)])
+        self.snake2 = deque([(center, center + 2)])
         
         # 初始化方向
         self.direction1 = (0, 1)  # 向右
@@ -58,6 +151,7 @@ class SnakeGame(BaseGame):
         
         # 初始化食物
         self.foods = []
+        self._build_grid()
         self._generate_foods()
         
         # 重置游戏状态
@@ -67,6 +161,7 @@ class SnakeGame(BaseGame):
         self.game_state = config.GameState.ONGOING
         self.move_count = 0
         self.history = []
+        self._undo_stack = []
         
         return self.get_state()
     
@@ -83,38 +178,170 @@ class SnakeGame(BaseGame):
             done: 是否结束
             info: 额外信息
         """
-        # 更新方向
-        if self.current_player == 2:
-            self.direction2 = action
-        
-        # 移动蛇
-        if self.current_player == 1 and self.alive1:
-            self._move_snake(1)
-        elif self.current_player == 2 and self.alive2:
-            self._move_snake(2)
+        player = self.current_player
+        self.push(action)
         
         # 检查游戏结束条件
         done = self._check_game_over()
         
         # 计算奖励
-        reward = self._calculate_reward()
+        reward = self._calculate_reward(player)
         
         # 获取观察状态
         observation = self.get_state()
         
-        # 额外信息
-        info = {
+        return observation, reward, done, self._step_info()
+    
+    def step_joint(self, action1: Tuple[int, int],
+                   action2: Tuple[int, int]) -> Tuple[Dict[str, Any], Tuple[float, float], bool, Dict[str, Any]]:
+        """
+        双方同时移动一步
+        
+        Args:
+            action1: 玩家1的方向向量
+            action2: 玩家2的方向向量
+            
+        Returns:
+            observation: 观察状态
+            rewards: (玩家1奖励, 玩家2奖励)
+            done: 是否结束
+            info: 额外信息
+        """
+        self.push_joint(action1, action2)
+        done = self._check_game_over()
+        rewards = (self._calculate_reward(1), self._calculate_reward(2))
+        return self.get_state(), rewards, done, self._step_info()
+    
+    def _step_info(self) -> Dict[str, Any]:
+        """step返回的额外信息"""
+        return {
             'snake1_length': len(self.snake1),
             'snake2_length': len(self.snake2),
             'food_count': len(self.foods),
             'alive1': self.alive1,
             'alive2': self.alive2
         }
+    
+    def push(self, action: Tuple[int, int]) -> None:
+        """
+        执行当前玩家的一步（不构造观察），可用pop撤销（含生成新食物消耗的随机数）
+        """
+        self._invalidate_state()
+        player = self.current_player
+        self._undo_stack.append(self._undo_record(player, action, (player,)))
         
-         # 切换玩家
+        # 更新方向
+        if player == 1:
+            self.direction1 = action
+        else:
+            self.direction2 = action
+        
+        # 移动蛇
+        if player == 1 and self.alive1:
+            self._move_snake(1)
+        elif player == 2 and self.alive2:
+            self._move_snake(2)
+        
+        # 切换玩家
         if self.alive1 and self.alive2:
             self.current_player = 2 if self.current_player == 1 else 1
-        return observation, reward, done, info
+    
+    def push_joint(self, action1: Tuple[int, int], action2: Tuple[int, int]) -> None:
+        """
+        双方同时移动一步（不构造观察），可用pop撤销
+        
+        两个新蛇头都按移动前的局面判断撞墙和撞蛇身（尾部仍算障碍，与轮流移动一致）；
+        两个新蛇头落在同一格时较短的一方死亡，等长则双方都死亡；
+        互相穿过对方时新蛇头落在对方原来的蛇头上，双方都算撞到蛇身。
+        """
+        self._invalidate_state()
+        movers = [player for player, alive in ((1, self.alive1), (2, self.alive2)) if alive]
+        self._undo_stack.append(self._undo_record(0, (action1, action2), movers))
+        if self.alive1:
+            self.direction1 = action1
+        if self.alive2:
+            self.direction2 = action2
+        
+        targets = {}
+        for player in movers:
+            snake, direction = (self.snake1, self.direction1) if player == 1 else (self.snake2, self.direction2)
+            new_head = (snake[0][0] + direction[0], snake[0][1] + direction[1])
+            if self._collides(new_head):
+                self._kill(player)
+            else:
+                targets[player] = new_head
+        
+        # 正面相撞
+        if len(targets) == 2 and targets[1] == targets[2]:
+            length1, length2 = len(self.snake1), len(self.snake2)
+            if length1 <= length2:
+                self._kill(1)
+                del targets[1]
+            if length2 <= length1:
+                self._kill(2)
+                del targets[2]
+        
+        ate = [self._advance(player, new_head) for player, new_head in targets.items()]
+        if any(ate):
+            self._refill_foods()
+    
+    def _undo_record(self, player: int, action: Any, movers: Sequence[int]) -> Dict[str, Any]:
+        """push/push_joint的撤销记录，player为0表示双方同时移动"""
+        snakes = []
+        for mover in movers:
+            snake = self.snake1 if mover == 1 else self.snake2
+            snakes.append((mover, snake[0], snake[-1], len(snake)))
+        return {
+            'player': player,
+            'action': action,
+            'direction1': self.direction1,
+            'direction2': self.direction2,
+            'alive1': self.alive1,
+            'alive2': self.alive2,
+            'current_player': self.current_player,
+            'snakes': snakes,
+            'foods': self.foods.copy(),
+            'free_log': len(self._free_log),
+        }
+    
+    def pop(self) -> Any:
+        """撤销最近一次push或push_joint，返回当时的动作"""
+        self._invalidate_state()
+        record = self._undo_stack.pop()
+        grid = self.grid
+        board = self.board
+        size = self.board_size
+        # 先清掉当前的食物：同时移动时新食物可能生成在另一条蛇刚空出的尾部
+        for x, y in self.foods:
+            grid[x * size + y] = self.EMPTY
+            board[x, y] = 0
+        # 移动时头部插入一格；未吃到食物时尾部同时弹出
+        for player, head, tail, length in reversed(record['snakes']):
+            snake = self.snake1 if player == 1 else self.snake2
+            if snake[0] == head:
+                continue
+            x, y = snake.popleft()
+            grid[x * size + y] = self.EMPTY
+            board[x, y] = 0
+            if len(snake) < length:
+                x, y = tail
+                snake.append(tail)
+                grid[x * size + y] = player
+                board[x, y] = 2 * player
+            board[snake[0]] = 2 * player - 1
+        self.foods = record['foods']
+        for x, y in self.foods:
+            grid[x * size + y] = self.FOOD
+            board[x, y] = 5
+        self.direction1 = record['direction1']
+        self.direction2 = record['direction2']
+        self.alive1 = record['alive1']
+        self.alive2 = record['alive2']
+        self.current_player = record['current_player']
+        self._undo_free(record['free_log'])
+        if 'rng' in record:
+            self.rng.setstate(record['rng'])
+        return record['action']
     
     def get_valid_actions(self, player: int = None) -> List[Tuple[int, int]]:
         """获取有效动作列表"""
@@ -134,6 +361,16 @@ class SnakeGame(BaseGame):
         
         return valid_directions
     
+    def is_body(self, pos: Tuple[int, int]) -> bool:
+        """该格是否被蛇身占据（不含两条蛇的尾部，尾部下一步会移走）"""
+        x, y = pos
+        occupant = self.grid[x * self.board_size + y]
+        if occupant == self.SNAKE1:
+            return pos != self.snake1[-1]
+        if occupant == self.SNAKE2:
+            return pos != self.snake2[-1]
+        return False
+    
     def is_terminal(self) -> bool:
         """只要有一方死亡就结束"""
         return not self.alive1 or not self.alive2
@@ -151,39 +388,33 @@ class SnakeGame(BaseGame):
             return None  # 平局
     
     def get_state(self) -> Dict[str, Any]:
-        """获取当前游戏状态"""
-        # 创建棋盘
-        board = np.zeros((self.board_size, self.board_size), dtype=int)
-        
-        # 绘制蛇1
-        for i, (x, y) in enumerate(self.snake1):
-            if 0 <= x < self.board_size and 0 <= y < self.board_size:
-                board[x, y] = 1 if i == 0 else 2  # 头部为1，身体为2
-        
-        # 绘制蛇2
-        for i, (x, y) in enumerate(self.snake2):
-            if 0 <= x < self.board_size and 0 <= y < self.board_size:
-                board[x, y] = 3 if i == 0 else 4  # 头部为3，身体为4
-        
-        # 绘制食物
-        for x, y in self.foods:
-            if 0 <= x < self.board_size and 0 <= y < self.board_size:
-                board[x, y] = 5
-        
-        return {
-            'board': board,
-            'snake1': self.snake1.copy(),
-            'snake2': self.snake2.copy(),
-            'foods': self.foods.copy(),
-            'direction1': self.direction1,
-            'direction2': self.direction2,
-            'alive1': self.alive1,
-            'alive2': self.alive2,
-            'current_player': self.current_player,
-            'valid_actions': self.get_valid_actions(),
-            'game_state': self.game_state,
-            'move_count': self.move_count
-        }
+        """获取当前游戏状态（游戏没有变化时返回同一个惰性状态对象）"""
+        state = self._state() if self._state is not None else None
+        if state is None:
+            state = SnakeState(self)
+            self._state = weakref.ref(state)
+        return state
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """pickle和深拷贝时不带状态缓存（弱引用不能序列化）"""
+        attributes = self.__dict__.copy()
+        attributes['_state'] = None
+        return attributes
+    
+    def update_game_state(self):
+        """更新游戏状态，结果变化时使状态缓存失效"""
+        game_state = self.game_state
+        super().update_game_state()
+        if self.game_state != game_state:
+            self._invalidate_state()
+    
+    def _invalidate_state(self):
+        """游戏即将变化：仍被持有的状态补齐为快照，版本号加一"""
+        state = self._state() if self._state is not None else None
+        if state is not None:
+            state._detach()
+        self._state = None
+        self.version += 1
     
     def render(self) -> np.ndarray:
         """渲染游戏画面"""
@@ -198,12 +429,22 @@ class SnakeGame(BaseGame):
         cloned_game.direction1 = self.direction1
         cloned_game.direction2 = self.direction2
         cloned_game.foods = self.foods.copy()
+        cloned_game.grid = bytearray(self.grid)
+        cloned_game._free = self._free.copy()
+        cloned_game._free_pos = self._free_pos.copy()
+        cloned_game._free_log = self._free_log.copy()
+        cloned_game.rng.setstate(self.rng.getstate())
+        cloned_game._seeded = self._seeded
         cloned_game.alive1 = self.alive1
         cloned_game.alive2 = self.alive2
         cloned_game.current_player = self.current_player
         cloned_game.game_state = self.game_state
         cloned_game.move_count = self.move_count
+        cloned_game.board = self.board.copy()
         cloned_game.history = self.history.copy()
+        # pop会把记录里的食物列表恢复为self.foods并原地修改，不能与原游戏共享
+        cloned_game._undo_stack = [{**record, 'foods': record['foods'].copy()} for record in self._undo_stack]
+        cloned_game._invalidate_state()
         return cloned_game
     
     def get_action_space(self):
@@ -237,60 +478,150 @@ class SnakeGame(BaseGame):
         head = snake[0]
         new_head = (head[0] + direction[0], head[1] + direction[1])
         
-        # 检查边界碰撞
-        if (new_head[0] < 0 or new_head[0] >= self.board_size or
-            new_head[1] < 0 or new_head[1] >= self.board_size):
-            if player == 1:
-                self.alive1 = False
-            else:
-                self.alive2 = False
-            return
-        
-        # 检查自身碰撞
-        if new_head in snake:
-            if player == 1:
-                self.alive1 = False
-            else:
-                self.alive2 = False
+        if self._collides(new_head):
+            self._kill(player)
             return
         
-        # 检查与对方蛇的碰撞
-        other_snake = self.snake2 if player == 1 else self.snake1
-        if new_head in other_snake:
-            if player == 1:
-                self.alive1 = False
-            else:
-                self.alive2 = False
-            return
-        
-        # 移动蛇
-        snake.insert(0, new_head)
-        
-        # 检查是否吃到食物
-        if new_head in self.foods:
+        if self._advance(player, new_head):
+            self._refill_foods()
+    
+    def _collides(self, new_head: Tuple[int, int]) -> bool:
+        """新蛇头是否撞墙或撞到任意蛇身（含尾部）"""
+        x, y = new_head
+        if x < 0 or x >= self.board_size or y < 0 or y >= self.board_size:
+            return True
+        occupant = self.grid[x * self.board_size + y]
+        return occupant == self.SNAKE1 or occupant == self.SNAKE2
+    
+    def _kill(self, player: int):
+        """玩家死亡"""
+        if player == 1:
+            self.alive1 = False
+        else:
+            self.alive2 = False
+    
+    def _advance(self, player: int, new_head: Tuple[int, int]) -> bool:
+        """蛇头移到new_head（调用方已确认不会碰撞），返回是否吃到食物（新食物由调用方补充）"""
+        snake = self.snake1 if player == 1 else self.snake2
+        grid = self.grid
+        cell = new_head[0] * self.board_size + new_head[1]
+        ate = grid[cell] == self.FOOD
+        
+        # 原头部改为身体，新头部写入头部编码
+        board = self.board
+        board[snake[0]] = 2 * player
+        snake.appendleft(new_head)
+        grid[cell] = player
+        board[new_head] = 2 * player - 1
+        
+        if ate:
             self.foods.remove(new_head)
-            self._generate_foods()
         else:
-            snake.pop()
+            x, y = snake.pop()
+            tail = x * self.board_size + y
+            grid[tail] = self.EMPTY
+            board[x, y] = 0
+            # 空出的尾部直接占用新蛇头在空格索引中的位置
+            free_pos = self._free_pos
+            pos = free_pos[cell]
+            self._free[pos] = tail
+            free_pos[tail] = pos
+            free_pos[cell] = -1
+            self._free_log.append((cell, pos, tail))
+        return ate
+    
+    def _occupy(self, cell: int):
+        """把空格cell移出空格索引：用末尾的空格填补它的位置"""
+        free, free_pos = self._free, self._free_pos
+        pos = free_pos[cell]
+        last = free.pop()
+        if last != cell:
+            free[pos] = last
+            free_pos[last] = pos
+        free_pos[cell] = -1
+        self._free_log.append((cell, pos))
+    
+    def _release(self, cell: int):
+        """把cell加入空格索引末尾"""
+        self._free_pos[cell] = len(self._free)
+        self._free.append(cell)
+        self._free_log.append((cell, -1))
+    
+    def _undo_free(self, mark: int):
+        """按相反顺序撤销空格索引的增删，直到_free_log只剩前mark条"""
+        free, free_pos, log = self._free, self._free_pos, self._free_log
+        while len(log) > mark:
+            entry = log.pop()
+            if len(entry) == 3:
+                # 蛇移动：新蛇头换回尾部的位置
+                cell, pos, tail = entry
+                free[pos] = cell
+                free_pos[cell] = pos
+                free_pos[tail] = -1
+                continue
+            cell, pos = entry
+            if pos < 0:
+                free.pop()
+                free_pos[cell] = -1
+                continue
+            if pos < len(free):
+                # 移出时末尾的空格被换到了pos，把它放回末尾
+                last = free[pos]
+                free_pos[last] = len(free)
+                free.append(last)
+                free[pos] = cell
+            else:
+                free.append(cell)
+            free_pos[cell] = pos
+    
+    def _build_grid(self):
+        """
+        按当前蛇身和食物重建占用网格、棋盘和空格索引（直接修改snake1/snake2/foods后调用）
+        
+        重建后之前的push不能再pop。
+        """
+        self._invalidate_state()
+        self.grid = bytearray(self.board_size * self.board_size)
+        for occupant, cells in ((self.SNAKE1, self.snake1), (self.SNAKE2, self.snake2), (self.FOOD, self.foods)):
+            for x, y in cells:
+                self.grid[x * self.board_size + y] = occupant
+        occupancy = np.frombuffer(self.grid, dtype=np.uint8).reshape(self.board_size, self.board_size)
+        self._free = np.flatnonzero(occupancy.ravel() == self.EMPTY).tolist()
+        self._free_pos = [-1] * len(self.grid)
+        for pos, cell in enumerate(self._free):
+            self._free_pos[cell] = pos
+        self._free_log = []
+        self._undo_stack = []
+        self.board = self.BOARD_CODES[occupancy]
+        for code, snake in ((1, self.snake1), (3, self.snake2)):
+            if snake:
+                self.board[snake[0]] = code
+    
+    def _refill_foods(self):
+        """吃到食物后补充新食物：先把随机数状态记入这一步的撤销记录，pop时一起回退"""
+        self._undo_stack[-1]['rng'] = self.rng.getstate()
+        self._generate_foods()
     
     def _generate_foods(self):
-        """生成食物"""
-        while len(self.foods) < self.food_count:
-            x = random.randint(0, self.board_size - 1)
-            y = random.randint(0, self.board_size - 1)
-            pos = (x, y)
-            
-            # 确保食物不在蛇身上
-            if pos not in self.snake1 and pos not in self.snake2 and pos not in self.foods:
-                self.foods.append(pos)
+        """从空格中均匀抽取位置补足食物，没有空格时少放"""
+        free = self._free
+        while len(self.foods) < self.food_count and free:
+            cell = free[self.rng.randrange(len(free))]
+            self._occupy(cell)
+            self.grid[cell] = self.FOOD
+            x, y = divmod(cell, self.board_size)
+            self.foods.append((x, y))
+            self.board[x, y] = 5
     
     def _check_game_over(self) -> bool:
         """只要有一方死亡就结束"""
         return not self.alive1 or not self.alive2
     
-    def _calculate_reward(self) -> float:
-        """计算奖励"""
-        if self.current_player == 1:
+    def _calculate_reward(self, player: int = None) -> float:
+        """计算奖励（默认从当前玩家视角）"""
+        if player is None:
+            player = self.current_player
+        if player == 1:
             if not self.alive1:
                 return -1.0
             elif not self.alive2:
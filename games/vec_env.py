@@ -0,0 +1,528 @@
+"""
+向量化环境
+把B个环境打包成一个批量接口：reset/step一次处理全部环境，
+返回堆叠好的 (B, ...) 观察数组、奖励/终止/截断向量和动作掩码，结束的环境自动重置
+"""
+
+import os
+import random
+import multiprocessing
+from functools import partial
+from multiprocessing import shared_memory
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+import numpy as np
+import config
+from games.base_env import BaseEnv
+
+
+class VecEnv(ABC):
+    """
+    向量化环境基类
+
+    step返回 (observations, rewards, terminated, truncated, infos)：
+    前四项都是以环境为第一维的数组，infos是数组字典。
+    某个环境结束后会立即重置，返回的是新一局的初始观察，
+    结束时的观察和获胜者放在 infos['final_observation'] 和 infos['winner'] 中（0表示无人获胜）。
+    """
+
+    def __init__(self, num_envs: int):
+        self.num_envs = num_envs
+
+    @abstractmethod
+    def reset(self) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """重置全部环境"""
+        pass
+
+    @abstractmethod
+    def step(self, actions: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """每个环境执行一个动作"""
+        pass
+
+    @abstractmethod
+    def get_action_masks(self) -> np.ndarray:
+        """获取全部环境的动作掩码，形状为 (B, ...)"""
+        pass
+
+    def close(self) -> None:
+        """关闭环境"""
+        pass
+
+
+class SyncVecEnv(VecEnv):
+    """在当前进程里逐个调用BaseEnv的通用向量化环境，适用于任何游戏"""
+
+    def __init__(self, env_fns: Sequence[Callable[[], BaseEnv]]):
+        super().__init__(len(env_fns))
+        self.envs = [env_fn() for env_fn in env_fns]
+
+    def reset(self) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """重置全部环境"""
+        infos = [env.reset()[1] for env in self.envs]
+        return self._observations(), {'infos': infos}
+
+    def step(self, actions: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """逐个环境执行动作，结束的环境自动重置"""
+        rewards = np.zeros((self.num_envs,) + self.envs[0].reward_shape, dtype=np.float64)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        winners = np.zeros(self.num_envs, dtype=np.int64)
+        final_observations = [None] * self.num_envs
+        infos = []
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            if isinstance(action, np.ndarray):
+                action = tuple(action.tolist())
+            _, reward, done, cut, info = env.step(action)
+            rewards[index], terminated[index], truncated[index] = reward, done, cut
+            if done or cut:
+                final_observations[index] = env._get_observation()
+                winners[index] = env.game.get_winner() or 0
+                env.reset()
+            infos.append(info)
+        observations = self._observations()
+        final = np.array([observation if final is None else final
+                          for observation, final in zip(observations, final_observations)])
+        return observations, rewards, terminated, truncated, {
+            'final_observation': final, 'winner': winners, 'infos': infos}
+
+    def get_action_masks(self) -> np.ndarray:
+        """获取全部环境的动作掩码"""
+        return np.stack([env.get_action_mask() for env in self.envs])
+
+    def close(self) -> None:
+        """关闭全部环境"""
+        for env in self.envs:
+            env.close()
+
+    def _observations(self) -> np.ndarray:
+        """堆叠全部环境的观察"""
+        return np.stack([env._get_observation() for env in self.envs])
+
+
+class GomokuVecEnv(VecEnv):
+    """
+    纯NumPy的五子棋向量化环境
+
+    B个棋盘存放在一个四周补墙的 (B, N+2p, N+2p) 数组里，动作是 (B, 2) 的 (row, col)。
+    奖励、非法落子的处理与GomokuEnv一致：落子方获胜1、平局0.5、非法落子-1000并结束。
+    胜负只沿最后一步的四个方向数连子，不扫描全盘。
+    """
+
+    def __init__(self, num_envs: int, board_size: int = 15, win_length: int = 5):
+        super().__init__(num_envs)
+        self.board_size = board_size
+        self.win_length = win_length
+        self.pad = win_length - 1
+        size = board_size + 2 * self.pad
+        self._boards = np.full((num_envs, size, size), 3, dtype=np.int8)
+        self.current_player = np.ones(num_envs, dtype=np.int8)
+        self.move_count = np.zeros(num_envs, dtype=np.int64)
+        self._all = np.arange(num_envs)
+
+    @property
+    def boards(self) -> np.ndarray:
+        """棋盘视图 (B, N, N)"""
+        pad = self.pad
+        return self._boards[:, pad:pad + self.board_size, pad:pad + self.board_size]
+
+    def reset(self) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """重置全部环境"""
+        self._reset_envs(self._all)
+        return self.boards.copy(), {}
+
+    def step(self, actions: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """全部环境各落一子，结束的环境自动重置"""
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs, 2)
+        rows = actions[:, 0] + self.pad
+        cols = actions[:, 1] + self.pad
+        envs = self._all
+        player = self.current_player.copy()
+        valid = self._boards[envs, rows, cols] == 0
+        self._boards[envs[valid], rows[valid], cols[valid]] = player[valid]
+        self.move_count += valid
+
+        won = valid & self._wins(rows, cols, player)
+        draw = valid & ~won & (self.move_count >= self.board_size * self.board_size)
+        terminated = ~valid | won | draw
+        rewards = np.where(won, 1.0, np.where(draw, 0.5, np.where(valid, 0.0, -1000.0)))
+        winners = np.where(won, player, 0).astype(np.int64)
+        self.current_player = np.where(valid, 3 - player, player).astype(np.int8)
+
+        final = self.boards.copy()
+        self._reset_envs(envs[terminated])
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        return self.boards.copy(), rewards, terminated, truncated, {
+            'final_observation': final, 'winner': winners}
+
+    def get_action_masks(self) -> np.ndarray:
+        """空位为True，形状为 (B, N, N)"""
+        return self.boards == 0
+
+    def _wins(self, rows: np.ndarray, cols: np.ndarray, player: np.ndarray) -> np.ndarray:
+        """落子点在四个方向上是否连成win_length（补墙保证不会越界）"""
+        boards, envs = self._boards, self._all
+        won = np.zeros(self.num_envs, dtype=bool)
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            length = np.ones(self.num_envs, dtype=np.int64)
+            for sign in (1, -1):
+                run = np.ones(self.num_envs, dtype=bool)
+                for k in range(1, self.win_length):
+                    run &= boards[envs, rows + sign * k * dr, cols + sign * k * dc] == player
+                    length += run
+            won |= length >= self.win_length
+        return won
+
+    def _reset_envs(self, envs: np.ndarray):
+        """把指定的环境恢复为空棋盘"""
+        if not len(envs):
+            return
+        pad = self.pad
+        self._boards[envs, pad:pad + self.board_size, pad:pad + self.board_size] = 0
+        self.current_player[envs] = 1
+        self.move_count[envs] = 0
+
+
+class SnakeVecEnv(VecEnv):
+    """
+    纯NumPy的双人贪吃蛇向量化环境
+
+    规则与SnakeGame相同：双方轮流移动，撞墙、撞到任意蛇身即死亡，有一方死亡就结束，
+    观察为SnakeGame的棋盘编码（1/3蛇头，2/4蛇身，5食物）。动作是 (B, 2) 的方向向量，设置当前行动方的方向。
+    joint为True时与SnakeGame.step_joint相同，双方同时移动：动作为 (B, 2, 2)，奖励为 (B, 2)，
+    动作掩码为 (B, 2, 4)，每步计一个回合。
+    蛇身不存坐标列表，每个格子记录还要过几步才会空出来：不吃食物时行动方的计数全部减一，
+    吃到食物时计数不变、长度加一。超过max_moves步的对局记为截断。
+    """
+
+    DIRECTIONS = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)], dtype=np.int64)  # 上下左右
+    BODY_CODES = np.array([0, 2, 4, 0], dtype=np.int8)  # owner -> 观察编码（蛇头另外写入）
+
+    def __init__(self, num_envs: int, board_size: int = 20, food_count: int = 5, max_moves: int = None,
+                 seed: int = None, joint: bool = False):
+        super().__init__(num_envs)
+        self.board_size = board_size
+        self.joint = joint
+        self.food_count = food_count
+        self.max_moves = max_moves or config.GAME_CONFIGS['snake']['max_moves']
+        self.rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+        size = board_size + 2
+        # owner: 0空 1/2蛇身所属玩家 3墙；life: 该格蛇身还要几步空出
+        self._owner = np.full((num_envs, size, size), 3, dtype=np.int8)
+        self._life = np.zeros((num_envs, size, size), dtype=np.int32)
+        self._food = np.zeros((num_envs, size, size), dtype=bool)
+        self.heads = np.zeros((num_envs, 3, 2), dtype=np.int64)       # 下标为玩家编号，坐标含墙偏移
+        self.directions = np.zeros((num_envs, 3, 2), dtype=np.int64)
+        self.lengths = np.zeros((num_envs, 3), dtype=np.int64)
+        self.alive = np.ones((num_envs, 3), dtype=bool)
+        self.current_player = np.ones(num_envs, dtype=np.int64)
+        self.move_count = np.zeros(num_envs, dtype=np.int64)
+        self._all = np.arange(num_envs)
+
+    def reset(self) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """重置全部环境"""
+        self._reset_envs(self._all)
+        return self._observations(), {}
+
+    def step(self, actions: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """每个环境的当前行动方移动一步（joint时双方同时移动），结束的环境自动重置"""
+        if self.joint:
+            return self._step_joint(actions)
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs, 2)
+        envs = self._all
+        player = self.current_player.copy()
+        self.directions[envs, player] = actions
+        new_heads = self.heads[envs, player] + actions
+        # 撞墙和撞蛇身一起判断（尾巴还没移走，也算障碍）
+        moving = self.alive[envs, player]
+        crashed = moving & (self._owner[envs, new_heads[:, 0], new_heads[:, 1]] != 0)
+        self.alive[envs[crashed], player[crashed]] = False
+        self._spawn_foods(self._move(moving & ~crashed, player, new_heads))
+        self.move_count += 1
+
+        other = 3 - player
+        mover_alive = self.alive[envs, player]
+        other_alive = self.alive[envs, other]
+        terminated = ~mover_alive | ~other_alive
+        truncated = ~terminated & (self.move_count >= self.max_moves)
+        rewards = np.where(~mover_alive, -1.0, np.where(~other_alive, 1.0, 0.0))
+        winners = np.where(mover_alive & ~other_alive, player, np.where(other_alive & ~mover_alive, other, 0))
+        self.current_player = np.where(terminated, player, other)
+
+        final = self._observations()
+        self._reset_envs(envs[terminated | truncated])
+        return self._observations(), rewards, terminated, truncated, {
+            'final_observation': final, 'winner': winners}
+
+    def _step_joint(self, actions: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray,
+                                                         Dict[str, Any]]:
+        """双方同时移动一步：碰撞按移动前的局面判断，新蛇头落在同一格时较短的一方死亡，等长都死亡"""
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs, 2, 2)
+        envs = self._all
+        # 进行中的环境双方都活着（有一方死亡的环境已经重置）
+        self.directions[:, 1:] = actions
+        new_heads = self.heads[:, 1:] + actions
+        crashed = self._owner[envs[:, None], new_heads[..., 0], new_heads[..., 1]] != 0
+        head_on = np.all(new_heads[:, 0] == new_heads[:, 1], axis=1)
+        lengths = self.lengths[:, 1:]
+        crashed[:, 0] |= head_on & (lengths[:, 0] <= lengths[:, 1])
+        crashed[:, 1] |= head_on & (lengths[:, 1] <= lengths[:, 0])
+        self.alive[:, 1:] &= ~crashed
+        # 两条蛇的新蛇头不在同一格，先后移动互不影响；新食物等双方都移动后再补
+        grown = [self._move(~crashed[:, index], np.full(self.num_envs, index + 1), new_heads[:, index])
+                 for index in range(2)]
+        for envs_grown in grown:
+            self._spawn_foods(envs_grown)
+        self.move_count += 1
+
+        alive1, alive2 = self.alive[:, 1], self.alive[:, 2]
+        terminated = ~alive1 | ~alive2
+        truncated = ~terminated & (self.move_count >= self.max_moves)
+        rewards = np.stack([np.where(~alive1, -1.0, np.where(~alive2, 1.0, 0.0)),
+                            np.where(~alive2, -1.0, np.where(~alive1, 1.0, 0.0))], axis=1)
+        winners = np.where(alive1 & ~alive2, 1, np.where(alive2 & ~alive1, 2, 0))
+
+        final = self._observations()
+        self._reset_envs(envs[terminated | truncated])
+        return self._observations(), rewards, terminated, truncated, {
+            'final_observation': final, 'winner': winners}
+
+    def _move(self, moved: np.ndarray, player: np.ndarray, new_heads: np.ndarray) -> np.ndarray:
+        """把moved中各环境player的蛇头移到new_heads（已确认不会碰撞），返回吃到食物的环境编号"""
+        envs = self._all
+        rows, cols = new_heads[:, 0], new_heads[:, 1]
+        ate = moved & self._food[envs, rows, cols]
+        # 没吃到食物：行动方蛇身计数减一，减到0的格子空出
+        shrink = moved & ~ate
+        body = (self._owner == player[:, None, None]) & shrink[:, None, None]
+        self._life -= body
+        self._owner[body & (self._life == 0)] = 0
+        grown = envs[ate]
+        self.lengths[grown, player[ate]] += 1
+        self._food[grown, rows[ate], cols[ate]] = False
+        mover = envs[moved]
+        self._owner[mover, rows[moved], cols[moved]] = player[moved]
+        self._life[mover, rows[moved], cols[moved]] = self.lengths[mover, player[moved]]
+        self.heads[mover, player[moved]] = new_heads[moved]
+        return grown
+
+    def get_action_masks(self) -> np.ndarray:
+        """当前行动方（joint时为双方）的四个方向（上下左右），直接掉头为False"""
+        if self.joint:
+            current = self.directions[:, 1:]
+            return ~np.all(self.DIRECTIONS[None, None] == -current[:, :, None, :], axis=3)
+        current = self.directions[self._all, self.current_player]
+        return ~np.all(self.DIRECTIONS[None, :, :] == -current[:, None, :], axis=2)
+
+    def _observations(self) -> np.ndarray:
+        """生成SnakeGame编码的棋盘 (B, N, N)"""
+        board = self.BODY_CODES.take(self._owner[:, 1:-1, 1:-1])
+        board = np.where(self._food[:, 1:-1, 1:-1], np.int8(5), board)
+        for player, code in ((1, 1), (2, 3)):
+            heads = self.heads[:, player] - 1
+            board[self._all, heads[:, 0], heads[:, 1]] = code
+        return board
+
+    def _reset_envs(self, envs: np.ndarray):
+        """把指定的环境恢复到SnakeGame.reset的初始局面"""
+        if not len(envs):
+            return
+        size = self.board_size
+        center = size // 2 + 1
+        self._owner[envs, 1:-1, 1:-1] = 0
+        self._life[envs] = 0
+        self._food[envs] = False
+        for player, col, direction in ((1, center - 2, (0, 1)), (2, center + 2, (0, -1))):
+            self._owner[envs, center, col] = player
+            self._life[envs, center, col] = 1
+            self.heads[envs, player] = (center, col)
+            self.directions[envs, player] = direction
+            self.lengths[envs, player] = 1
+        self.alive[envs] = True
+        self.current_player[envs] = 1
+        self.move_count[envs] = 0
+        for _ in range(self.food_count):
+            self._spawn_foods(envs)
+
+    def _spawn_foods(self, envs: np.ndarray):
+        """在每个指定环境的空格中均匀随机放一个食物（带噪声的掩码argmax）"""
+        if not len(envs):
+            return
+        free = (self._owner[envs] == 0) & ~self._food[envs]
+        noise = np.where(free, self.rng.random(free.shape, dtype=np.float32), -1.0)
+        cells = noise.reshape(len(envs), -1).argmax(axis=1)
+        has_room = free.reshape(len(envs), -1)[np.arange(len(envs)), cells]
+        rows, cols = np.divmod(cells, self.board_size + 2)
+        self._food[envs[has_room], rows[has_room], cols[has_room]] = True
+
+
+def _async_worker(pipe, env_fns, start: int, specs: Dict[str, Tuple[str, tuple, str]]):
+    """
+    AsyncVecEnv的工作进程：持有一段环境，按主进程的命令执行，结果直接写入共享内存
+
+    specs为 {缓冲区名: (共享内存名, 形状, dtype)}，本进程只写自己负责的 [start, start+len) 这段。
+    """
+    envs = SyncVecEnv(env_fns)
+    stop = start + envs.num_envs
+    shared = {name: shared_memory.SharedMemory(name=shm_name) for name, (shm_name, _, _) in specs.items()}
+    buffers = {name: np.ndarray(shape, dtype=dtype, buffer=shared[name].buf)[start:stop]
+               for name, (_, shape, dtype) in specs.items()}
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == 'reset':
+                observations, _ = envs.reset()
+                buffers['observations'][:] = observations
+            elif command == 'step':
+                observations, rewards, terminated, truncated, infos = envs.step(data)
+                buffers['observations'][:] = observations
+                buffers['final_observations'][:] = infos['final_observation']
+                buffers['rewards'][:] = rewards
+                buffers['terminated'][:] = terminated
+                buffers['truncated'][:] = truncated
+                buffers['winners'][:] = infos['winner']
+            elif command == 'close':
+                pipe.send(True)
+                break
+            buffers['action_masks'][:] = envs.get_action_masks()
+            pipe.send(True)
+    finally:
+        envs.close()
+        for memory in shared.values():
+            memory.close()
+        pipe.close()
+
+
+class AsyncVecEnv(VecEnv):
+    """
+    多进程向量化环境：工作进程各自持有一段BaseEnv，观察等结果通过共享内存的NumPy数组交换
+
+    step_async发出动作后立即返回，主进程可以同时做推理，再用step_wait取回结果；
+    管道里只传命令、动作和完成信号，不传观察。step返回的infos不含每个环境的info字典。
+    """
+
+    def __init__(self, env_fns: Sequence[Callable[[], BaseEnv]], num_workers: int = None,
+                 context: str = None):
+        super().__init__(len(env_fns))
+        num_workers = min(num_workers or os.cpu_count() or 1, self.num_envs)
+        # 先在主进程里建一个环境，确定观察和动作掩码的形状
+        probe = env_fns[0]()
+        probe.reset()
+        observation = np.asarray(probe._get_observation())
+        mask = np.asarray(probe.get_action_mask())
+        probe.close()
+        count = self.num_envs
+        layout = {
+            'observations': ((count,) + observation.shape, observation.dtype),
+            'final_observations': ((count,) + observation.shape, observation.dtype),
+            'action_masks': ((count,) + mask.shape, mask.dtype),
+            'rewards': ((count,) + probe.reward_shape, np.float64),
+            'terminated': ((count,), np.bool_),
+            'truncated': ((count,), np.bool_),
+            'winners': ((count,), np.int64),
+        }
+        self._shared = {}
+        self._buffers = {}
+        specs = {}
+        for name, (shape, dtype) in layout.items():
+            nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            memory = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._shared[name] = memory
+            self._buffers[name] = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+            specs[name] = (memory.name, shape, np.dtype(dtype).str)
+
+        ctx = multiprocessing.get_context(context)
+        bounds = np.linspace(0, count, num_workers + 1).astype(int)
+        self._slices = [(int(bounds[k]), int(bounds[k + 1])) for k in range(num_workers)]
+        self._pipes = []
+        self._processes = []
+        for start, stop in self._slices:
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_async_worker, args=(child, list(env_fns[start:stop]), start, specs),
+                                  daemon=True)
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._processes.append(process)
+        self._waiting = False
+        self._closed = False
+
+    def reset(self) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """重置全部环境"""
+        for pipe in self._pipes:
+            pipe.send(('reset', None))
+        self._wait_all()
+        return self._buffers['observations'].copy(), {}
+
+    def step_async(self, actions: Sequence[Any]):
+        """把动作分发给各工作进程，不等待结果"""
+        if self._waiting:
+            raise RuntimeError("上一次step_async还没有step_wait")
+        for pipe, (start, stop) in zip(self._pipes, self._slices):
+            pipe.send(('step', list(actions[start:stop])))
+        self._waiting = True
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """等待全部工作进程完成，返回与VecEnv.step相同的结果"""
+        self._wait_all()
+        self._waiting = False
+        buffers = self._buffers
+        return (buffers['observations'].copy(), buffers['rewards'].copy(), buffers['terminated'].copy(),
+                buffers['truncated'].copy(), {'final_observation': buffers['final_observations'].copy(),
+                                              'winner': buffers['winners'].copy()})
+
+    def step(self, actions: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """同步执行一步"""
+        self.step_async(actions)
+        return self.step_wait()
+
+    def get_action_masks(self) -> np.ndarray:
+        """获取全部环境的动作掩码"""
+        return self._buffers['action_masks'].copy()
+
+    def close(self) -> None:
+        """关闭工作进程并释放共享内存"""
+        if self._closed:
+            return
+        if self._waiting:
+            self._wait_all()
+        for pipe in self._pipes:
+            pipe.send(('close', None))
+        for pipe in self._pipes:
+            pipe.recv()
+            pipe.close()
+        for process in self._processes:
+            process.join()
+        self._buffers = {}
+        for memory in self._shared.values():
+            memory.close()
+            memory.unlink()
+        self._closed = True
+
+    def _wait_all(self):
+        """等待每个工作进程的完成信号"""
+        for pipe in self._pipes:
+            pipe.recv()
+
+
+def make_vec_env(game_type: str, num_envs: int, native: bool = True, num_workers: int = 0,
+                 **kwargs) -> VecEnv:
+    """
+    创建向量化环境
+
+    native为True时使用纯NumPy实现；否则逐个包装BaseEnv，num_workers大于0时放到多个工作进程里。
+    """
+    if game_type == 'gomoku':
+        if native:
+            return GomokuVecEnv(num_envs, **kwargs)
+        from games.gomoku import GomokuEnv
+        env_fn = partial(GomokuEnv, **kwargs)
+    elif game_type == 'snake':
+        if native:
+            return SnakeVecEnv(num_envs, **kwargs)
+        from games.snake import SnakeEnv
+        env_fn = partial(SnakeEnv, **kwargs)
+    else:
+        raise ValueError(f"不支持的游戏类型: {game_type}")
+    if num_workers > 0:
+        return AsyncVecEnv([env_fn] * num_envs, num_workers=num_workers)
+    return SyncVecEnv([env_fn] * num_envs)
@@ -16,6 +16,7 @@ from games.snake import SnakeEnv
 from agents import (
     HumanAgent, RandomBot, MinimaxBot, MCTSBot, RLBot, BehaviorTreeBot, SnakeAI
 )
+from utils.match_runner import AgentSpec, EnvSpec, run_match
 
 
 def create_agent(agent_type: str, player_id: int, name: str = None) -> Any:
@@ -116,79 +117,69 @@ def play_single_game(env: Any, agent1: Any, agent2: Any, render: bool = True) ->
     }
 
 
-def evaluate_agents(env: Any, agent1: Any, agent2: Any, num_games: int = 100) -> Dict[str, Any]:
-    """评估两个智能体的性能"""
+def evaluate_agents(env_spec: EnvSpec, agent1_spec: AgentSpec, agent2_spec: AgentSpec, num_games: int = 100,
+                    workers: int = 0, seed: int = 0) -> Dict[str, Any]:
+    """
+    评估两个智能体的性能
+
+    通过match_runner进行：每局按描述新建环境和双方智能体，使用由 (seed, 局号) 确定的种子，
+    双方交替先手（agent1在奇数局执先）；workers大于0时用进程池并行。
+    按时间预算搜索的智能体（minimax、mcts）着法取决于机器负载，串行与并行的结果不保证相同。
+    """
     print(f"\n=== 开始评估 ===")
     print(f"游戏数量: {num_games}")
-    print(f"玩家1: {agent1.name}")
-    print(f"玩家2: {agent2.name}")
+    print(f"玩家1: {agent1_spec.name}")
+    print(f"玩家2: {agent2_spec.name}")
+    
+    def report(match_index, game):
+        if game['game_num'] % 10 == 0:
+            print(f"进度: 第 {game['game_num']}/{num_games} 局完成")
     
+    match_result = run_match(env_spec, agent1_spec, agent2_spec, num_games, seed=seed, workers=workers,
+                             callback=report)
+    summary = match_result['summary']
     results = {
-        'agent1_wins': 0,
-        'agent2_wins': 0,
-        'draws': 0,
-        'total_steps': 0,
+        'agent1_wins': summary['agent1_wins'],
+        'agent2_wins': summary['agent2_wins'],
+        'draws': summary['draws'],
+        'total_steps': sum(game['total_moves'] for game in match_result['games']),
         'avg_steps': 0,
-        'games': []
+        'games': match_result['games'],
+        'agent1_win_rate': summary['agent1_win_rate'],
+        'agent2_win_rate': summary['agent2_win_rate'],
+        'draw_rate': summary['draw_rate'],
     }
-    
-    for i in range(num_games):
-        if (i + 1) % 10 == 0:
-            print(f"进度: {i + 1}/{num_games}")
-        
-        # 重置智能体
-        agent1.reset()
-        agent2.reset()
-        
-        # 进行游戏
-        game_result = play_single_game(env, agent1, agent2, render=False)
-        results['games'].append(game_result)
-        results['total_steps'] += game_result['steps']
-        
-        if game_result['winner'] == 1:
-            results['agent1_wins'] += 1
-        elif game_result['winner'] == 2:
-            results['agent2_wins'] += 1
-        else:
-            results['draws'] += 1
-        
-        # 重置环境
-        env.reset()
-    
-    # 计算统计信息
     results['avg_steps'] = results['total_steps'] / num_games
-    results['agent1_win_rate'] = results['agent1_wins'] / num_games
-    results['agent2_win_rate'] = results['agent2_wins'] / num_games
-    results['draw_rate'] = results['draws'] / num_games
     
     # 打印结果
     print(f"\n=== 评估结果 ===")
     print(f"总游戏数: {num_games}")
-    print(f"{agent1.name} 获胜: {results['agent1_wins']} ({results['agent1_win_rate']:.2%})")
-    print(f"{agent2.name} 获胜: {results['agent2_wins']} ({results['agent2_win_rate']:.2%})")
+    print(f"{agent1_spec.name} 获胜: {results['agent1_wins']} ({results['agent1_win_rate']:.2%})")
+    print(f"{agent2_spec.name} 获胜: {results['agent2_wins']} ({results['agent2_win_rate']:.2%})")
     print(f"平局: {results['draws']} ({results['draw_rate']:.2%})")
     print(f"平均步数: {results['avg_steps']:.1f}")
     
     return results
 
 
-def compare_agents(env: Any, agents: List[Any], num_games: int = 50) -> Dict[str, Any]:
+def compare_agents(env_spec: EnvSpec, agent_specs: List[AgentSpec], num_games: int = 50,
+                   workers: int = 0, seed: int = 0) -> Dict[str, Any]:
     """比较多个智能体"""
     print(f"\n=== 智能体比较 ===")
-    print(f"智能体数量: {len(agents)}")
+    print(f"智能体数量: {len(agent_specs)}")
     print(f"每对对战游戏数: {num_games}")
     
     comparison_results = {}
     
-    for i, agent1 in enumerate(agents):
-        for j, agent2 in enumerate(agents):
+    for i, agent1_spec in enumerate(agent_specs):
+        for j, agent2_spec in enumerate(agent_specs):
             if i >= j:  # 避免重复对战
                 continue
             
-            print(f"\n--- {agent1.name} vs {agent2.name} ---")
-            results = evaluate_agents(env, agent1, agent2, num_games)
+            print(f"\n--- {agent1_spec.name} vs {agent2_spec.name} ---")
+            results = evaluate_agents(env_spec, agent1_spec, agent2_spec, num_games, workers, seed)
             
-            key = f"{agent1.name}_vs_{agent2.name}"
+            key = f"{agent1_spec.name}_vs_{agent2_spec.name}"
             comparison_results[key] = results
     
     return comparison_results
@@ -212,6 +203,8 @@ def main():
     parser.add_argument('--evaluate', action='store_true', help='评估模式')
     parser.add_argument('--compare', action='store_true', help='比较模式')
     parser.add_argument('--no-render', action='store_true', help='不渲染游戏')
+    parser.add_argument('--workers', type=int, default=0, help='评估/比较时的并行进程数（0为串行）')
+    parser.add_argument('--seed', type=int, default=0, help='评估/比较时的随机种子')
     
     # 游戏特定参数
     parser.add_argument('--board-size', type=int, default=15, help='棋盘大小（五子棋）')
@@ -224,35 +217,39 @@ def main():
     try:
         # 根据游戏类型设置参数
         if args.game == 'gomoku':
-            env = create_env(args.game, board_size=args.board_size, win_length=args.win_length)
+            env_kwargs = {'board_size': args.board_size, 'win_length': args.win_length}
         elif args.game == 'snake':
-            env = create_env(args.game, board_size=args.board_size, 
-                           initial_length=args.initial_length, food_count=args.food_count)
+            env_kwargs = {'board_size': args.board_size, 'initial_length': args.initial_length,
+                          'food_count': args.food_count}
         else:
-            env = create_env(args.game)
+            env_kwargs = {}
+        env_spec = EnvSpec(create_env, game_type=args.game, **env_kwargs)
         
-        # 创建智能体
-        agent1 = create_agent(args.player1, 1, args.name1)
-        agent2 = create_agent(args.player2, 2, args.name2)
+        # 智能体描述：评估和比较时每局按描述新建智能体
+        name1 = args.name1 or f"{args.player1}_1"
+        name2 = args.name2 or f"{args.player2}_2"
+        agent1_spec = AgentSpec(create_agent, name1, agent_type=args.player1)
+        agent2_spec = AgentSpec(create_agent, name2, agent_type=args.player2)
         
         if args.compare:
             # 比较模式
-            all_agents = [agent1, agent2]
+            all_specs = [agent1_spec, agent2_spec]
             if args.player1 != args.player2:
                 # 创建更多智能体进行比较
                 for agent_type in ['random', 'minimax', 'mcts']:
                     if agent_type not in [args.player1, args.player2]:
-                        all_agents.append(create_agent(agent_type, len(all_agents) + 1))
+                        name = f"{agent_type}_{len(all_specs) + 1}"
+                        all_specs.append(AgentSpec(create_agent, name, agent_type=agent_type))
             
-            comparison_results = compare_agents(env, all_agents, args.games)
+            comparison_results = compare_agents(env_spec, all_specs, args.games, args.workers, args.seed)
             
         elif args.evaluate or args.games > 1:
             # 评估模式
-            evaluate_agents(env, agent1, agent2, args.games)
+            evaluate_agents(env_spec, agent1_spec, agent2_spec, args.games, args.workers, args.seed)
             
         else:
             # 单局游戏模式
-            play_single_game(env, agent1, agent2, not args.no_render)
+            play_single_game(env_spec.build(), agent1_spec.build(1), agent2_spec.build(2), not args.no_render)
     
     except KeyboardInterrupt:
         print("\n游戏被用户中断")
@@ -77,6 +77,821 @@ def test_gomoku_game():
         return False
 
 
+def test_gomoku_incremental_winner():
+    """测试五子棋增量判胜"""
+    print("\n=== 测试五子棋增量判胜 ===")
+    
+    try:
+        import random
+        from games.gomoku import GomokuGame
+        
+        rng = random.Random(0)
+        for _ in range(20):
+            game = GomokuGame(board_size=9, win_length=5)
+            actions = game.get_valid_actions()
+            rng.shuffle(actions)
+            for action in actions:
+                _, _, done, _ = game.step(action)
+                # 增量缓存必须与全盘扫描结果一致
+                assert game.get_winner() == game._scan_winner()
+                if done:
+                    break
+        print("✓ 增量判胜与全盘扫描一致")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 五子棋增量判胜测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_bitboard_gomoku():
+    """测试位棋盘五子棋与numpy实现一致"""
+    print("\n=== 测试位棋盘五子棋 ===")
+    
+    try:
+        import random
+        import numpy as np
+        from games.gomoku import GomokuGame, BitboardGomokuGame
+        
+        rng = random.Random(1)
+        for _ in range(10):
+            game = GomokuGame(board_size=9, win_length=5)
+            bitboard = BitboardGomokuGame(board_size=9, win_length=5)
+            actions = game.get_valid_actions()
+            rng.shuffle(actions)
+            for action in actions:
+                obs, reward, done, info = game.step(action)
+                bb_obs, bb_reward, bb_done, bb_info = bitboard.step(action)
+                assert (reward, done, info) == (bb_reward, bb_done, bb_info)
+                assert (obs['board'] == bb_obs['board']).all()
+                assert game.get_valid_actions() == bitboard.get_valid_actions()
+                if done:
+                    break
+            assert bitboard.clone().history == game.history
+            # 直接设置board时同步获胜者缓存和Zobrist哈希
+            loaded = BitboardGomokuGame(board_size=9, win_length=5)
+            loaded.current_player = game.current_player
+            loaded.board = game.board
+            assert (loaded.winner, loaded.zobrist_hash) == (game.get_winner(), game.zobrist_hash)
+            bitboard.board = np.zeros((9, 9), dtype=int)
+            empty_hash = bitboard._zobrist_side if bitboard.current_player == 2 else 0
+            assert bitboard.winner is None and bitboard.zobrist_hash == empty_hash
+            # board是只读快照，逐格写入会报错而不是悄悄与位棋盘脱节
+            try:
+                bitboard.board[0, 0] = 1
+                assert False, "位棋盘的board应为只读"
+            except ValueError:
+                pass
+        print("✓ 位棋盘与numpy棋盘逐步一致")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 位棋盘五子棋测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_push_pop():
+    """测试push/pop精确恢复局面"""
+    print("\n=== 测试push/pop ===")
+    
+    try:
+        import random
+        from collections import deque
+        from games.gomoku import GomokuGame, BitboardGomokuGame
+        from games.snake import SnakeGame
+        
+        rng = random.Random(2)
+        for game_cls in (GomokuGame, BitboardGomokuGame):
+            game = game_cls(board_size=9, win_length=5)
+            actions = game.get_valid_actions()
+            rng.shuffle(actions)
+            for action in actions[:10]:
+                game.step(action)
+            snapshot = (game.board.copy(), game.current_player, game.move_count, game.winner, game.history)
+            for action in actions[10:40]:
+                game.push(action)
+            for _ in range(30):
+                game.pop()
+            assert (game.board == snapshot[0]).all()
+            assert (game.current_player, game.move_count, game.winner, game.history) == snapshot[1:]
+        print("✓ 五子棋push/pop恢复一致")
+        
+        def snake_snapshot(game):
+            return (list(game.snake1), list(game.snake2), list(game.foods), game.direction2,
+                    game.alive1, game.alive2, game.current_player, game.move_count)
+        
+        random.seed(2)
+        game = SnakeGame(board_size=10)
+        for _ in range(20):
+            snapshot = snake_snapshot(game)
+            free, rng_state = game._free.copy(), game.rng.getstate()
+            pushed = 0
+            while pushed < 6 and not game.is_terminal():
+                game.push(random.choice(game.get_valid_actions()))
+                pushed += 1
+            for _ in range(pushed):
+                game.pop()
+            assert snake_snapshot(game) == snapshot
+            # 空格索引的顺序和随机数状态也精确还原，之后生成的食物与没有搜索过时相同
+            assert game._free == free and game.rng.getstate() == rng_state
+            # 增量维护的占用网格、棋盘和空格索引与按蛇身重建的一致
+            grid, board = bytearray(game.grid), game.board.copy()
+            assert sorted(game._free) == [cell for cell, occupant in enumerate(grid) if occupant == 0]
+            assert all(game._free_pos[cell] == pos for pos, cell in enumerate(game._free))
+            game._build_grid()
+            assert game.grid == grid and (game.board == board).all()
+            game.step(random.choice(game.get_valid_actions()))
+            if game.is_terminal():
+                game.reset()
+        # 克隆带着撤销记录：原游戏pop后继续走，克隆仍能pop回克隆前的局面
+        for _ in range(10):
+            game = SnakeGame(board_size=8)
+            snapshots = []
+            for _ in range(4):
+                if game.is_terminal():
+                    break
+                snapshots.append(snake_snapshot(game))
+                game.push(random.choice(game.get_valid_actions()))
+            cloned = game.clone()
+            for _ in snapshots:
+                game.pop()
+            for _ in range(30):
+                if game.is_terminal():
+                    break
+                game.push(random.choice(game.get_valid_actions()))
+            for snapshot in reversed(snapshots):
+                cloned.pop()
+                assert snake_snapshot(cloned) == snapshot
+        # get_state在游戏变化前返回同一个惰性状态；变化后仍被持有的状态是变化前局面的完整快照
+        game.reset()
+        state = game.get_state()
+        assert game.get_state() is state and state['board'].flags.writeable
+        version, board, snake1 = game.version, game.board.copy(), list(game.snake1)
+        foods, valid_actions = list(game.foods), game.get_valid_actions()
+        assert state['snake1'] == snake1
+        game.push(game.get_valid_actions()[0])
+        assert game.version > version and game.get_state() is not state
+        assert (state['board'] == board).all() and state['snake1'] == snake1
+        assert state['foods'] == foods and state['valid_actions'] == valid_actions
+        game.pop()
+        # 环境返回的观察保留到下一步之后（经验回放、帧堆叠）仍是当时的局面
+        import copy
+        import pickle
+        from games.snake import SnakeEnv
+        env = SnakeEnv(board_size=8)
+        previous, _ = env.reset()
+        expected = (env.game.board.copy(), list(env.game.foods), list(env.game.snake2))
+        env.step(env.game.get_valid_actions()[0])
+        assert (previous['board'] == expected[0]).all()
+        assert previous['foods'] == expected[1] and previous['snake2'] == expected[2]
+        # 状态缓存是弱引用，不影响pickle和深拷贝
+        held = env.game.get_state()
+        for restored in (pickle.loads(pickle.dumps(env.game)), copy.deepcopy(env.game)):
+            assert restored.snake1 == env.game.snake1 and restored.get_state()['foods'] == held['foods']
+        assert (game.get_state()['board'] == board).all()
+        print("✓ 贪吃蛇push/pop恢复一致")
+        
+        # 不读取状态时，step不复制棋盘、蛇身等惰性字段
+        from games.snake.snake_game import SnakeState
+        materialized = []
+        lazy_getitem = SnakeState.__getitem__
+        def counting_getitem(self, key):
+            if key in SnakeState.LAZY_KEYS and key not in self._values:
+                materialized.append(key)
+            return lazy_getitem(self, key)
+        SnakeState.__getitem__ = counting_getitem
+        try:
+            game = SnakeGame(board_size=10, seed=0)
+            for _ in range(200):
+                if game.is_terminal():
+                    game.reset()
+                game.step(game.get_valid_actions()[game.move_count % 3])
+        finally:
+            SnakeState.__getitem__ = lazy_getitem
+        assert materialized == []
+        print("✓ 未读取的状态字段不会被复制")
+        
+        # 食物只由本局的种子决定；几乎填满的棋盘也能立即放下最后的食物
+        foods = [SnakeGame(board_size=10, seed=7).foods for _ in range(2)]
+        random.seed(0)
+        assert foods[0] == foods[1] == SnakeGame(board_size=10, seed=7).foods
+        game = SnakeGame(board_size=5, food_count=3, seed=1)
+        game.snake1 = deque((x, y) for x in range(5) for y in range(5) if (x, y) not in ((0, 0), (4, 4)))
+        game.snake2 = deque()
+        game.foods = []
+        game._build_grid()
+        game._generate_foods()
+        assert sorted(game.foods) == [(0, 0), (4, 4)] and not game._free
+        print("✓ 贪吃蛇食物从空格均匀抽取且可复现")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ push/pop测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_transposition_table():
+    """测试Zobrist哈希和置换表"""
+    print("\n=== 测试Zobrist哈希和置换表 ===")
+    
+    try:
+        import random
+        from games.gomoku import GomokuGame, BitboardGomokuGame
+        from agents.ai_bots.transposition_table import TranspositionTable, EXACT, LOWER_BOUND
+        
+        rng = random.Random(3)
+        for game_cls in (GomokuGame, BitboardGomokuGame):
+            game = game_cls(board_size=9, win_length=5)
+            actions = game.get_valid_actions()
+            rng.shuffle(actions)
+            for action in actions[:30]:
+                game.push(action)
+                assert game.zobrist_hash == game.compute_zobrist_hash()
+            for _ in range(30):
+                game.pop()
+            assert game.zobrist_hash == 0
+        print("✓ 增量Zobrist哈希与重算一致")
+        
+        table = TranspositionTable(size=4)
+        table.store(1, depth=3, bound=EXACT, score=10, best_move=(0, 0))
+        table.store(5, depth=1, bound=LOWER_BOUND, score=20)  # 同槽位、同一次搜索、更浅：拒绝
+        assert table.probe(1)[2] == 10 and table.probe(5) is None
+        table.new_search()
+        table.store(5, depth=1, bound=LOWER_BOUND, score=20)  # 旧搜索的条目可被替换
+        assert table.probe(5)[2] == 20
+        stats = table.get_stats()
+        assert stats['hits'] == 2 and stats['rejected'] == 1 and stats['overwrites'] == 1
+        print("✓ 置换表替换策略和统计正确")
+        
+        # 胜负分高于任何棋型评估：只搜一层也要直接连五，而不是走评估分更高的着法
+        from agents import MinimaxBot
+        from agents.ai_bots.minimax_bot import WIN_SCORE, score_to_tt, score_from_tt
+        from games.gomoku import GomokuEnv
+        env = GomokuEnv(board_size=15, win_length=5)
+        env.reset()
+        for own, other in zip([(7, 3), (7, 4), (7, 5), (7, 6)], [(0, 0), (14, 14), (0, 14), (14, 0)]):
+            env.step(own)
+            env.step(other)
+        bot = MinimaxBot(player_id=1, max_depth=1, time_limit=5)
+        assert bot.get_action(None, env) in ((7, 2), (7, 7)) and bot.last_score == WIN_SCORE - 1
+        assert score_from_tt(score_to_tt(WIN_SCORE - 5, 3), 1) == WIN_SCORE - 3
+        assert score_from_tt(score_to_tt(-(WIN_SCORE - 5), 3), 1) == -(WIN_SCORE - 3)
+        print("✓ Minimax一层搜索直接取胜")
+        
+        # 显式传入0不能被当作未指定而回落到配置值
+        bot = MinimaxBot(player_id=1, max_depth=0, time_limit=0, tt_size=0)
+        assert bot.max_depth == 0 and bot.time_limit == 0 and bot.tt.capacity == 1
+        assert bot.get_action(None, env) in env.get_valid_actions() and bot.last_depth == 0
+        print("✓ Minimax参数显式为0时不回落到默认值")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Zobrist哈希和置换表测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_candidate_actions():
+    """测试邻域候选着法"""
+    print("\n=== 测试邻域候选着法 ===")
+    
+    try:
+        import random
+        from games.gomoku import GomokuGame, BitboardGomokuGame
+        
+        def brute_force(game, radius):
+            board = game.board
+            size = game.board_size
+            return [(i, j) for i in range(size) for j in range(size)
+                    if board[i, j] == 0 and
+                    (board[max(0, i - radius):i + radius + 1, max(0, j - radius):j + radius + 1] != 0).any()]
+        
+        rng = random.Random(4)
+        for game_cls in (GomokuGame, BitboardGomokuGame):
+            game = game_cls(board_size=9, win_length=5)
+            assert game.get_candidate_actions(2) == [(4, 4)]
+            actions = game.get_valid_actions()
+            rng.shuffle(actions)
+            for action in actions[:25]:
+                game.push(action)
+                for radius in (1, 2):
+                    assert game.get_candidate_actions(radius) == brute_force(game, radius)
+            for _ in range(15):
+                game.pop()
+                assert game.get_candidate_actions(2) == brute_force(game, 2)
+            clone = game.clone()
+            clone.push(clone.get_candidate_actions(1)[0])
+            assert game.get_candidate_actions(2) == brute_force(game, 2)
+        print("✓ 增量候选集在push/pop和克隆后与重算一致")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 邻域候选着法测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_gomoku_patterns():
+    """测试棋型识别"""
+    print("\n=== 测试棋型识别 ===")
+    
+    try:
+        import numpy as np
+        from games.gomoku.gomoku_patterns import pattern_summary, evaluate_board, move_run_lengths
+        
+        board = np.zeros((15, 15), dtype=int)
+        board[7, 3:7] = 1
+        assert pattern_summary(board, 1)['open_four'] == 1
+        board[7, 7] = 2
+        assert pattern_summary(board, 1)['open_four'] == 0 and pattern_summary(board, 1)['four'] > 0
+        for k in range(5):
+            board[10 + k, 4 - k] = 1  # 贴边的副对角线连五
+        assert pattern_summary(board, 1)['five'] > 0 and pattern_summary(board, 2)['five'] == 0
+        assert evaluate_board(board, 1) > 0 > evaluate_board(board, 2)
+        print("✓ 活四、冲四、贴边连五识别正确")
+        
+        rng = np.random.default_rng(1)
+        board = rng.choice(3, size=(9, 9), p=[0.5, 0.25, 0.25])
+        runs = move_run_lengths(board, 1)
+        for i in range(9):
+            for j in range(9):
+                if board[i, j] != 0:
+                    assert runs[i, j] == 0
+                    continue
+                longest = 0
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    length = 1
+                    for sign in (1, -1):
+                        r, c = i + sign * dr, j + sign * dc
+                        while 0 <= r < 9 and 0 <= c < 9 and board[r, c] == 1 and length < 9:
+                            length += 1
+                            r, c = r + sign * dr, c + sign * dc
+                    longest = max(longest, length)
+                assert min(runs[i, j], 5) == min(longest, 5)
+        print("✓ 落子后连子长度与逐点计算一致")
+        
+        import random
+        from games.gomoku import GomokuGame, BitboardGomokuGame
+        rng = random.Random(5)
+        for game_cls in (GomokuGame, BitboardGomokuGame):
+            game = game_cls(board_size=9, win_length=5)
+            game.evaluate(1)  # 建立棋型表，之后随push/pop增量维护
+            actions = game.get_valid_actions()
+            rng.shuffle(actions)
+            for action in actions[:40]:
+                game.push(action)
+                for player in (1, 2):
+                    assert game.evaluate(player) == evaluate_board(game.board, player)
+                    assert game.get_pattern_counts(player) == pattern_summary(game.board, player)
+                    expected = [tuple(int(x) for x in cell) for cell in np.argwhere(move_run_lengths(game.board, player) >= 5)]
+                    assert game.get_winning_moves(player) == expected
+            clone = game.clone()
+            for _ in range(20):
+                game.pop()
+                assert game.evaluate(1) == evaluate_board(game.board, 1)
+            assert clone.evaluate(2) == evaluate_board(clone.board, 2)
+        print("✓ 增量棋型表与全盘识别一致")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 棋型识别测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_mcts_tree():
+    """测试数组化MCTS树"""
+    print("\n=== 测试数组化MCTS树 ===")
+    
+    try:
+        from agents.ai_bots.mcts_tree import MCTSTree, ROOT
+        
+        tree = MCTSTree(capacity=2)
+        tree.reset()
+        tree.expand(ROOT, [(0, 0), (0, 1), (1, 1)])
+        assert tree.capacity >= 4 and not tree.is_fully_expanded(ROOT)
+        # 与从untried_actions末尾pop的顺序一致
+        first = tree.next_untried(ROOT)
+        second = tree.next_untried(ROOT)
+        assert tree.get_action(first) == (1, 1) and tree.get_action(second) == (0, 1)
+        tree.backpropagate(first, 1)
+        tree.backpropagate(second, -1)
+        tree.backpropagate(second, 0)
+        assert list(tree.children(ROOT)) == [first, second]
+        assert tree.visits[ROOT] == 3 and tree.value[ROOT] == 0
+        assert tree.best_child(ROOT) == second
+        tree.expand(second, [(0, 0)])
+        assert tree.get_action(tree.next_untried(second)) == (0, 0)
+        assert tree.get_stats()['nodes'] == 5
+        print("✓ 子节点块分配、展开顺序和回传正确")
+        
+        import math
+        from agents.ai_bots.mcts_bot import MCTSBot
+        bot = MCTSBot()
+        bot.tree = tree
+        c = bot.ucb_c
+        expected = max(tree.children(ROOT), key=lambda child: (
+            tree.value[child] / tree.visits[child] +
+            c * math.sqrt(math.log(tree.visits[ROOT] + 1) / tree.visits[child]), -child))
+        assert bot._uct_select(ROOT) == expected
+        puct_tree = MCTSTree()
+        puct_tree.reset()
+        puct_tree.expand(ROOT, ['a', 'b', 'c'], [0.2, 0.7, 0.1])
+        puct_tree.expand_all(ROOT)
+        puct_bot = MCTSBot(prior_policy=MCTSBot.run_length_prior)
+        puct_bot.tree = puct_tree
+        assert puct_tree.get_action(puct_bot._uct_select(ROOT)) == 'b'
+        print("✓ 向量化UCB1与逐个计算一致，PUCT按先验选择")
+        
+        # 以second为新根，兄弟分支被裁掉，子树统计量保留
+        grandchild = tree.first_child[second]
+        tree.backpropagate(grandchild, 1)
+        assert tree.find_child(ROOT, (0, 1)) == second and tree.find_child(ROOT, (0, 0)) == -1
+        tree.reroot(second)
+        assert tree.size == 2 and tree.visits[ROOT] == 3 and tree.parent[ROOT] == -1
+        assert tree.get_action(tree.find_child(ROOT, (0, 0))) == (0, 0) and tree.parent[1] == ROOT
+        
+        from games.gomoku import GomokuEnv
+        import config
+        simulation_count = config.AI_CONFIGS['mcts']['simulation_count']
+        config.AI_CONFIGS['mcts']['simulation_count'] = 300
+        env = GomokuEnv(board_size=9)
+        env.reset()
+        bots = {1: MCTSBot("MCTS1", 1), 2: MCTSBot("MCTS2", 2)}
+        reused = 0
+        for _ in range(4):
+            bot = bots[env.game.current_player]
+            env.step(bot.get_action(None, env))
+            reused += bot.get_info()['reused_visits']
+        config.AI_CONFIGS['mcts']['simulation_count'] = simulation_count
+        assert reused > 0
+        print(f"✓ 树复用：裁剪后保留子树统计，对局中复用访问数 {reused}")
+        
+        # 贪吃蛇撞墙后不换手：终局叶子的结果仍记在走出这一步的一方
+        from collections import deque
+        from games.snake import SnakeEnv
+        snake_env = SnakeEnv(board_size=8)
+        snake_env.reset()
+        game = snake_env.game
+        game.snake1 = deque([(0, 3), (1, 3), (2, 3)])
+        game.direction1 = (-1, 0)
+        game._build_grid()
+        bot = MCTSBot(player_id=1)
+        bot.simulation_count = 60
+        bot.get_action(None, snake_env)
+        wall = bot.tree.find_child(ROOT, (-1, 0))
+        assert bot.tree.mover[wall] == 1 and bot.tree.terminal[wall]
+        assert bot.tree.value[wall] == -bot.tree.visits[wall] < 0
+        assert bot.tree.get_action(bot.tree.best_child(ROOT)) != (-1, 0)
+        print("✓ 按展开时记录的行棋方回传结果")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 数组化MCTS树测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_gomoku_rollout():
+    """测试五子棋快速模拟引擎"""
+    print("\n=== 测试快速模拟引擎 ===")
+    
+    try:
+        import random
+        import numpy as np
+        from games.gomoku.gomoku_game import GomokuGame
+        from games.gomoku.gomoku_rollout import GomokuRollout, rollout
+        from games.gomoku.gomoku_patterns import move_run_lengths
+        
+        # 随机落子，每一步都与全盘扫描的威胁点、终局判断对比
+        rng = random.Random(7)
+        for board_size in (7, 9):
+            for _ in range(5):
+                game = GomokuGame(board_size=board_size)
+                engine = GomokuRollout(game)
+                width = engine.width
+                while not game.is_terminal():
+                    row, col = rng.choice(game.get_valid_actions())
+                    game.push((row, col))
+                    engine._place((row + 1) * width + col)
+                    assert engine.done == game.is_terminal()
+                    assert engine.winner == game.get_winner()
+                    if engine.done:
+                        break
+                    for player in (1, 2):
+                        runs = move_run_lengths(game.board, player)
+                        for sets, n in ((engine.fives, 5), (engine.fours, 4)):
+                            expected = {(r + 1) * width + c for r, c in zip(*np.nonzero(runs >= n))}
+                            assert sets[player] == expected
+                    assert sorted(engine.empty) == sorted((r + 1) * width + c for r, c in game.get_valid_actions())
+        print("✓ 增量威胁点、空位数组和终局判断与全盘扫描一致")
+        
+        # 一步成五时必然先走成五，且不修改原局面
+        game = GomokuGame(board_size=9)
+        for action in [(0, 0), (8, 8), (0, 1), (8, 7), (0, 2), (8, 6), (0, 3), (7, 0)]:
+            game.push(action)
+        board = game.board.copy()
+        assert rollout(game, 1) == 1
+        assert np.array_equal(game.board, board) and game.move_count == 8
+        print("✓ 优先级规则和局面不变性正确")
+        
+        # 批量模拟：必胜局面全部判对，已终局的局面直接返回获胜者
+        from games.gomoku.gomoku_rollout import batch_rollout
+        finished = game.clone()
+        finished.push((0, 4))
+        winners = batch_rollout([game] * 8 + [finished], 2, np.random.default_rng(0))
+        assert winners.tolist() == [1] * 9
+        empty = GomokuGame(board_size=9)
+        winners = batch_rollout([empty] * 64, 1, np.random.default_rng(0))
+        assert set(winners.tolist()) <= {0, 1, 2} and np.array_equal(empty.board, np.zeros((9, 9)))
+        print("✓ 批量模拟正确")
+        
+        # MCTSBot批量评估叶子：虚拟损失全部撤销，根节点访问数等于模拟次数
+        from agents.ai_bots.mcts_bot import MCTSBot
+        from games.gomoku import GomokuEnv
+        env = GomokuEnv(board_size=9)
+        env.reset()
+        env.step((4, 4))
+        bot = MCTSBot(player_id=2)
+        bot.simulation_count = 50
+        bot.rollout_batch = 16
+        action = bot.get_action(None, env)
+        assert action in env.get_valid_actions()
+        assert bot.tree.visits[0] == 50 == sum(bot.tree.visits[c] for c in bot.tree.children(0))
+        print(f"✓ MCTS批量评估叶子成功，动作: {action}")
+        
+        # 非五子棋游戏用通用随机模拟；自定义策略沿用 policy(node, player_id)，拿到局面副本
+        from games.snake import SnakeEnv
+        snake_env = SnakeEnv(board_size=8)
+        snake_env.reset()
+        for batch in (1, 4):
+            bot = MCTSBot(player_id=1)
+            bot.simulation_count = 20
+            bot.rollout_batch = batch
+            assert bot.get_action(None, snake_env) in snake_env.game.get_valid_actions()
+        seen = []
+        def legacy_policy(node, player_id):
+            seen.append(node.state is not env.game)
+            node.state.step(node.state.get_valid_actions()[0])
+            return 0
+        bot = MCTSBot(player_id=2, simulation_policy=legacy_policy)
+        bot.simulation_count = 10
+        bot.get_action(None, env)
+        assert len(seen) == 10 and all(seen) and bot.tree.visits[0] == 10
+        print("✓ 贪吃蛇随机模拟和旧接口的自定义模拟策略正常")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 快速模拟引擎测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_parallel_mcts():
+    """测试并行MCTS"""
+    print("\n=== 测试并行MCTS ===")
+    
+    try:
+        from agents.ai_bots.parallel_mcts_bot import ParallelMCTSBot
+        from games.gomoku import GomokuEnv
+        
+        env = GomokuEnv(board_size=9)
+        env.reset()
+        env.step((4, 4))
+        for mode in ('root', 'leaf'):
+            bot = ParallelMCTSBot(player_id=2, num_workers=2, parallel_mode=mode)
+            bot.simulation_count = 40
+            try:
+                action = bot.get_action(None, env)
+            finally:
+                bot.close()
+            assert action in env.get_valid_actions()
+            assert bot.get_info()['last_simulations'] == 40
+            if mode == 'leaf':
+                # 虚拟损失全部撤销后，根节点访问数等于真实模拟次数
+                assert bot.tree.visits[0] == sum(bot.tree.visits[c] for c in bot.tree.children(0))
+            print(f"✓ {mode}并行搜索成功，动作: {action}")
+        
+        # 同一种子的两次搜索结果相同；根并行的模拟次数按进程均分，总数不变
+        for mode in ('root', 'leaf'):
+            visits = []
+            for _ in range(2):
+                with ParallelMCTSBot(player_id=2, num_workers=3, parallel_mode=mode, seed=7) as bot:
+                    bot.simulation_count = 41
+                    bot.timeout = float('inf')
+                    action = bot.get_action(None, env)
+                    assert bot.last_simulations == 41
+                    if mode == 'leaf':
+                        visits.append((action, bot.tree.visits[:bot.tree.size].tolist()))
+                    else:
+                        visits.append(action)
+                assert bot._pool is None
+            assert visits[0] == visits[1]
+        print("✓ 固定种子可复现，模拟预算精确分配")
+        
+        # reset和回收Bot时关闭进程池
+        bot = ParallelMCTSBot(player_id=2, num_workers=2, parallel_mode='leaf')
+        bot.simulation_count = 8
+        bot.get_action(None, env)
+        pool = bot._pool
+        bot.reset()
+        assert bot._pool is None and pool._shutdown_thread
+        bot.get_action(None, env)
+        pool = bot._pool
+        del bot
+        import gc
+        gc.collect()
+        assert pool._shutdown_thread
+        print("✓ 进程池在reset、退出with和回收时关闭")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 并行MCTS测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_vec_env():
+    """测试向量化环境"""
+    print("\n=== 测试向量化环境 ===")
+    
+    try:
+        import numpy as np
+        from games import make_vec_env, SnakeVecEnv
+        
+        # 纯NumPy五子棋与逐个包装GomokuEnv的结果逐步一致（含非法落子和自动重置）
+        rng = np.random.default_rng(0)
+        native = make_vec_env('gomoku', 8, board_size=7)
+        sync = make_vec_env('gomoku', 8, native=False, board_size=7)
+        assert np.array_equal(native.reset()[0], sync.reset()[0])
+        for step in range(120):
+            masks = native.get_action_masks()
+            assert masks.shape == (8, 7, 7) and np.array_equal(masks, sync.get_action_masks())
+            pick = masks if step % 17 else ~masks
+            actions = np.array([cells[rng.integers(len(cells))] for cells in
+                                (np.argwhere(m) if m.any() else np.argwhere(~m) for m in pick)])
+            native_result, sync_result = native.step(actions), sync.step(actions)
+            for a, b in zip(native_result[:4], sync_result[:4]):
+                assert np.array_equal(a, b)
+            for key in ('winner', 'final_observation'):
+                assert np.array_equal(native_result[4][key], sync_result[4][key])
+        print("✓ 五子棋向量化环境与GomokuEnv一致")
+        
+        # 多进程版本与同进程版本逐步一致，观察经共享内存取回
+        async_env = make_vec_env('gomoku', 6, native=False, num_workers=2, board_size=7)
+        sync = make_vec_env('gomoku', 6, native=False, board_size=7)
+        try:
+            assert np.array_equal(async_env.reset()[0], sync.reset()[0])
+            for _ in range(60):
+                masks = async_env.get_action_masks()
+                assert np.array_equal(masks, sync.get_action_masks())
+                actions = [tuple(cells[rng.integers(len(cells))]) for cells in map(np.argwhere, masks)]
+                async_env.step_async(actions)
+                async_result, sync_result = async_env.step_wait(), sync.step(actions)
+                for a, b in zip(async_result[:4], sync_result[:4]):
+                    assert np.array_equal(a, b)
+                assert np.array_equal(async_result[4]['winner'], sync_result[4]['winner'])
+        finally:
+            async_env.close()
+        print("✓ 多进程向量化环境与同进程版本一致")
+        
+        # 贪吃蛇：蛇身格数等于长度，食物数保持不变，掩码禁止掉头
+        env = SnakeVecEnv(16, board_size=10, seed=0)
+        observations, _ = env.reset()
+        assert observations.shape == (16, 10, 10)
+        # 玩家1开局向右，不能直接向左
+        assert env.get_action_masks().tolist() == [[True, True, False, True]] * 16
+        for _ in range(200):
+            masks = env.get_action_masks()
+            actions = SnakeVecEnv.DIRECTIONS[np.where(masks, rng.random(masks.shape), -1).argmax(axis=1)]
+            observations, rewards, terminated, truncated, infos = env.step(actions)
+            for player, codes in ((1, (1, 2)), (2, (3, 4))):
+                cells = np.isin(observations, codes).sum(axis=(1, 2))
+                assert np.array_equal(cells, env.lengths[:, player])
+            assert ((observations == 5).sum(axis=(1, 2)) == 5).all()
+        print("✓ 贪吃蛇向量化环境状态正确")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 向量化环境测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_snake_joint():
+    """测试贪吃蛇双方同时移动"""
+    print("\n=== 测试贪吃蛇同时移动 ===")
+    
+    try:
+        import random
+        from collections import deque
+        import numpy as np
+        from games import SnakeVecEnv, SyncVecEnv
+        from games.snake import SnakeGame, SnakeEnv
+        from games.game_record import record_from_game, encode_record, decode_record, replay
+        
+        def place(snake1, snake2):
+            game = SnakeGame(board_size=10, food_count=0)
+            game.snake1, game.snake2 = deque(snake1), deque(snake2)
+            game.foods = []
+            game._build_grid()
+            return game
+        
+        # 正面相撞：较短的一方死亡
+        game = place([(5, 3), (5, 2)], [(5, 5)])
+        _, rewards, done, _ = game.step_joint((0, 1), (0, -1))
+        assert done and game.get_winner() == 1 and rewards[0] > rewards[1]
+        assert game.snake1[0] == (5, 4)
+        # 等长正面相撞和互相穿过都是双方死亡
+        for snake2 in ([(5, 5)], [(5, 4)]):
+            game = place([(5, 3)], snake2)
+            game.step_joint((0, 1), (0, -1))
+            assert not game.alive1 and not game.alive2 and game.get_winner() is None
+        print("✓ 正面相撞和互相穿过判定正确")
+        
+        # 蛇2吃到食物时蛇1刚空出的尾部是唯一的空格：新食物生成在那里，pop后蛇1的尾部仍要还原
+        path = [(x, y if x % 2 == 0 else 4 - y) for x in range(5) for y in range(5)]
+        game = SnakeGame(board_size=5, food_count=1)
+        game.snake1, game.snake2 = deque(path[1:11]), deque(path[23:10:-1])
+        game.foods = [path[24]]
+        game._build_grid()
+        grid, board = bytes(game.grid), game.board.copy()
+        game.push_joint((0, -1), (0, 1))
+        assert game.foods == [path[10]]
+        game.pop()
+        assert bytes(game.grid) == grid and np.array_equal(game.board, board)
+        assert list(game.snake1) == path[1:11] and game.foods == [path[24]]
+        print("✓ 新食物生成在空出的尾部时pop恢复正确")
+        
+        # push_joint/pop恢复局面（含两个方向和当前玩家）
+        random.seed(3)
+        game = SnakeGame(board_size=8, food_count=3)
+        board, grid = game.board.copy(), bytes(game.grid)
+        pushed = 0
+        while not game.is_terminal() and pushed < 40:
+            game.push_joint(random.choice(game.get_valid_actions(1)), random.choice(game.get_valid_actions(2)))
+            pushed += 1
+        record = record_from_game(game, 3)
+        assert record.joint and len(record) == 2 * pushed
+        assert decode_record(encode_record(record))[0] == record
+        replayed = replay(record)
+        assert np.array_equal(replayed.board, game.board) and replayed.get_winner() == game.get_winner()
+        for _ in range(pushed):
+            game.pop()
+        assert np.array_equal(game.board, board) and bytes(game.grid) == grid
+        assert game.direction1 == (0, 1) and game.direction2 == (0, -1) and game.current_player == 1
+        print("✓ push_joint/pop和对局记录正确")
+        
+        # 纯NumPy同时移动与逐个SnakeGame.step_joint逐步一致
+        rng = np.random.default_rng(1)
+        native = SnakeVecEnv(8, board_size=8, food_count=0, joint=True, seed=0)
+        games = [SnakeGame(board_size=8, food_count=0) for _ in range(8)]
+        observations, _ = native.reset()
+        for _ in range(300):
+            masks = native.get_action_masks()
+            assert masks.shape == (8, 2, 4)
+            actions = SnakeVecEnv.DIRECTIONS[np.where(masks, rng.random(masks.shape), -1).argmax(axis=2)]
+            observations, rewards, terminated, _, infos = native.step(actions)
+            assert rewards.shape == (8, 2)
+            for index, game in enumerate(games):
+                _, expected, done, _ = game.step_joint(*(tuple(a) for a in actions[index].tolist()))
+                assert np.array_equal(infos['final_observation'][index], game.board)
+                assert tuple(rewards[index]) == expected and bool(terminated[index]) == done
+                assert infos['winner'][index] == (game.get_winner() or 0)
+                if done:
+                    game.reset()
+                assert np.array_equal(observations[index], game.board)
+        print("✓ 贪吃蛇同时移动向量化环境与SnakeGame一致")
+        
+        # 逐个包装的SnakeEnv返回 (B, 2) 奖励
+        sync = SyncVecEnv([lambda: SnakeEnv(board_size=8, joint=True) for _ in range(3)])
+        sync.reset()
+        assert sync.get_action_masks().shape == (3, 2, 4)
+        _, rewards, _, _, _ = sync.step([((0, 1), (0, -1))] * 3)
+        assert rewards.shape == (3, 2)
+        print("✓ SnakeEnv同时移动模式正确")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 贪吃蛇同时移动测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
 def test_gomoku_env():
     """测试五子棋环境"""
     print("\n=== 测试五子棋环境 ===")
@@ -148,6 +963,80 @@ def test_agents():
         return False
 
 
+def test_grid_search():
+    """测试贪吃蛇网格搜索"""
+    print("\n=== 测试贪吃蛇网格搜索 ===")
+    
+    try:
+        import random
+        from collections import deque
+        from agents import SmartSnakeAI
+        from agents.ai_bots.grid_search import GridSearch
+        from games.snake import SnakeEnv
+        
+        def reference_bfs(game, start, blocks):
+            """按坐标集合逐格BFS的参照实现"""
+            dist = {start: 0}
+            queue = deque([start])
+            while queue:
+                x, y = queue.popleft()
+                for dx, dy in game.get_action_space():
+                    nxt = (x + dx, y + dy)
+                    if (0 <= nxt[0] < game.board_size and 0 <= nxt[1] < game.board_size
+                            and nxt not in blocks and nxt not in dist):
+                        dist[nxt] = dist[(x, y)] + 1
+                        queue.append(nxt)
+            return dist
+        
+        rng = random.Random(0)
+        env = SnakeEnv(board_size=12, seed=0)
+        search = GridSearch(12)
+        agents = {player: SmartSnakeAI(player_id=player) for player in (1, 2)}
+        checked = 0
+        while checked < 300:
+            game = env.game
+            if env.is_terminal():
+                env.reset()
+                continue
+            player = game.current_player
+            snake, opponent = (game.snake1, game.snake2) if player == 1 else (game.snake2, game.snake1)
+            blocks = {pos for pos in list(game.snake1) + list(game.snake2) if game.is_body(pos)}
+            blocks.add(opponent[0])
+            search.load(game, player)
+            head = snake[0]
+            actions = game.get_action_space()
+            # 距离图与参照BFS一致
+            expected = reference_bfs(game, head, blocks)
+            assert search.distances(head) == len(expected)
+            for pos in (rng.choice(list(expected)), (rng.randrange(12), rng.randrange(12))):
+                assert search.distance(pos) == expected.get(pos, -1)
+            # 各落点的区域大小：一次遍历与逐个BFS一致
+            targets = [(head[0] + dx, head[1] + dy) for dx, dy in actions]
+            areas = [0 if target in blocks or not (0 <= target[0] < 12 and 0 <= target[1] < 12)
+                     else len(reference_bfs(game, target, blocks)) for target in targets]
+            assert search.move_areas(head, actions) == areas
+            assert [search.area(target) for target in targets] == areas
+            # A*路径最短且不经过障碍
+            if game.foods:
+                path = search.astar(head, game.foods[0])
+                if game.foods[0] in expected:
+                    assert len(path) == expected[game.foods[0]] + 1 and path[0] == head
+                    assert all(pos not in blocks for pos in path[1:])
+                    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+                else:
+                    assert path is None
+            env.step(agents[player].get_action(None, env))
+            checked += 1
+        print("✓ 距离图、区域大小和A*与参照实现一致")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 贪吃蛇网格搜索测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
 def test_game_play():
     """测试游戏对战"""
     print("\n=== 测试游戏对战 ===")
@@ -215,6 +1104,266 @@ def test_evaluation():
         return False
 
 
+def test_match_runner():
+    """测试并行对局运行器"""
+    print("\n=== 测试并行对局运行器 ===")
+    
+    try:
+        import json
+        from agents import RandomBot, RuleBasedGomokuBot
+        from games.gomoku import GomokuEnv
+        from utils.match_runner import AgentSpec, EnvSpec, run_match, run_tournament
+        
+        def strip_timing(results):
+            # 计时字段之外的内容应当逐字节一致
+            text = json.dumps(results, ensure_ascii=False, sort_keys=True, default=str)
+            data = json.loads(text)
+            for match in data.get('matches', [data]):
+                for game in match['games']:
+                    del game['game_time'], game['move_times']
+            return json.dumps(data, ensure_ascii=False, sort_keys=True)
+        
+        env_spec = EnvSpec(GomokuEnv, board_size=7)
+        random_a = AgentSpec(RandomBot, 'RandomA')
+        random_b = AgentSpec(RandomBot, 'RandomB')
+        streamed = []
+        serial = run_match(env_spec, random_a, random_b, num_games=6, seed=3)
+        parallel = run_match(env_spec, random_a, random_b, num_games=6, seed=3, workers=2,
+                             callback=lambda match_index, game: streamed.append(game['game_num']))
+        assert strip_timing(serial) == strip_timing(parallel)
+        assert sorted(streamed) == list(range(1, 7))
+        assert strip_timing(serial) != strip_timing(run_match(env_spec, random_a, random_b, num_games=6, seed=4))
+        print("✓ 并行对局与串行结果一致，逐局流式返回")
+        
+        specs = [random_a, random_b, AgentSpec(RuleBasedGomokuBot, 'Rules')]
+        serial = run_tournament(env_spec, specs, num_games_per_pair=4, seed=0)
+        parallel = run_tournament(env_spec, specs, num_games_per_pair=4, seed=0, workers=2)
+        assert strip_timing(serial) == strip_timing(parallel)
+        assert len(parallel['matches']) == 3 and parallel['leaderboard'][0][0] == 'Rules'
+        print(f"✓ 并行锦标赛与串行结果一致，第一名: {parallel['leaderboard'][0][0]}")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 并行对局运行器测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_result_writer():
+    """测试流式对局记录"""
+    print("\n=== 测试流式对局记录 ===")
+    
+    try:
+        import json
+        import os
+        import tempfile
+        from agents import RandomBot
+        from games.gomoku import GomokuEnv
+        from utils.match_runner import AgentSpec, EnvSpec, run_match
+        from utils.result_writer import iter_results, completed_games, summarize_results
+        
+        env_spec = EnvSpec(GomokuEnv, board_size=7)
+        random_a = AgentSpec(RandomBot, 'RandomA')
+        random_b = AgentSpec(RandomBot, 'RandomB')
+        full = run_match(env_spec, random_a, random_b, num_games=6, seed=5)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'match.jsonl')
+            run_match(env_spec, random_a, random_b, num_games=3, seed=5, results_path=path)
+            records = list(iter_results(path))
+            assert [record['game_num'] for record in records] == [1, 2, 3]
+            # 动作元组写入JSON后变成列表
+            assert records[0]['moves'] == json.loads(json.dumps(full['games'][0]['moves']))
+            
+            # 模拟写到一半被中断：末尾留下不完整的一行
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('{"match":0,"game_num":4,"win')
+            assert set(completed_games(path)) == {(0, 1), (0, 2), (0, 3)}
+            played = []
+            resumed = run_match(env_spec, random_a, random_b, num_games=6, seed=5, results_path=path,
+                                callback=lambda match_index, game: played.append(game['game_num']))
+            assert sorted(played) == [4, 5, 6]
+            assert resumed['summary'] == full['summary']
+            assert [game['winner'] for game in resumed['games']] == [game['winner'] for game in full['games']]
+            assert 'moves' not in resumed['games'][0]
+            
+            stats = summarize_results(path)[0]
+            assert stats['total_games'] == 6
+            assert stats['agent1_wins'] == full['summary']['agent1_wins']
+            assert stats['draws'] == full['summary']['draws']
+        print("✓ 中断后续跑与一次跑完结果一致，内存中只保留精简记录")
+        
+        # 头部记录种子和对阵，不一致的文件拒绝续跑；evaluate_agents的结果文件名固定，可以续跑
+        from utils.game_utils import evaluate_agents
+        from utils.result_writer import read_header
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'match.jsonl')
+            run_match(env_spec, random_a, random_b, num_games=2, seed=5, results_path=path)
+            assert read_header(path) == {'seed': 5, 'pairings': [['RandomA', 'RandomB']]}
+            for seed, agent2_spec in ((6, random_b), (5, AgentSpec(RandomBot, 'RandomC'))):
+                try:
+                    run_match(env_spec, random_a, agent2_spec, num_games=4, seed=seed, results_path=path)
+                    assert False, "头部不一致时不应续跑"
+                except ValueError:
+                    pass
+            assert len(list(iter_results(path))) == 2
+            
+            env = GomokuEnv(board_size=7)
+            agents = (RandomBot('RandomA', 1), RandomBot('RandomB', 2))
+            path = os.path.join(directory, 'evaluation.jsonl')
+            first = evaluate_agents(env, *agents, num_games=3, seed=1, results_path=path)
+            resumed = evaluate_agents(env, *agents, num_games=3, seed=1, results_path=path)
+            assert resumed == first and len(list(iter_results(path))) == 3
+        print("✓ 头部不一致时拒绝续跑，evaluate_agents可续跑")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 流式对局记录测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_game_record():
+    """测试二进制对局记录"""
+    print("\n=== 测试二进制对局记录 ===")
+    
+    try:
+        import os
+        import random
+        import tempfile
+        from agents import RandomBot
+        from games.gomoku import GomokuEnv
+        from games.snake import SnakeEnv
+        from games.game_record import (GameArchive, GameArchiveWriter, encode_record, decode_record,
+                                       record_from_game, record_from_result, replay)
+        from utils.match_runner import play_game
+        
+        records = []
+        for env in (GomokuEnv(board_size=9), SnakeEnv(board_size=10)):
+            for seed in range(3):
+                game_result = play_game(env, {1: RandomBot('A', 1), 2: RandomBot('B', 2)}, seed=seed)
+                record = record_from_result(env.game, game_result, seed)
+                assert record == record_from_game(env.game, seed)
+                assert decode_record(encode_record(record))[0] == record
+                random.seed(12345)
+                expected_state = random.getstate()
+                replayed = replay(record)
+                assert random.getstate() == expected_state  # 重放不改动全局random
+                assert replayed.get_winner() == game_result['winner']
+                if env.game.__class__.__name__ == 'GomokuGame':
+                    assert (replayed.board == env.game.board).all()
+                    assert len(encode_record(record)) == 16 + game_result['total_moves']
+                else:
+                    assert replayed.snake1 == env.game.snake1 and replayed.snake2 == env.game.snake2
+                    assert len(encode_record(record)) == 16 + (game_result['total_moves'] + 3) // 4
+                records.append(record)
+        half = replay(records[0], 4)
+        assert half.move_count == 4 and half.history == [(1 + i % 2, action)
+                                                         for i, action in enumerate(records[0].actions()[:4])]
+        print("✓ 编码解码与重放一致（五子棋每步1字节，贪吃蛇每步2比特）")
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.bin')
+            with GameArchiveWriter(path) as writer:
+                for record in records[:4]:
+                    writer.write(record)
+            # 重新打开后继续追加
+            with GameArchiveWriter(path) as writer:
+                for record in records[4:]:
+                    writer.write(record)
+            with GameArchive(path) as archive:
+                assert len(archive) == len(records)
+                assert archive[3] == records[3] and archive[-1] == records[-1]
+                assert list(archive) == records
+            # 索引写到一半就中断：残留的索引字节不能被当成对局头部
+            with GameArchive(path) as archive:
+                data_end = archive.data_end
+            with open(path, 'rb+') as f:
+                f.truncate(data_end + 8 * 3 + 5)
+            with GameArchive(path) as archive:
+                assert list(archive) == records and archive.data_end == data_end
+            # 没写完索引就中断：扫描头部恢复完整的对局
+            with open(path, 'rb+') as f:
+                f.truncate(data_end - 1)
+            with GameArchive(path) as archive:
+                assert list(archive) == records[:-1]
+        print("✓ 归档随机读取、续写和中断恢复正常")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 二进制对局记录测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_rating():
+    """测试在线评分与自适应天梯"""
+    print("\n=== 测试在线评分与天梯 ===")
+    
+    try:
+        import os
+        import tempfile
+        from agents import RandomBot, RuleBasedGomokuBot
+        from games.gomoku import GomokuEnv
+        from utils.match_runner import AgentSpec, EnvSpec, run_match
+        from utils.rating import RatingLadder, run_ladder, score_interval
+        
+        ladder = RatingLadder()
+        ladder.add_agent('A')
+        ladder.add_agent('B')
+        for game_num in range(1, 6):
+            # A每局都赢：奇数局A执先（座位1），偶数局执后（座位2）
+            ladder.record_game('A', 'B', 1 if game_num % 2 == 1 else 2, game_num)
+        ladder.record_game('B', 'A', None, 1)
+        assert ladder.pairs[('A', 'B')] == [5, 0, 1]
+        assert ladder.leaderboard()[0][0] == 'A'
+        assert abs(sum(ladder.elo.ratings.values()) - 3000) < 1e-9
+        glicko_a, rd_a = ladder.glicko.rating('A')
+        assert glicko_a > 1500 and rd_a < 350
+        low, high = score_interval(50, 50, 0)
+        assert low < 0.5 < high and abs((high - low) / 2 - 0.096) < 0.01
+        print(f"✓ Elo/Glicko-2在线更新正常: A {ladder.elo.ratings['A']:.0f}, Glicko-2 {glicko_a:.0f}±{rd_a:.0f}")
+        
+        env_spec = EnvSpec(GomokuEnv, board_size=7)
+        specs = [AgentSpec(RandomBot, 'RandomA'), AgentSpec(RandomBot, 'RandomB')]
+        rules = AgentSpec(RuleBasedGomokuBot, 'Rules')
+        
+        # 回调接入并行对局运行器
+        online = RatingLadder(use_glicko=False)
+        for spec in specs:
+            online.add_agent(spec.name)
+        run_match(env_spec, *specs, num_games=6, seed=0, callback=online.callback([tuple(specs)]))
+        assert online.games_played('RandomA', 'RandomB') == 6
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ladder.json')
+            ladder = run_ladder(env_spec, specs, seed=0, path=path)
+            first_pair = list(ladder.pairs[('RandomA', 'RandomB')])
+            assert not ladder.pending_pairs()
+            
+            # 加入新智能体：只安排它的对局
+            played = []
+            ladder = run_ladder(env_spec, specs + [rules], seed=0, path=path,
+                                callback=lambda pair, game: played.append(pair))
+            assert set(played) == {('RandomA', 'Rules'), ('RandomB', 'Rules')}
+            assert ladder.pairs[('RandomA', 'RandomB')] == first_pair
+            # 强弱悬殊的对阵提前停止
+            assert ladder.games_played('RandomA', 'Rules') < ladder.settings['max_games']
+            assert ladder.leaderboard()[0][0] == 'Rules'
+            assert RatingLadder.load(path).pairs == ladder.pairs
+        print(f"✓ 自适应天梯正常: 新智能体只下 {len(played)} 局，Rules 排名第一")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 在线评分测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
 def test_custom_agents():
     """测试自定义智能体"""
     print("\n=== 测试自定义智能体 ===")
@@ -258,10 +1407,26 @@ def run_all_tests():
     tests = [
         test_imports,
         test_gomoku_game,
+        test_gomoku_incremental_winner,
+        test_bitboard_gomoku,
+        test_push_pop,
+        test_transposition_table,
+        test_candidate_actions,
+        test_gomoku_patterns,
+        test_mcts_tree,
+        test_gomoku_rollout,
+        test_parallel_mcts,
         test_gomoku_env,
+        test_vec_env,
+        test_snake_joint,
         test_agents,
+        test_grid_search,
         test_game_play,
         test_evaluation,
+        test_match_runner,
+        test_result_writer,
+        test_game_record,
+        test_rating,
         test_custom_agents
     ]
     
@@ -2,136 +2,68 @@
 游戏工具函数
 """
 
-import time
 from typing import Dict, Any, List
+from utils.match_runner import play_game, game_seed, summarize_games
+from utils.result_writer import ResultWriter, completed_games, summary_record
 
-def evaluate_agents(env, agent1, agent2, num_games=10, save_results=False):
+def evaluate_agents(env, agent1, agent2, num_games=10, save_results=False, seed=None, results_path=None):
     """
     评估两个智能体的对战结果
     
+    与utils.match_runner.run_match不同，这里每局复用传入的同一个智能体对象：
+    置换表、搜索树等内部状态会带到下一局，交换先手时player_id也不随座位改变。
+    需要每局新建智能体（或并行）时使用run_match和AgentSpec。
+    
     Args:
         env: 游戏环境
         agent1: 智能体1
         agent2: 智能体2
         num_games: 游戏局数
-        save_results: 是否保存结果
+        save_results: 是否保存结果（每局结束立即追加到JSONL文件，返回值中的对局只保留精简记录；
+                      文件中已有的对局不再重跑，直接计入汇总）
+        seed: 随机种子，给定时每局开始前按局号设置种子，结果可复现
+        results_path: 结果文件路径，默认为results目录下按双方名字和种子命名的文件；
+                      文件头部的种子或双方名字与本次不一致时抛出ValueError
     
     Returns:
         dict: 评估结果
     """
-    results = {
-        'games': [],
-        'summary': {
-            'total_games': num_games,
-            'agent1_wins': 0,
-            'agent2_wins': 0,
-            'draws': 0,
-            'agent1_win_rate': 0.0,
-            'agent2_win_rate': 0.0,
-            'draw_rate': 0.0
-        }
-    }
-    
-    for game_num in range(num_games):
-        # 重置环境
-        observation, info = env.reset()
-        
-        # 交替玩家顺序
-        if game_num % 2 == 0:
-            players = {1: agent1, 2: agent2}
-        else:
-            players = {1: agent2, 2: agent1}
-        
-        game_result = {
-            'game_num': game_num + 1,
-            'moves': [],
-            'winner': None,
-            'total_moves': 0,
-            'game_time': 0
-        }
-        
-        start_time = time.time()
-        move_count = 0
-        max_moves = 1000  # 防止无限循环
-        
-        # 游戏循环
-        while not env.is_terminal() and move_count < max_moves:
-            current_player = env.game.current_player
-            current_agent = players[current_player]
-            
-            # 获取动作
-            try:
-                action = current_agent.get_action(observation, env)
-                if action is None:
-                    break
-                
-                # 执行动作
-                observation, reward, terminated, truncated, step_info = env.step(action)
-                
-                # 记录移动
-                game_result['moves'].append({
-                    'player': current_player,
-                    'agent': current_agent.name,
-                    'action': action,
-                    'reward': reward
-                })
-                
-                move_count += 1
-                
-                if terminated or truncated:
-                    break
-                    
-            except Exception as e:
-                print(f"游戏 {game_num + 1} 中发生错误: {e}")
-                break
-        
-        # 记录游戏结果
-        game_result['total_moves'] = move_count
-        game_result['game_time'] = time.time() - start_time
-        game_result['winner'] = env.get_winner()
-        
-        # 更新统计
-        winner = game_result['winner']
-        if winner == 1:
+    writer = None
+    done = {}
+    if save_results or results_path is not None:
+        if results_path is None:
+            results_path = f'results/evaluation_{agent1.name}_vs_{agent2.name}_seed{seed}.jsonl'
+        writer = ResultWriter(results_path, header={'seed': seed, 'pairings': [[agent1.name, agent2.name]]})
+        done = completed_games(results_path)
+    
+    games = []
+    try:
+        for game_num in range(num_games):
+            if (0, game_num + 1) in done:
+                games.append(done[(0, game_num + 1)])
+                continue
+            # 交替玩家顺序
             if game_num % 2 == 0:
-                results['summary']['agent1_wins'] += 1
+                players = {1: agent1, 2: agent2}
             else:
-                results['summary']['agent2_wins'] += 1
-        elif winner == 2:
-            if game_num % 2 == 0:
-                results['summary']['agent2_wins'] += 1
-            else:
-                results['summary']['agent1_wins'] += 1
-        else:
-            results['summary']['draws'] += 1
-        
-        results['games'].append(game_result)
-        
-        # 打印进度
-        if (game_num + 1) % max(1, num_games // 10) == 0:
-            print(f"已完成 {game_num + 1}/{num_games} 局游戏")
-    
-    # 计算胜率
-    total = results['summary']['total_games']
-    results['summary']['agent1_win_rate'] = results['summary']['agent1_wins'] / total
-    results['summary']['agent2_win_rate'] = results['summary']['agent2_wins'] / total
-    results['summary']['draw_rate'] = results['summary']['draws'] / total
-    
-    # 保存结果（如果需要）
-    if save_results:
-        import json
-        import os
-        
-        os.makedirs('results', exist_ok=True)
-        timestamp = int(time.time())
-        filename = f'results/evaluation_{agent1.name}_vs_{agent2.name}_{timestamp}.json'
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
-        
-        print(f"结果已保存到: {filename}")
-    
-    return results
+                players = {1: agent2, 2: agent1}
+            
+            game_result = play_game(env, players, None if seed is None else game_seed(seed, 0, game_num))
+            game_result['game_num'] = game_num + 1
+            if writer is not None:
+                writer.write({'agent1_name': agent1.name, 'agent2_name': agent2.name, **game_result})
+                game_result = summary_record(game_result)
+            games.append(game_result)
+            
+            # 打印进度
+            if (game_num + 1) % max(1, num_games // 10) == 0:
+                print(f"已完成 {game_num + 1}/{num_games} 局游戏")
+    finally:
+        if writer is not None:
+            writer.close()
+            print(f"结果已保存到: {writer.path}")
+    
+    return summarize_games(games, num_games)
 
 
 def play_human_vs_ai(env, human_agent, ai_agent):
@@ -203,6 +135,9 @@ def tournament(env, agents, num_games_per_pair=10):
     """
     锦标赛模式，让多个智能体互相对战
     
+    通过evaluate_agents进行，同一个智能体对象在所有对局中复用；
+    每局新建智能体的版本见utils.match_runner.run_tournament。
+    
     Args:
         env: 游戏环境
         agents: 智能体列表
@@ -240,9 +175,28 @@ def tournament(env, agents, num_games_per_pair=10):
             print(f"平局率: {match_result['summary']['draw_rate']:.2%}")
     
     # 计算排行榜
-    agent_stats = {agent.name: {'wins': 0, 'losses': 0, 'draws': 0, 'games': 0} for agent in agents}
+    names = [agent.name for agent in agents]
+    results['leaderboard'] = build_leaderboard(names, results['matches'], num_games_per_pair)
+    print_leaderboard(results['leaderboard'])
+    
+    return results
+
+
+def build_leaderboard(agent_names, matches, num_games_per_pair):
+    """
+    根据各组对阵的汇总结果计算排行榜
+    
+    Args:
+        agent_names: 智能体名称列表
+        matches: 对阵结果列表（含agent1_name、agent2_name和summary）
+        num_games_per_pair: 每对智能体的对战局数
+    
+    Returns:
+        list: 按胜率排序的 (名称, 统计) 列表
+    """
+    agent_stats = {name: {'wins': 0, 'losses': 0, 'draws': 0, 'games': 0} for name in agent_names}
     
-    for match in results['matches']:
+    for match in matches:
         agent1_name = match['agent1_name']
         agent2_name = match['agent2_name']
         
@@ -267,14 +221,12 @@ def tournament(env, agents, num_games_per_pair=10):
         else:
             stats['win_rate'] = 0
     
-    # 按胜率排序
-    leaderboard = sorted(agent_stats.items(), key=lambda x: x[1]['win_rate'], reverse=True)
-    results['leaderboard'] = leaderboard
-    
-    # 显示排行榜
+    return sorted(agent_stats.items(), key=lambda x: x[1]['win_rate'], reverse=True)
+
+
+def print_leaderboard(leaderboard):
+    """显示排行榜"""
     print("\n=== 锦标赛排行榜 ===")
     for rank, (agent_name, stats) in enumerate(leaderboard, 1):
         print(f"{rank}. {agent_name}: 胜率 {stats['win_rate']:.2%} "
               f"({stats['wins']}胜 {stats['losses']}负 {stats['draws']}平)")
-    
-    return results 
\ No newline at end of file
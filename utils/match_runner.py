@@ -0,0 +1,236 @@
+"""
+并行对局运行器
+把评估和锦标赛的每一局分发到进程池：智能体和环境在工作进程里按可pickle的描述构造，
+每局使用由 (种子, 对阵编号, 局号) 确定的随机种子，结果按完成顺序流式返回，汇总时按局号排序。
+着法只取决于种子的智能体（RandomBot、不设时间上限的搜索等），workers=0 的串行执行与并行执行
+得到完全相同的结果（计时字段除外）；MinimaxBot、MCTSBot按时间预算停止搜索，着法还取决于机器负载
+"""
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+import numpy as np
+from utils.result_writer import ResultWriter, completed_games, summary_record
+
+
+class AgentSpec:
+    """
+    可pickle的智能体描述
+
+    factory需要是模块级的类或函数（如evaluate_ai.create_agent），调用方式为
+    factory(name=name, player_id=座位, **kwargs)。
+    """
+
+    def __init__(self, factory: Callable[..., Any], name: str, **kwargs):
+        self.factory = factory
+        self.name = name
+        self.kwargs = kwargs
+
+    def build(self, player_id: int) -> Any:
+        """按座位构造智能体"""
+        return self.factory(name=self.name, player_id=player_id, **self.kwargs)
+
+
+class EnvSpec:
+    """可pickle的环境描述：factory(**kwargs) 返回一个环境"""
+
+    def __init__(self, factory: Callable[..., Any], **kwargs):
+        self.factory = factory
+        self.kwargs = kwargs
+
+    def build(self) -> Any:
+        """构造环境"""
+        return self.factory(**self.kwargs)
+
+
+def game_seed(seed: int, match_index: int, game_num: int) -> int:
+    """每局的随机种子，只取决于总种子、对阵编号和局号"""
+    return int(np.random.SeedSequence([seed, match_index, game_num]).generate_state(1)[0])
+
+
+def play_game(env, players: Dict[int, Any], seed: int = None, max_moves: int = 1000) -> Dict[str, Any]:
+    """
+    进行一局游戏，players为 {座位: 智能体}
+
+    给定seed时对局开始前同时设置random和numpy的全局种子。
+    返回的记录中game_time和move_times（与moves一一对应的思考时间）是计时字段，其余内容由种子完全确定。
+    """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    observation, info = env.reset()
+    game_result = {
+        'moves': [],
+        'winner': None,
+        'total_moves': 0,
+        'game_time': 0,
+        'move_times': [],
+    }
+    start_time = time.time()
+    move_count = 0
+
+    while not env.is_terminal() and move_count < max_moves:
+        current_player = env.game.current_player
+        current_agent = players[current_player]
+        try:
+            move_start = time.time()
+            action = current_agent.get_action(observation, env)
+            move_time = time.time() - move_start
+            if action is None:
+                break
+            observation, reward, terminated, truncated, step_info = env.step(action)
+            game_result['moves'].append({
+                'player': current_player,
+                'agent': current_agent.name,
+                'action': action,
+                'reward': reward
+            })
+            game_result['move_times'].append(move_time)
+            move_count += 1
+            if terminated or truncated:
+                break
+        except Exception as e:
+            print(f"对局中发生错误: {e}")
+            break
+
+    game_result['total_moves'] = move_count
+    game_result['game_time'] = time.time() - start_time
+    game_result['winner'] = env.get_winner()
+    return game_result
+
+
+def seat_specs(agent1_spec: AgentSpec, agent2_spec: AgentSpec, game_num: int) -> Dict[int, AgentSpec]:
+    """交替先手：偶数局agent1执先，奇数局agent2执先"""
+    if game_num % 2 == 0:
+        return {1: agent1_spec, 2: agent2_spec}
+    return {1: agent2_spec, 2: agent1_spec}
+
+
+def _play_task(task: Tuple[EnvSpec, AgentSpec, AgentSpec, int, int, int]) -> Tuple[int, Dict[str, Any]]:
+    """进程池任务：构造环境和双方智能体，进行一局，返回 (对阵编号, 对局记录)"""
+    env_spec, agent1_spec, agent2_spec, match_index, game_num, seed = task
+    env = env_spec.build()
+    players = {seat: spec.build(seat) for seat, spec in seat_specs(agent1_spec, agent2_spec, game_num).items()}
+    game_result = play_game(env, players, game_seed(seed, match_index, game_num))
+    game_result['game_num'] = game_num + 1
+    for agent in players.values():
+        if hasattr(agent, 'close'):
+            agent.close()
+    return match_index, game_result
+
+
+def iter_games(tasks: Sequence[Tuple], workers: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """按完成顺序逐局返回 (对阵编号, 对局记录)；workers为0时在当前进程里按顺序执行"""
+    if workers <= 0:
+        for task in tasks:
+            yield _play_task(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_play_task, task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize_games(games: List[Dict[str, Any]], num_games: int) -> Dict[str, Any]:
+    """按局号汇总一组对局（agent1在偶数局执先），格式与evaluate_agents的返回值相同"""
+    results = {
+        'games': sorted(games, key=lambda game: game['game_num']),
+        'summary': {
+            'total_games': num_games,
+            'agent1_wins': 0,
+            'agent2_wins': 0,
+            'draws': 0,
+            'agent1_win_rate': 0.0,
+            'agent2_win_rate': 0.0,
+            'draw_rate': 0.0
+        }
+    }
+    summary = results['summary']
+    for game in results['games']:
+        agent1_seat = 1 if (game['game_num'] - 1) % 2 == 0 else 2
+        if game['winner'] == agent1_seat:
+            summary['agent1_wins'] += 1
+        elif game['winner'] is not None:
+            summary['agent2_wins'] += 1
+        else:
+            summary['draws'] += 1
+    summary['agent1_win_rate'] = summary['agent1_wins'] / num_games
+    summary['agent2_win_rate'] = summary['agent2_wins'] / num_games
+    summary['draw_rate'] = summary['draws'] / num_games
+    return results
+
+
+def run_match(env_spec: EnvSpec, agent1_spec: AgentSpec, agent2_spec: AgentSpec, num_games: int = 10,
+              seed: int = 0, workers: int = 0, callback: Callable[[int, Dict[str, Any]], None] = None,
+              results_path: str = None) -> Dict[str, Any]:
+    """
+    两个智能体对战num_games局，返回与evaluate_agents相同格式的结果
+
+    callback(对阵编号, 对局记录) 在每局完成时调用（并行时按完成顺序）。
+    """
+    return run_matches(env_spec, [(agent1_spec, agent2_spec)], num_games, seed, workers, callback,
+                       results_path)[0]
+
+
+def run_matches(env_spec: EnvSpec, pairings: Sequence[Tuple[AgentSpec, AgentSpec]], num_games: int = 10,
+                seed: int = 0, workers: int = 0, callback: Callable[[int, Dict[str, Any]], None] = None,
+                results_path: str = None) -> List[Dict[str, Any]]:
+    """
+    多组对阵的全部对局放进同一个进程池，返回每组对阵的汇总结果
+
+    给定results_path时每局结束立即追加写入该JSONL文件，内存里只保留精简记录；
+    文件中已有的对局不再重跑，直接计入汇总。文件头部记录种子和各组对阵的名字，
+    续跑时与本次运行不一致会抛出ValueError。
+    串行与并行结果相同的前提见模块说明（智能体不受时间预算影响）。
+    """
+    games: List[List[Dict[str, Any]]] = [[] for _ in pairings]
+    done = {}
+    writer = None
+    if results_path is not None:
+        header = {'seed': seed, 'pairings': [[agent1_spec.name, agent2_spec.name]
+                                             for agent1_spec, agent2_spec in pairings]}
+        writer = ResultWriter(results_path, header=header)
+        done = {key: record for key, record in completed_games(results_path).items() if key[0] < len(pairings)}
+        for (match_index, _), record in done.items():
+            games[match_index].append(record)
+    tasks = [(env_spec, agent1_spec, agent2_spec, match_index, game_num, seed)
+             for match_index, (agent1_spec, agent2_spec) in enumerate(pairings)
+             for game_num in range(num_games) if (match_index, game_num + 1) not in done]
+    try:
+        for match_index, game_result in iter_games(tasks, workers):
+            if writer is not None:
+                agent1_spec, agent2_spec = pairings[match_index]
+                writer.write({'match': match_index, 'agent1_name': agent1_spec.name,
+                              'agent2_name': agent2_spec.name, 'seed': seed, **game_result})
+                game_result = summary_record(game_result)
+            games[match_index].append(game_result)
+            if callback is not None:
+                callback(match_index, game_result)
+    finally:
+        if writer is not None:
+            writer.close()
+    results = []
+    for (agent1_spec, agent2_spec), match_games in zip(pairings, games):
+        match_result = summarize_games(match_games, num_games)
+        match_result['agent1_name'] = agent1_spec.name
+        match_result['agent2_name'] = agent2_spec.name
+        results.append(match_result)
+    return results
+
+
+def run_tournament(env_spec: EnvSpec, agent_specs: Sequence[AgentSpec], num_games_per_pair: int = 10,
+                   seed: int = 0, workers: int = 0, callback: Callable[[int, Dict[str, Any]], None] = None,
+                   results_path: str = None) -> Dict[str, Any]:
+    """循环赛：返回与tournament相同格式的结果（每局新建智能体，可复现性见模块说明）"""
+    from utils.game_utils import build_leaderboard
+
+    pairings = [(agent_specs[i], agent_specs[j])
+                for i in range(len(agent_specs)) for j in range(i + 1, len(agent_specs))]
+    matches = run_matches(env_spec, pairings, num_games_per_pair, seed, workers, callback, results_path)
+    names = [spec.name for spec in agent_specs]
+    return {
+        'agents': names,
+        'matches': matches,
+        'leaderboard': build_leaderboard(names, matches, num_games_per_pair),
+    }
@@ -0,0 +1,313 @@
+"""
+在线评分系统
+每局结束立即更新Elo（可选Glicko-2）评分，评分和每对对阵的战绩可以保存到JSON文件；
+自适应天梯按轮为尚未确定强弱的对阵安排对局，得分率置信区间足够窄时提前停止该对，
+新加入的智能体只需要和其他智能体对战，已有的对阵不会重跑
+"""
+
+import json
+import math
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import config
+from utils.match_runner import AgentSpec, EnvSpec, iter_games
+
+# Glicko-2内部刻度与常用评分刻度的换算系数
+GLICKO_SCALE = 173.7178
+
+
+class EloRatings:
+    """Elo评分：每局按期望得分与实际得分之差更新双方"""
+
+    def __init__(self, k: float = None, initial_rating: float = None):
+        rating_config = config.RATING_CONFIG
+        self.k = k if k is not None else rating_config['elo_k']
+        self.initial_rating = initial_rating if initial_rating is not None else rating_config['initial_rating']
+        self.ratings: Dict[str, float] = {}
+
+    def add_agent(self, name: str):
+        """加入新智能体（已存在时不变）"""
+        self.ratings.setdefault(name, float(self.initial_rating))
+
+    def expected(self, name_a: str, name_b: str) -> float:
+        """a对b的期望得分"""
+        return 1.0 / (1.0 + 10 ** ((self.ratings[name_b] - self.ratings[name_a]) / 400))
+
+    def update(self, name_a: str, name_b: str, score_a: float):
+        """记录一局：score_a为a的得分（胜1、平0.5、负0）"""
+        delta = self.k * (score_a - self.expected(name_a, name_b))
+        self.ratings[name_a] += delta
+        self.ratings[name_b] -= delta
+
+
+class Glicko2Ratings:
+    """
+    Glicko-2评分
+
+    每局作为双方的一个评分周期处理，两方都用对局前的评分计算，结果与对局顺序有关。
+    """
+
+    def __init__(self, initial_rating: float = None, initial_rd: float = None,
+                 initial_volatility: float = None, tau: float = None):
+        rating_config = config.RATING_CONFIG
+        self.initial_rating = initial_rating if initial_rating is not None else rating_config['initial_rating']
+        self.initial_rd = initial_rd if initial_rd is not None else rating_config['glicko_rd']
+        self.initial_volatility = (initial_volatility if initial_volatility is not None
+                                   else rating_config['glicko_volatility'])
+        self.tau = tau if tau is not None else rating_config['glicko_tau']
+        # 名称 -> [mu, phi, sigma]（Glicko-2内部刻度）
+        self.players: Dict[str, List[float]] = {}
+
+    def add_agent(self, name: str):
+        """加入新智能体（已存在时不变）"""
+        self.players.setdefault(name, [0.0, self.initial_rd / GLICKO_SCALE, self.initial_volatility])
+
+    def rating(self, name: str) -> Tuple[float, float]:
+        """(评分, 评分偏差)"""
+        mu, phi, _ = self.players[name]
+        return self.initial_rating + GLICKO_SCALE * mu, GLICKO_SCALE * phi
+
+    def update(self, name_a: str, name_b: str, score_a: float):
+        """记录一局：score_a为a的得分"""
+        player_a, player_b = self.players[name_a], self.players[name_b]
+        new_a = self._updated(player_a, player_b, score_a)
+        new_b = self._updated(player_b, player_a, 1.0 - score_a)
+        self.players[name_a], self.players[name_b] = new_a, new_b
+
+    def _updated(self, player: List[float], opponent: List[float], score: float) -> List[float]:
+        """对一个对手、一局结果的Glicko-2更新"""
+        mu, phi, sigma = player
+        mu_j, phi_j, _ = opponent
+        g = 1.0 / math.sqrt(1.0 + 3.0 * phi_j ** 2 / math.pi ** 2)
+        expected = 1.0 / (1.0 + math.exp(-g * (mu - mu_j)))
+        v = 1.0 / (g ** 2 * expected * (1.0 - expected))
+        delta = v * g * (score - expected)
+        sigma = self._volatility(phi, sigma, v, delta)
+        phi_star = math.sqrt(phi ** 2 + sigma ** 2)
+        phi = 1.0 / math.sqrt(1.0 / phi_star ** 2 + 1.0 / v)
+        mu = mu + phi ** 2 * g * (score - expected)
+        return [mu, phi, sigma]
+
+    def _volatility(self, phi: float, sigma: float, v: float, delta: float) -> float:
+        """用Illinois算法求新的波动率"""
+        a = math.log(sigma ** 2)
+        tau = self.tau
+
+        def f(x):
+            ex = math.exp(x)
+            return (ex * (delta ** 2 - phi ** 2 - v - ex) / (2 * (phi ** 2 + v + ex) ** 2)
+                    - (x - a) / tau ** 2)
+
+        low = a
+        if delta ** 2 > phi ** 2 + v:
+            high = math.log(delta ** 2 - phi ** 2 - v)
+        else:
+            k = 1
+            while f(a - k * tau) < 0:
+                k += 1
+            high = a - k * tau
+        f_low, f_high = f(low), f(high)
+        while abs(high - low) > 1e-6:
+            middle = low + (low - high) * f_low / (f_high - f_low)
+            f_middle = f(middle)
+            if f_middle * f_high <= 0:
+                low, f_low = high, f_high
+            else:
+                f_low /= 2
+            high, f_high = middle, f_middle
+        return math.exp(low / 2)
+
+
+def score_interval(wins: int, losses: int, draws: int, z: float = None) -> Tuple[float, float]:
+    """得分率（平局计0.5）的Wilson置信区间"""
+    z = z if z is not None else config.RATING_CONFIG['z']
+    games = wins + losses + draws
+    if games == 0:
+        return 0.0, 1.0
+    score = (wins + 0.5 * draws) / games
+    denominator = 1 + z ** 2 / games
+    center = (score + z ** 2 / (2 * games)) / denominator
+    half_width = z * math.sqrt(score * (1 - score) / games + z ** 2 / (4 * games ** 2)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+class RatingLadder:
+    """
+    天梯：在线评分 + 每对对阵的战绩
+
+    pairs按智能体加入顺序记录每对的 [前者胜, 后者胜, 平局]，也决定该对下一局的局号（先后手交替和随机种子）。
+    """
+
+    def __init__(self, use_glicko: bool = True, **kwargs):
+        rating_config = dict(config.RATING_CONFIG, **kwargs)
+        self.settings = rating_config
+        self.agents: List[str] = []
+        self.elo = EloRatings(rating_config['elo_k'], rating_config['initial_rating'])
+        self.glicko = Glicko2Ratings(rating_config['initial_rating'], rating_config['glicko_rd'],
+                                     rating_config['glicko_volatility'],
+                                     rating_config['glicko_tau']) if use_glicko else None
+        self.pairs: Dict[Tuple[str, str], List[int]] = {}
+
+    def add_agent(self, name: str):
+        """加入新智能体：与已有智能体的对阵从零开始，其余对阵不受影响"""
+        if name in self.agents:
+            return
+        for other in self.agents:
+            self.pairs[(other, name)] = [0, 0, 0]
+        self.agents.append(name)
+        self.elo.add_agent(name)
+        if self.glicko is not None:
+            self.glicko.add_agent(name)
+
+    def pair_key(self, name_a: str, name_b: str) -> Tuple[str, str]:
+        """按加入顺序排列的对阵键"""
+        if self.agents.index(name_a) < self.agents.index(name_b):
+            return name_a, name_b
+        return name_b, name_a
+
+    def pair_index(self, name_a: str, name_b: str) -> int:
+        """对阵的固定编号（加入新智能体不会改变已有对阵的编号），用作对局随机种子的一部分"""
+        i, j = sorted((self.agents.index(name_a), self.agents.index(name_b)))
+        return j * (j - 1) // 2 + i
+
+    def games_played(self, name_a: str, name_b: str) -> int:
+        """该对已下的局数"""
+        return sum(self.pairs[self.pair_key(name_a, name_b)])
+
+    def record_game(self, agent1_name: str, agent2_name: str, winner_seat: Optional[int], game_num: int):
+        """
+        记录一局并更新评分
+
+        game_num从1开始，奇数局agent1执先（与summarize_games一致），winner_seat为获胜座位或None（平局）。
+        """
+        agent1_seat = 1 if game_num % 2 == 1 else 2
+        if winner_seat is None:
+            score = 0.5
+        else:
+            score = 1.0 if winner_seat == agent1_seat else 0.0
+        key = self.pair_key(agent1_name, agent2_name)
+        tally = self.pairs[key]
+        if score == 0.5:
+            tally[2] += 1
+        else:
+            tally[0 if (score == 1.0) == (key[0] == agent1_name) else 1] += 1
+        self.elo.update(agent1_name, agent2_name, score)
+        if self.glicko is not None:
+            self.glicko.update(agent1_name, agent2_name, score)
+
+    def callback(self, pairings: Sequence[Tuple[AgentSpec, AgentSpec]]) -> Callable[[int, Dict[str, Any]], None]:
+        """给run_match/run_matches/run_tournament用的每局回调"""
+        def on_game_end(match_index: int, game_result: Dict[str, Any]):
+            agent1_spec, agent2_spec = pairings[match_index]
+            self.record_game(agent1_spec.name, agent2_spec.name, game_result['winner'], game_result['game_num'])
+        return on_game_end
+
+    def pair_settled(self, name_a: str, name_b: str) -> bool:
+        """该对是否已经不需要再下：达到最多局数，或下够最少局数后置信区间足够窄"""
+        wins, losses, draws = self.pairs[self.pair_key(name_a, name_b)]
+        games = wins + losses + draws
+        if games >= self.settings['max_games']:
+            return True
+        if games < self.settings['min_games']:
+            return False
+        low, high = score_interval(wins, losses, draws, self.settings['z'])
+        return (high - low) / 2 <= self.settings['ci_half_width']
+
+    def pending_pairs(self) -> List[Tuple[str, str]]:
+        """还需要继续对战的对阵"""
+        return [key for key in self.pairs if not self.pair_settled(*key)]
+
+    def leaderboard(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """按Elo排序的 (名称, 统计) 列表"""
+        stats = {name: {'elo': self.elo.ratings[name], 'wins': 0, 'losses': 0, 'draws': 0, 'games': 0}
+                 for name in self.agents}
+        for (name_a, name_b), (wins, losses, draws) in self.pairs.items():
+            for name, won, lost in ((name_a, wins, losses), (name_b, losses, wins)):
+                stats[name]['wins'] += won
+                stats[name]['losses'] += lost
+                stats[name]['draws'] += draws
+                stats[name]['games'] += wins + losses + draws
+        for name, agent_stats in stats.items():
+            agent_stats['win_rate'] = agent_stats['wins'] / agent_stats['games'] if agent_stats['games'] else 0
+            if self.glicko is not None:
+                agent_stats['glicko'], agent_stats['rd'] = self.glicko.rating(name)
+        return sorted(stats.items(), key=lambda item: item[1]['elo'], reverse=True)
+
+    def save(self, path: str):
+        """保存评分和战绩"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            'settings': self.settings,
+            'agents': self.agents,
+            'elo': self.elo.ratings,
+            'glicko': self.glicko.players if self.glicko is not None else None,
+            'pairs': [[name_a, name_b, tally] for (name_a, name_b), tally in self.pairs.items()],
+        }
+        # 先写临时文件再替换，中途退出不会留下损坏的文件
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'RatingLadder':
+        """读取save保存的天梯"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        ladder = cls(use_glicko=data['glicko'] is not None, **data['settings'])
+        ladder.agents = data['agents']
+        ladder.elo.ratings = data['elo']
+        if ladder.glicko is not None:
+            ladder.glicko.players = data['glicko']
+        ladder.pairs = {(name_a, name_b): tally for name_a, name_b, tally in data['pairs']}
+        return ladder
+
+
+def run_ladder(env_spec: EnvSpec, agent_specs: Sequence[AgentSpec], ladder: RatingLadder = None,
+               seed: int = 0, workers: int = 0, path: str = None,
+               callback: Callable[[Tuple[str, str], Dict[str, Any]], None] = None) -> RatingLadder:
+    """
+    自适应天梯：每轮给每个未确定的对阵安排batch_games局，直到所有对阵都确定
+
+    给定path时从该文件继续（文件不存在则新建），每轮结束后保存；ladder里没有的智能体会被加入，
+    只有涉及它的对阵需要对战。每局的随机种子由 (种子, 对阵编号, 局号) 确定，哪些局会被下与并行与否无关；
+    评分按完成顺序在线更新，并行时末位数字可能与串行略有不同。
+    """
+    if ladder is None:
+        ladder = RatingLadder.load(path) if path is not None and os.path.exists(path) else RatingLadder()
+    specs = {spec.name: spec for spec in agent_specs}
+    for spec in agent_specs:
+        ladder.add_agent(spec.name)
+    batch_games = ladder.settings['batch_games']
+
+    while True:
+        pending = [key for key in ladder.pending_pairs() if key[0] in specs and key[1] in specs]
+        if not pending:
+            break
+        tasks = []
+        for name_a, name_b in pending:
+            played = ladder.games_played(name_a, name_b)
+            games = min(batch_games, ladder.settings['max_games'] - played)
+            tasks.extend((env_spec, specs[name_a], specs[name_b], ladder.pair_index(name_a, name_b), game_num, seed)
+                         for game_num in range(played, played + games))
+        keys = {ladder.pair_index(*key): key for key in pending}
+        for pair_index, game_result in iter_games(tasks, workers):
+            name_a, name_b = keys[pair_index]
+            ladder.record_game(name_a, name_b, game_result['winner'], game_result['game_num'])
+            if callback is not None:
+                callback((name_a, name_b), game_result)
+        if path is not None:
+            ladder.save(path)
+    return ladder
+
+
+def print_ratings(leaderboard: List[Tuple[str, Dict[str, Any]]]):
+    """显示评分榜"""
+    print("\n=== 天梯评分榜 ===")
+    for rank, (agent_name, stats) in enumerate(leaderboard, 1):
+        line = f"{rank}. {agent_name}: Elo {stats['elo']:.0f}"
+        if 'glicko' in stats:
+            line += f", Glicko-2 {stats['glicko']:.0f} ± {2 * stats['rd']:.0f}"
+        print(line + f" ({stats['wins']}胜 {stats['losses']}负 {stats['draws']}平)")
@@ -0,0 +1,163 @@
+"""
+流式对局记录
+每局结束立即以一行紧凑JSON追加到文件末尾（JSONL），写完即刷新；
+程序中途退出时最多丢失最后一行，重新打开会截掉不完整的行并可跳过已完成的对局继续运行。
+文件第一行可以是记录种子和对阵的头部 {"header": {...}}，续跑时头部不一致会拒绝写入
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# 对局记录写入文件后，内存里只保留这些字段
+SUMMARY_KEYS = ('game_num', 'winner', 'total_moves', 'game_time')
+
+
+def _jsonable(value: Any) -> Any:
+    """把numpy标量等对象转成JSON可写的值"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class ResultWriter:
+    """
+    追加写入的对局记录文件
+
+    每条记录是一个字典，写成一行不带缩进的JSON。fsync为True时每条记录都落盘，
+    否则只刷新到操作系统（进程崩溃不丢数据，断电可能丢最后几条）。
+    给定header（种子、对阵等）时，新文件先写入头部；已有文件的头部与之不同时抛出ValueError，
+    避免把另一次运行的对局合并进来。
+    """
+
+    def __init__(self, path: str, fsync: bool = False, header: Dict[str, Any] = None):
+        self.path = path
+        self.fsync = fsync
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._truncate_partial_line()
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if header is not None and not is_new:
+            # 按写入后的样子比较（元组写成JSON后是列表）
+            expected = json.loads(json.dumps(header, default=_jsonable))
+            existing = read_header(path)
+            if existing != expected:
+                raise ValueError(f"结果文件 {path} 的头部 {existing} 与本次运行 {expected} 不一致，不能续跑")
+        self._file = open(path, 'a', encoding='utf-8')
+        if header is not None and is_new:
+            self.write({'header': header})
+
+    def write(self, record: Dict[str, Any]):
+        """追加一条记录并刷新"""
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=_jsonable)
+        self._file.write(line + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """关闭文件"""
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> 'ResultWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def _truncate_partial_line(self):
+        """上次写到一半就中断时，截掉文件末尾不完整的一行"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            # 从末尾向前找最后一个换行符
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                block = f.read(step)
+                newline = block.rfind(b'\n')
+                if newline >= 0:
+                    f.truncate(position + newline + 1)
+                    return
+            f.truncate(0)
+
+
+def iter_results(path: str) -> Iterator[Dict[str, Any]]:
+    """逐条读取对局记录，不把整个文件读入内存；头部和末尾不完整的一行会被跳过"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                break
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                if 'header' not in record:
+                    yield record
+
+
+def read_header(path: str) -> Optional[Dict[str, Any]]:
+    """读取文件第一行的头部，没有头部时返回None"""
+    with open(path, 'r', encoding='utf-8') as f:
+        line = f.readline()
+    if not line.endswith('\n'):
+        return None
+    return json.loads(line).get('header')
+
+
+def summary_record(game_result: Dict[str, Any]) -> Dict[str, Any]:
+    """对局记录的精简版本（去掉逐步记录）"""
+    return {key: game_result[key] for key in SUMMARY_KEYS if key in game_result}
+
+
+def completed_games(path: str) -> Dict[Tuple[int, int], Dict[str, Any]]:
+    """已写入文件的对局 {(对阵编号, 局号): 精简记录}，用于断点续跑；同一局重复出现时保留第一条"""
+    games: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return games
+    for record in iter_results(path):
+        games.setdefault((record.get('match', 0), record['game_num']), summary_record(record))
+    return games
+
+
+def summarize_results(path: str) -> Dict[int, Dict[str, Any]]:
+    """
+    流式统计每组对阵的胜负：{对阵编号: 统计}
+
+    agent1在奇数局（game_num从1开始）执先，与evaluate_agents的交替规则一致。
+    """
+    summaries: Dict[int, Dict[str, Any]] = {}
+    for record in iter_results(path):
+        match = record.get('match', 0)
+        summary = summaries.setdefault(match, {
+            'agent1_name': record.get('agent1_name'),
+            'agent2_name': record.get('agent2_name'),
+            'total_games': 0, 'agent1_wins': 0, 'agent2_wins': 0, 'draws': 0, 'total_moves': 0,
+        })
+        agent1_seat = 1 if record['game_num'] % 2 == 1 else 2
+        summary['total_games'] += 1
+        summary['total_moves'] += record.get('total_moves', 0)
+        if record['winner'] == agent1_seat:
+            summary['agent1_wins'] += 1
+        elif record['winner'] is not None:
+            summary['agent2_wins'] += 1
+        else:
+            summary['draws'] += 1
+    for summary in summaries.values():
+        total = summary['total_games']
+        summary['agent1_win_rate'] = summary['agent1_wins'] / total
+        summary['agent2_win_rate'] = summary['agent2_wins'] / total
+        summary['draw_rate'] = summary['draws'] / total
+    return summaries